@@ -0,0 +1,71 @@
+"""
+Parallel fan-out for the batch product tools.
+
+Each item runs on its own thread with its own leased browser. Results come
+back in input order with per-item errors and timings, so one failing product
+never hides the others.
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import config
+from driver_pool import get_driver_pool
+from models import BatchItem
+from tracing import bind_trace
+
+
+def run_batch(item_func, items, parallelism=None):
+    """
+    Call `item_func(item)` for every item with at most `parallelism` running
+    at once. Returns one BatchItem per item, in input order.
+    """
+    if parallelism is None:
+        parallelism = config.BATCH_PARALLELISM
+    # More workers than browsers would only wait on the pool
+    parallelism = max(1, min(parallelism, get_driver_pool().size, len(items) or 1))
+
+    def run_item(index, item):
+        started = time.monotonic()
+        batch_item = BatchItem(index, item)
+        try:
+            batch_item.result = item_func(item)
+        except Exception as e:
+            batch_item.error = str(e) or type(e).__name__
+        batch_item.seconds = time.monotonic() - started
+        return batch_item
+
+    with ThreadPoolExecutor(
+        max_workers=parallelism, thread_name_prefix="trendyol-batch"
+    ) as executor:
+        futures = [
+            executor.submit(bind_trace(run_item), index, item)
+            for index, item in enumerate(items)
+        ]
+        return [future.result() for future in futures]
+
+
+def render_batch_results(items, title, render_item):
+    """Render BatchItems in input order with per-item status and timing"""
+    lines = ["", "#" * 80, title, "#" * 80]
+
+    for batch_item in items:
+        status = "ERROR" if batch_item.error else "OK"
+        lines.append(
+            f"\n[{batch_item.index + 1}/{len(items)}] {batch_item.item} "
+            f"- {status} ({batch_item.seconds:.2f}s)"
+        )
+        if batch_item.error:
+            lines.append(f"Error: {batch_item.error}")
+        elif batch_item.result is None:
+            lines.append("No result")
+        else:
+            lines.append(render_item(batch_item.result).strip("\n"))
+
+    failed = sum(1 for batch_item in items if batch_item.error)
+    total_seconds = sum(batch_item.seconds for batch_item in items)
+    lines.append(
+        f"\nItems: {len(items)} | Failed: {failed} | "
+        f"Item time: {total_seconds:.2f}s"
+    )
+    return "\n".join(lines)
@@ -0,0 +1,442 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for trendyol.com used by the offline benchmarks.
+
+Serves the page templates in benchmarks/fixtures filled from a deterministic
+synthetic catalog, so every run sees exactly the same pages:
+
+    /sr?q=<query>[&pi=<page>]              search result page
+    /sr/feed?q=<query>&offset=<n>          infinite-scroll batch of cards
+    /<brand>/<slug>-p-<id>                 product page
+    /<brand>/<slug>-p-<id>/yorumlar        reviews page
+    /<brand>/<slug>-p-<id>/yorumlar/feed   infinite-scroll batch of reviews
+    /api/review/<id>?page=<n>              reviews JSON endpoint
+    /images/<id>-<n>.png                   gallery images
+
+The search and reviews pages load more entries with fetch() as they are
+scrolled, like the live site. `latency` adds a fixed delay to every response
+to stand in for the network.
+
+    python benchmarks/fixture_server.py --port 8765 --latency-ms 30
+"""
+
+import argparse
+import html
+import json
+import os
+import re
+import struct
+import threading
+import time
+import zlib
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from string import Template
+from urllib.parse import parse_qs, urlsplit
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+BRANDS = ("Lenovo", "Asus", "HP", "Apple", "Dell", "Monster", "Casper", "MSI")
+SELLERS = ("TeknoMarket", "Vatan Bilgisayar", "Trendyol", "MediaMarkt")
+TURKISH_MONTHS = (
+    "Ocak", "Şubat", "Mart", "Nisan", "Mayıs", "Haziran",
+    "Temmuz", "Ağustos", "Eylül", "Ekim", "Kasım", "Aralık",
+)  # fmt: skip
+
+# Newest review date; older reviews go back one day each
+LATEST_REVIEW_DATE = date(2024, 6, 30)
+FIRST_CONTENT_ID = 700000
+IMAGES_PER_PRODUCT = 6
+IMAGE_SIZE = 600
+
+_PRODUCT_PATH = re.compile(r"^/[^/]+/[^/]*-p-(\d+)(/yorumlar(/feed)?)?/?$")
+_REVIEW_API_PATH = re.compile(r"^/api/review/(\d+)$")
+_IMAGE_PATH = re.compile(r"^/images/(\d+)-(\d+)\.png$")
+
+
+class FixtureServer:
+    """Threaded HTTP server answering with the fixture pages"""
+
+    def __init__(
+        self,
+        host="127.0.0.1",
+        port=0,
+        fixtures_dir=FIXTURES_DIR,
+        products=240,
+        reviews=300,
+        page_size=24,
+        review_page_size=20,
+        latency=0.0,
+    ):
+        self.products = products
+        self.reviews = reviews
+        self.page_size = page_size
+        self.review_page_size = review_page_size
+        self.latency = latency
+        self.templates = {
+            name: _load_template(fixtures_dir, name)
+            for name in ("search", "search_card", "product", "reviews", "review_card")
+        }
+        self._images = {}
+        self._images_lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), _Handler)
+        self._httpd.daemon_threads = True
+        self._httpd.fixtures = self
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def serve_forever(self):
+        """Serve on the calling thread until interrupted"""
+        try:
+            self._httpd.serve_forever()
+        finally:
+            self._httpd.server_close()
+
+    def start(self):
+        """Serve on a background thread"""
+        self._thread = threading.Thread(
+            target=self._httpd.serve_forever, name="fixture-server", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    # Catalog
+
+    def product(self, index):
+        content_id = FIRST_CONTENT_ID + index
+        brand = BRANDS[index % len(BRANDS)]
+        name = f"Model {index:03d} 15.6 inç Dizüstü Bilgisayar"
+        slug = f"model-{index:03d}-15-6-inc-dizustu-bilgisayar"
+        return {
+            "index": index,
+            "content_id": content_id,
+            "brand": brand,
+            "brand_slug": brand.lower(),
+            "name": name,
+            "price": 15000 + (index * 731) % 40000 + 0.9,
+            "url": f"/{brand.lower()}/{slug}-p-{content_id}",
+            "rating": round(3.5 + (index % 15) / 10, 1),
+        }
+
+    def review(self, content_id, position):
+        """Review number `position` of a product, newest first"""
+        review_date = LATEST_REVIEW_DATE - timedelta(days=position)
+        rating = 5 - (position % 4 == 3) - (position % 7 == 6)
+        return {
+            "id": content_id * 1000 + (self.reviews - position),
+            "comment": (
+                f"Yorum {position + 1}: ürün hızlı geldi, paketleme özenliydi. "
+                f"Ekran parlaklığı ve batarya ömrü beklentimi karşıladı."
+            ),
+            "rate": rating,
+            "commentDateISOtype": review_date.isoformat(),
+            "lastModifiedDate": _turkish_date(review_date),
+            "sellerName": SELLERS[position % len(SELLERS)],
+            "userFullName": f"K** Y**{position % 10}",
+        }
+
+    # Pages
+
+    def search_page(self, query, page):
+        start = (page - 1) * self.page_size
+        products = [
+            self.product(index)
+            for index in range(start, min(start + self.page_size, self.products))
+        ]
+        state = {
+            "products": [
+                {
+                    "id": product["content_id"],
+                    "name": product["name"],
+                    "brand": {"name": product["brand"]},
+                    "price": {"discountedPrice": {"value": product["price"]}},
+                    "url": product["url"],
+                }
+                for product in products
+            ]
+        }
+        return self.templates["search"].substitute(
+            query=html.escape(query),
+            query_json=json.dumps(query),
+            total=self.products,
+            next_offset=start + len(products),
+            cards=self.search_cards(products),
+            state=json.dumps(state, ensure_ascii=False).replace("</", "<\\/"),
+        )
+
+    def search_feed(self, offset):
+        indexes = range(offset, min(offset + self.page_size, self.products))
+        return self.search_cards([self.product(index) for index in indexes])
+
+    def search_cards(self, products):
+        return "".join(
+            self.templates["search_card"].substitute(
+                content_id=product["content_id"],
+                url=product["url"],
+                image=f"/images/{product['content_id']}-0.png",
+                brand=html.escape(product["brand"]),
+                name=html.escape(product["name"]),
+                description=html.escape(f"{product['brand']} {product['name']}"),
+                price=_format_price(product["price"]),
+            )
+            for product in products
+        )
+
+    def product_page(self, content_id):
+        product = self.product(content_id - FIRST_CONTENT_ID)
+        gallery = "\n".join(
+            f'        <img src="/images/{content_id}-{n}.png" '
+            f'alt="{html.escape(product["name"])} {n + 1}" class="gallery-image">'
+            for n in range(IMAGES_PER_PRODUCT)
+        )
+        attributes = "\n".join(
+            f'      <li class="attribute-item"><span class="attribute-label">{key}</span>'
+            f'<span class="attribute-value">{value}</span></li>'
+            for key, value in (
+                ("İşlemci Tipi", "Intel Core i7"),
+                ("Ram (Sistem Belleği)", "16 GB"),
+                ("SSD Kapasitesi", "512 GB"),
+                ("Ekran Boyutu", "15,6 inç"),
+                ("Ekran Kartı", "NVIDIA GeForce RTX 4060"),
+                ("İşletim Sistemi", "Free Dos"),
+                ("Garanti Süresi", "24 Ay"),
+                ("Renk", "Siyah"),
+            )
+        )
+        description = "\n".join(
+            f"      <div><p>{html.escape(line)}</p></div>"
+            for line in (
+                f"{product['brand']} {product['name']} ile günlük işlerinizi hızla tamamlayın.",
+                "Bu ürün Trendyol tarafından gönderilecektir.",
+                "Kampanya fiyatından satılmak üzere 10 adetten fazla stok sunulmuştur.",
+                "İncelemiş olduğunuz ürünün satış fiyatını satıcı belirlemektedir.",
+            )
+        )
+        return self.templates["product"].substitute(
+            title=html.escape(product["name"]),
+            brand=html.escape(product["brand"]),
+            brand_slug=product["brand_slug"],
+            rating=product["rating"],
+            review_count=self.reviews,
+            reviews_url=product["url"] + "/yorumlar",
+            price=_format_price(product["price"]),
+            stock=3 + product["index"] % 7,
+            gallery=gallery,
+            attributes=attributes,
+            description=description,
+        )
+
+    def reviews_page(self, content_id):
+        product = self.product(content_id - FIRST_CONTENT_ID)
+        count = min(self.review_page_size, self.reviews)
+        return self.templates["reviews"].substitute(
+            title=html.escape(product["name"]),
+            feed_url_json=json.dumps(product["url"] + "/yorumlar/feed"),
+            next_offset=count,
+            total=self.reviews,
+            reviews=self.review_cards(content_id, 0, count),
+        )
+
+    def reviews_feed(self, content_id, offset):
+        count = max(0, min(self.review_page_size, self.reviews - offset))
+        return self.review_cards(content_id, offset, count)
+
+    def review_cards(self, content_id, offset, count):
+        cards = []
+        for position in range(offset, offset + count):
+            review = self.review(content_id, position)
+            stars = "".join(
+                '<div class="star-w"><div class="full" style="width: '
+                f'{100 if star < review["rate"] else 0}%"></div></div>'
+                for star in range(5)
+            )
+            cards.append(
+                self.templates["review_card"].substitute(
+                    review_id=review["id"],
+                    stars=stars,
+                    text=html.escape(review["comment"]),
+                    author=html.escape(review["userFullName"]),
+                    date=review["lastModifiedDate"],
+                    seller=html.escape(review["sellerName"]),
+                )
+            )
+        return "".join(cards)
+
+    def reviews_json(self, content_id, page):
+        start = page * self.review_page_size
+        positions = range(start, min(start + self.review_page_size, self.reviews))
+        total_pages = -(-self.reviews // self.review_page_size)
+        return {
+            "isSuccess": True,
+            "result": {
+                "productReviews": {
+                    "content": [
+                        self.review(content_id, position) for position in positions
+                    ],
+                    "page": page,
+                    "totalElements": self.reviews,
+                    "totalPages": total_pages,
+                }
+            },
+        }
+
+    def image(self, seed):
+        # A handful of distinct images is enough; each is encoded once
+        seed %= 4
+        with self._images_lock:
+            if seed not in self._images:
+                self._images[seed] = _make_png(IMAGE_SIZE, IMAGE_SIZE, seed)
+            return self._images[seed]
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        fixtures = self.server.fixtures
+        if fixtures.latency:
+            time.sleep(fixtures.latency)
+
+        parts = urlsplit(self.path)
+        query = parse_qs(parts.query)
+        path = parts.path
+
+        if path == "/sr":
+            page = _int(query.get("pi"), 1)
+            return self._send_html(
+                fixtures.search_page(query.get("q", [""])[0], max(1, page))
+            )
+        if path == "/sr/feed":
+            return self._send_html(fixtures.search_feed(_int(query.get("offset"), 0)))
+
+        match = _REVIEW_API_PATH.match(path)
+        if match:
+            body = json.dumps(
+                fixtures.reviews_json(int(match.group(1)), _int(query.get("page"), 0)),
+                ensure_ascii=False,
+            )
+            return self._send(200, "application/json", body.encode("utf-8"))
+
+        match = _IMAGE_PATH.match(path)
+        if match:
+            seed = int(match.group(1)) + int(match.group(2))
+            return self._send(200, "image/png", fixtures.image(seed))
+
+        match = _PRODUCT_PATH.match(path)
+        if match:
+            content_id = int(match.group(1))
+            if not 0 <= content_id - FIRST_CONTENT_ID < fixtures.products:
+                return self._send(404, "text/plain", b"Not found")
+            if match.group(3):
+                offset = _int(query.get("offset"), 0)
+                return self._send_html(fixtures.reviews_feed(content_id, offset))
+            if match.group(2):
+                return self._send_html(fixtures.reviews_page(content_id))
+            return self._send_html(fixtures.product_page(content_id))
+
+        self._send(404, "text/plain", b"Not found")
+
+    def _send_html(self, text):
+        self._send(200, "text/html; charset=utf-8", text.encode("utf-8"))
+
+    def _send(self, status, content_type, body):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _load_template(fixtures_dir, name):
+    with open(os.path.join(fixtures_dir, f"{name}.html"), encoding="utf-8") as f:
+        return Template(f.read())
+
+
+def _int(values, default):
+    try:
+        return int(values[0])
+    except (TypeError, ValueError, IndexError):
+        return default
+
+
+def _format_price(value):
+    # 12999.9 -> "12.999,90 TL"
+    amount = f"{value:,.2f}".replace(",", "_").replace(".", ",").replace("_", ".")
+    return f"{amount} TL"
+
+
+def _turkish_date(value):
+    return f"{value.day} {TURKISH_MONTHS[value.month - 1]} {value.year}"
+
+
+def _make_png(width, height, seed):
+    """Encode an RGB gradient as PNG with the standard library only"""
+    rows = bytearray()
+    red = bytes((x * 255 // width + seed * 60) & 255 for x in range(width))
+    for y in range(height):
+        green = (y * 255 // height) & 255
+        rows.append(0)  # No filter
+        for x in range(width):
+            rows += bytes((red[x], green, (x ^ y) & 255))
+
+    def chunk(kind, data):
+        payload = kind + data
+        return (
+            struct.pack(">I", len(data))
+            + payload
+            + struct.pack(">I", zlib.crc32(payload) & 0xFFFFFFFF)
+        )
+
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", header)
+        + chunk(b"IDAT", zlib.compress(bytes(rows), 6))
+        + chunk(b"IEND", b"")
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--products", type=int, default=240)
+    parser.add_argument("--reviews", type=int, default=300)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    args = parser.parse_args()
+
+    server = FixtureServer(
+        args.host,
+        args.port,
+        products=args.products,
+        reviews=args.reviews,
+        latency=args.latency_ms / 1000,
+    )
+    print(f"Serving fixtures on {server.base_url} (Ctrl+C to stop)")
+    print(f"  TRENDYOL_BASE_URL={server.base_url}")
+    print(f"  TRENDYOL_REVIEWS_API_URL={server.base_url}/api/review/{{content_id}}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
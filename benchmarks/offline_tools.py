@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+Offline end-to-end benchmark of the Trendyol tools.
+
+Starts the local fixture server (benchmarks/fixture_server.py), points the
+scrapers at it through TRENDYOL_BASE_URL and TRENDYOL_REVIEWS_API_URL, and
+runs every tool scenario several times. Each run is traced, so besides the
+end-to-end time the report lists the time spent per phase (navigation,
+scrolling, extraction, HTTP fetches, ...) and the exceptions raised per
+phase. Phase times are summed over threads and can exceed the wall time of
+parallel scenarios.
+
+The results file records the commit and the settings next to the median,
+min and max timings, so runs on different commits can be compared:
+
+    python benchmarks/offline_tools.py --output base.json
+    git checkout my-branch
+    python benchmarks/offline_tools.py --output new.json --compare base.json
+
+Browser scenarios need Chrome and chromedriver; select the HTTP-only ones
+with --scenarios search_http,reviews_http where they are not available.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+from fixture_server import FIRST_CONTENT_ID, FixtureServer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+QUERY = "laptop"
+
+# name -> (tool, what it measures)
+SCENARIOS = {
+    "search_http": ("search_trendyol", "HTTP backend, parallel result pages"),
+    "search_browser_scroll": ("search_trendyol", "Browser, infinite-scroll feed"),
+    "search_browser_pages": ("search_trendyol", "Browser, parallel result pages"),
+    "details": ("get_product_details", "Product page extraction"),
+    "images": ("get_product_image", "Gallery extraction, downloads and thumbnails"),
+    "reviews_http": ("get_product_reviews", "Reviews JSON endpoint"),
+    "reviews_browser": ("get_product_reviews", "Reviews page with infinite scroll"),
+}
+
+
+def configure(base_url):
+    """Point the scrapers at the fixture server and turn off every cache"""
+    os.environ.update(
+        {
+            "TRENDYOL_BASE_URL": base_url,
+            "TRENDYOL_REVIEWS_API_URL": base_url + "/api/review/{content_id}",
+            "TRENDYOL_IMAGE_CACHE_DIR": "",
+            "TRENDYOL_SELECTOR_STATS_FILE": "",
+            "TRENDYOL_METRICS_FILE": "",
+        }
+    )
+    os.environ.setdefault("TRENDYOL_DRIVER_POOL_SIZE", "2")
+    sys.path.insert(0, ROOT)
+
+
+def scenario_call(name, args, product_url):
+    """Return a zero-argument callable running scenario `name`"""
+    # Imported after configure() so config picks up the fixture URLs
+    from get_product_details import get_product_details
+    from get_product_image import get_product_image
+    from get_product_reviews import get_product_reviews
+    from search_trendyol import search_trendyol
+
+    content_id = FIRST_CONTENT_ID
+    return {
+        "search_http": lambda: search_trendyol(
+            QUERY, args.target_count, backend="http"
+        ),
+        "search_browser_scroll": lambda: search_trendyol(
+            QUERY, min(args.target_count, 100), backend="browser"
+        ),
+        "search_browser_pages": lambda: search_trendyol(
+            QUERY, args.target_count, backend="browser", pagination="pages"
+        ),
+        "details": lambda: get_product_details(product_url=product_url),
+        "images": lambda: get_product_image(
+            product_url=product_url, max_images=args.max_images
+        ),
+        "reviews_http": lambda: get_product_reviews(
+            content_id=content_id, max_reviews=args.max_reviews, backend="http"
+        ),
+        "reviews_browser": lambda: get_product_reviews(
+            product_url=product_url, max_reviews=args.max_reviews, backend="browser"
+        ),
+    }[name]
+
+
+def result_size(record):
+    """Number of items a tool returned, to spot runs that silently failed"""
+    if record is None:
+        return 0
+    for attribute in ("products", "reviews", "images"):
+        if hasattr(record, attribute):
+            return len(getattr(record, attribute))
+    return sum(1 for value in (record.title, record.price, record.description) if value)
+
+
+def run_scenario(name, call, runs, warmup):
+    from tracing import trace
+
+    tool = SCENARIOS[name][0]
+    samples = []
+    for run in range(warmup + runs):
+        error = None
+        record = None
+        with trace(tool) as current:
+            try:
+                record = call()
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+        if run < warmup:
+            continue
+
+        phases = {}
+        failures = {}
+        for item in current.spans:
+            phases[item["phase"]] = phases.get(item["phase"], 0.0) + item["seconds"]
+            if item["error"]:
+                key = f"{item['phase']}:{item['error']}"
+                failures[key] = failures.get(key, 0) + 1
+        samples.append(
+            {
+                "seconds": current.seconds,
+                "phases": phases,
+                "failures": failures,
+                "items": result_size(record),
+                "error": error,
+            }
+        )
+    return summarize(name, samples)
+
+
+def summarize(name, samples):
+    seconds = [sample["seconds"] for sample in samples]
+    phase_names = sorted(set().union(*(sample["phases"] for sample in samples)))
+    failures = {}
+    for sample in samples:
+        for key, count in sample["failures"].items():
+            failures[key] = failures.get(key, 0) + count
+    errors = sorted({sample["error"] for sample in samples if sample["error"]})
+    return {
+        "tool": SCENARIOS[name][0],
+        "description": SCENARIOS[name][1],
+        "runs": len(samples),
+        "seconds": _stats(seconds),
+        "phases": {
+            phase: round(
+                statistics.median(
+                    sample["phases"].get(phase, 0.0) for sample in samples
+                ),
+                4,
+            )
+            for phase in phase_names
+        },
+        "items": statistics.median(sample["items"] for sample in samples),
+        "failures": failures,
+        "errors": errors,
+    }
+
+
+def _stats(values):
+    return {
+        "median": round(statistics.median(values), 4),
+        "min": round(min(values), 4),
+        "max": round(max(values), 4),
+    }
+
+
+def git_revision():
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+        dirty = bool(
+            subprocess.run(
+                ["git", "status", "--porcelain", "--untracked-files=no"],
+                cwd=ROOT,
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout.strip()
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return {"commit": None, "dirty": None}
+    return {"commit": commit, "dirty": dirty}
+
+
+def print_report(results):
+    for name, summary in results["scenarios"].items():
+        seconds = summary["seconds"]
+        print(
+            f"\n{name} ({summary['description']}): median {seconds['median']:.3f}s "
+            f"[{seconds['min']:.3f}-{seconds['max']:.3f}] over {summary['runs']} runs, "
+            f"{summary['items']:g} items"
+        )
+        for phase, phase_seconds in sorted(
+            summary["phases"].items(), key=lambda item: -item[1]
+        ):
+            print(f"  {phase:<20} {phase_seconds:8.3f}s")
+        for key, count in sorted(summary["failures"].items()):
+            print(f"  failed {key} x{count}")
+        for error in summary["errors"]:
+            print(f"  error: {error}")
+
+
+def print_comparison(results, baseline):
+    print(
+        f"\nCompared with {(baseline.get('commit') or 'unknown')[:12]} "
+        f"(this run: {(results.get('commit') or 'unknown')[:12]})"
+    )
+    print(f"{'scenario / phase':<42} {'baseline':>10} {'current':>10} {'change':>8}")
+    for name, summary in results["scenarios"].items():
+        before = baseline.get("scenarios", {}).get(name)
+        if before is None:
+            continue
+        rows = [(name, before["seconds"]["median"], summary["seconds"]["median"])]
+        for phase, seconds in summary["phases"].items():
+            if phase in before["phases"]:
+                rows.append((f"  {phase}", before["phases"][phase], seconds))
+        for label, old, new in rows:
+            change = f"{(new - old) / old * 100:+.1f}%" if old else "n/a"
+            print(f"{label:<42} {old:>9.3f}s {new:>9.3f}s {change:>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--scenarios",
+        default=",".join(SCENARIOS),
+        help="Comma-separated scenarios to run (default: all)",
+    )
+    parser.add_argument(
+        "--runs", type=int, default=5, help="Measured runs per scenario"
+    )
+    parser.add_argument(
+        "--warmup", type=int, default=1, help="Unmeasured runs per scenario first"
+    )
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--products", type=int, default=240)
+    parser.add_argument("--reviews", type=int, default=300)
+    parser.add_argument("--target-count", type=int, default=100)
+    parser.add_argument("--max-reviews", type=int, default=200)
+    parser.add_argument("--max-images", type=int, default=4)
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    parser.add_argument(
+        "--compare", help="Results file of an earlier run to compare with"
+    )
+    args = parser.parse_args()
+
+    names = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(unknown)}")
+
+    server = FixtureServer(
+        products=args.products, reviews=args.reviews, latency=args.latency_ms / 1000
+    ).start()
+    try:
+        configure(server.base_url)
+        from product_urls import absolute_url
+
+        product_url = absolute_url(server.product(0)["url"])
+
+        results = {
+            **git_revision(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "settings": {
+                key: value
+                for key, value in vars(args).items()
+                if key not in ("output", "compare")
+            },
+            "scenarios": {},
+        }
+        for name in names:
+            call = scenario_call(name, args, product_url)
+            results["scenarios"][name] = run_scenario(
+                name, call, args.runs, args.warmup
+            )
+    finally:
+        server.stop()
+
+    print_report(results)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            print_comparison(results, json.load(f))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+            f.write("\n")
+
+    failed = [
+        name for name, summary in results["scenarios"].items() if not summary["items"]
+    ]
+    if failed:
+        print(f"\nNo results from: {', '.join(failed)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
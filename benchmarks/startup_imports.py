@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Startup import-time benchmark for the MCP server.
+
+Imports `trendyol_mcp_server` in fresh interpreters with `-X importtime` and
+reports the median cumulative import cost per module. Modules that must stay
+off the startup path (Selenium, Pillow, matplotlib, ...) fail the run when
+they show up, and `--budget-ms` fails it when the server import gets slower.
+
+    python benchmarks/startup_imports.py --runs 5 --top 15 --json startup.json
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Heavy dependencies that are only imported by the tools that need them
+FORBIDDEN_AT_STARTUP = (
+    "selenium",
+    "webdriver_manager",
+    "PIL",
+    "matplotlib",
+    "requests",
+)
+
+_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def measure(module="trendyol_mcp_server"):
+    """Import `module` in a fresh interpreter; returns {module: (self_us, cumulative_us)}"""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    timings = {}
+    for line in completed.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            timings[match.group(4)] = (int(match.group(1)), int(match.group(2)))
+    return timings
+
+
+def summarize(runs):
+    """Median self and cumulative milliseconds per module over all runs"""
+    modules = set().union(*runs)
+    summary = {}
+    for name in modules:
+        samples = [run[name] for run in runs if name in run]
+        summary[name] = {
+            "self_ms": round(statistics.median(s[0] for s in samples) / 1000, 2),
+            "cumulative_ms": round(statistics.median(s[1] for s in samples) / 1000, 2),
+        }
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--module", default="trendyol_mcp_server")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15, help="modules listed by cost")
+    parser.add_argument("--json", help="write the per-module results to this file")
+    parser.add_argument(
+        "--budget-ms",
+        type=float,
+        help="fail when the median cumulative import time exceeds this",
+    )
+    args = parser.parse_args()
+
+    summary = summarize([measure(args.module) for _ in range(args.runs)])
+    total = summary[args.module]["cumulative_ms"]
+
+    print(f"{args.module}: {total:.1f} ms (median of {args.runs} runs)")
+    ranked = sorted(summary.items(), key=lambda item: -item[1]["cumulative_ms"])
+    for name, timing in ranked[: args.top]:
+        print(
+            f"  {timing['cumulative_ms']:8.1f} ms cumulative"
+            f"  {timing['self_ms']:7.1f} ms self  {name}"
+        )
+
+    failures = []
+    loaded = sorted(name for name in summary if name in FORBIDDEN_AT_STARTUP)
+    if loaded:
+        failures.append(f"heavy modules imported at startup: {', '.join(loaded)}")
+    if args.budget_ms is not None and total > args.budget_ms:
+        failures.append(f"import took {total:.1f} ms, budget {args.budget_ms:.1f} ms")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(
+                {"module": args.module, "runs": args.runs, "modules": summary},
+                f,
+                indent=2,
+                sort_keys=True,
+            )
+
+    for failure in failures:
+        print(f"FAIL: {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
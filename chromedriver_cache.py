@@ -0,0 +1,130 @@
+"""
+One-time chromedriver resolution.
+
+`ChromeDriverManager().install()` probes the Chrome version and may hit the
+network, so it is done at most once per process. The result is written to a
+small JSON cache file and reused on later starts; an explicit binary can be
+configured to skip the lookup altogether (e.g. on offline hosts).
+"""
+
+import json
+import os
+import subprocess
+import threading
+import time
+
+import config
+from tracing import span
+
+# Replaced as a whole, never mutated, so readers need no lock
+_resolved = None
+# Serializes resolution, which may hit the network; never taken on the event loop
+_lock = threading.Lock()
+
+
+def resolve_chromedriver():
+    """Return the path of the chromedriver binary, resolving it only once"""
+    global _resolved
+    resolved = _resolved
+    if resolved is None:
+        with _lock:
+            if _resolved is None:
+                with span("driver_install"):
+                    _resolved = _resolve()
+            resolved = _resolved
+    return resolved["path"]
+
+
+def invalidate_chromedriver():
+    """Forget the resolved driver, e.g. after Chrome was upgraded"""
+    global _resolved
+    with _lock:
+        if _resolved is not None and _resolved.get("source") == "override":
+            # An explicit override is never second-guessed
+            return
+        _resolved = None
+        try:
+            os.remove(config.CHROMEDRIVER_CACHE_FILE)
+        except OSError:
+            pass
+
+
+def chromedriver_info():
+    """Return the resolved path, version and where it came from; never blocks"""
+    resolved = _resolved
+    return dict(resolved) if resolved else None
+
+
+def _resolve():
+    # 1. Explicit override
+    if config.CHROMEDRIVER_PATH:
+        if not _is_executable(config.CHROMEDRIVER_PATH):
+            raise RuntimeError(
+                f"TRENDYOL_CHROMEDRIVER_PATH is not an executable file: {config.CHROMEDRIVER_PATH}"
+            )
+        return {
+            "path": config.CHROMEDRIVER_PATH,
+            "version": _probe_version(config.CHROMEDRIVER_PATH),
+            "source": "override",
+        }
+
+    # 2. Cache file from a previous run
+    cached = _read_cache()
+    if cached:
+        cached["source"] = "cache"
+        return cached
+
+    # 3. webdriver-manager lookup
+    from webdriver_manager.chrome import ChromeDriverManager
+
+    path = ChromeDriverManager().install()
+    entry = {
+        "path": path,
+        "version": _probe_version(path),
+        "resolved_at": time.time(),
+    }
+    _write_cache(entry)
+    entry["source"] = "webdriver-manager"
+    return entry
+
+
+def _read_cache():
+    try:
+        with open(config.CHROMEDRIVER_CACHE_FILE, encoding="utf-8") as f:
+            entry = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if not isinstance(entry, dict) or not _is_executable(entry.get("path")):
+        return None
+    return entry
+
+
+def _write_cache(entry):
+    cache_dir = os.path.dirname(config.CHROMEDRIVER_CACHE_FILE)
+    try:
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+        tmp_path = config.CHROMEDRIVER_CACHE_FILE + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entry, f, indent=2)
+        os.replace(tmp_path, config.CHROMEDRIVER_CACHE_FILE)
+    except OSError:
+        # The cache is an optimisation only
+        pass
+
+
+def _probe_version(path):
+    try:
+        output = subprocess.run(
+            [path, "--version"], capture_output=True, text=True, timeout=10
+        ).stdout
+    except (OSError, subprocess.SubprocessError):
+        return None
+    # "ChromeDriver 119.0.6045.105 (...)"
+    parts = output.split()
+    return parts[1] if len(parts) > 1 else None
+
+
+def _is_executable(path):
+    return bool(path) and os.path.isfile(path) and os.access(path, os.X_OK)
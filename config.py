@@ -0,0 +1,211 @@
+"""
+Runtime configuration for the Trendyol MCP server.
+
+Every setting can be overridden through an environment variable so that the
+server can be tuned from the MCP client configuration (for example the "env"
+block in claude_desktop_config.json).
+"""
+
+import os
+
+
+def _env_int(name, default):
+    value = os.environ.get(name)
+    if value is None or value.strip() == "":
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        return default
+
+
+def _env_float(name, default):
+    value = os.environ.get(name)
+    if value is None or value.strip() == "":
+        return default
+    try:
+        return float(value)
+    except ValueError:
+        return default
+
+
+def _env_bool(name, default):
+    value = os.environ.get(name)
+    if value is None or value.strip() == "":
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+# Browser identity shared by Chrome and the plain HTTP session
+USER_AGENT = os.environ.get(
+    "TRENDYOL_USER_AGENT",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36",
+)
+
+# Site the scrapers talk to; pointed at a local fixture server by the offline benchmarks
+BASE_URL = (
+    os.environ.get("TRENDYOL_BASE_URL", "https://www.trendyol.com").strip().rstrip("/")
+)
+
+# Chrome WebDriver pool
+# Number of browsers the server keeps warm and leases to tool calls
+DRIVER_POOL_SIZE = max(1, _env_int("TRENDYOL_DRIVER_POOL_SIZE", 2))
+# Seconds an idle browser may sit in the pool before it is shut down (0 = never)
+DRIVER_IDLE_TIMEOUT = _env_float("TRENDYOL_DRIVER_IDLE_TIMEOUT", 300.0)
+# Number of leases after which a browser is recycled (0 = never)
+DRIVER_MAX_USES = _env_int("TRENDYOL_DRIVER_MAX_USES", 50)
+# Clear cookies every time a browser is returned to the pool
+DRIVER_CLEAR_COOKIES = _env_bool("TRENDYOL_DRIVER_CLEAR_COOKIES", False)
+# Launch the pool's browsers when the server starts instead of on first use
+DRIVER_WARM_ON_START = _env_bool("TRENDYOL_DRIVER_WARM_ON_START", True)
+
+# Tool execution
+# Number of tool calls that may run at the same time on worker threads
+TOOL_MAX_CONCURRENCY = max(
+    1, _env_int("TRENDYOL_TOOL_MAX_CONCURRENCY", DRIVER_POOL_SIZE)
+)
+# Number of tool calls allowed to wait for a free worker before new calls are rejected
+TOOL_MAX_QUEUE = max(0, _env_int("TRENDYOL_TOOL_MAX_QUEUE", 16))
+
+# Chromedriver resolution
+# Pre-installed chromedriver binary; skips the webdriver-manager lookup entirely
+CHROMEDRIVER_PATH = os.environ.get("TRENDYOL_CHROMEDRIVER_PATH", "").strip() or None
+# File that remembers the resolved chromedriver across server restarts
+CHROMEDRIVER_CACHE_FILE = os.environ.get(
+    "TRENDYOL_CHROMEDRIVER_CACHE_FILE",
+    os.path.join(
+        os.path.expanduser("~"), ".cache", "trendyol_mcp", "chromedriver.json"
+    ),
+)
+
+# Search scrolling
+# Longest time to wait for new cards after each scroll step
+SCROLL_WAIT_TIMEOUT = _env_float("TRENDYOL_SCROLL_WAIT_TIMEOUT", 3.0)
+# Time with no fetch/XHR in flight after which no more cards are expected for this step
+SCROLL_NETWORK_IDLE = _env_float("TRENDYOL_SCROLL_NETWORK_IDLE", 0.5)
+
+# Search pagination
+# Search result pages fetched at the same time (browser pages are also capped by the pool size)
+SEARCH_PAGE_PARALLELISM = max(1, _env_int("TRENDYOL_SEARCH_PAGE_PARALLELISM", 4))
+# Largest target_count accepted when paginating; scrolling stays capped at 100
+SEARCH_MAX_RESULTS = max(1, _env_int("TRENDYOL_SEARCH_MAX_RESULTS", 1000))
+# Safety net on the number of result pages fetched for one search
+SEARCH_MAX_PAGES = max(1, _env_int("TRENDYOL_SEARCH_MAX_PAGES", 50))
+
+# Product details
+# Extraction attempts while some product fields are still missing
+DETAILS_MAX_ATTEMPTS = max(1, _env_int("TRENDYOL_DETAILS_MAX_ATTEMPTS", 5))
+# Longest wait between attempts for a missing field to appear in the DOM
+DETAILS_RETRY_WAIT = _env_float("TRENDYOL_DETAILS_RETRY_WAIT", 1.0)
+# Longest wait for the product page to finish loading before the first attempt
+DETAILS_READY_TIMEOUT = _env_float("TRENDYOL_DETAILS_READY_TIMEOUT", 5.0)
+
+# Product reviews
+# Reviews returned by get_product_reviews unless the caller asks for more
+REVIEWS_DEFAULT_COUNT = max(1, _env_int("TRENDYOL_REVIEWS_DEFAULT_COUNT", 20))
+# Largest max_reviews accepted by a single call
+REVIEWS_MAX_COUNT = max(1, _env_int("TRENDYOL_REVIEWS_MAX_COUNT", 5000))
+# Longest time to wait for the first reviews to render on the reviews page
+REVIEWS_WAIT_TIMEOUT = _env_float("TRENDYOL_REVIEWS_WAIT_TIMEOUT", 5.0)
+# Longest time to look for the reviews button when the reviews URL cannot be derived
+REVIEWS_BUTTON_TIMEOUT = _env_float("TRENDYOL_REVIEWS_BUTTON_TIMEOUT", 5.0)
+# Reviews backend: "auto" (JSON endpoint, browser on failure), "http" or "browser"
+REVIEWS_BACKEND = os.environ.get("TRENDYOL_REVIEWS_BACKEND", "auto").strip().lower()
+# Reviews JSON endpoint; {content_id} is replaced with the product's content ID
+REVIEWS_API_URL = os.environ.get(
+    "TRENDYOL_REVIEWS_API_URL",
+    "https://public-mdc.trendyol.com/discovery-web-socialgw-service/api/review/{content_id}",
+).strip()
+# Sort order sent to the reviews endpoint; must list the newest reviews first
+# for a `since` cursor to stop the harvest early
+REVIEWS_API_ORDER = os.environ.get("TRENDYOL_REVIEWS_API_ORDER", "5").strip()
+# Review pages fetched at the same time from the JSON endpoint
+REVIEWS_PAGE_PARALLELISM = max(1, _env_int("TRENDYOL_REVIEWS_PAGE_PARALLELISM", 4))
+
+# HTTP backend
+# Search backend: "auto" (HTTP first, browser on failure), "http" or "browser"
+SEARCH_BACKEND = os.environ.get("TRENDYOL_SEARCH_BACKEND", "auto").strip().lower()
+# Timeout in seconds for plain HTTP requests to Trendyol
+HTTP_TIMEOUT = _env_float("TRENDYOL_HTTP_TIMEOUT", 10.0)
+# Connections kept open per host by the shared HTTP session
+HTTP_POOL_SIZE = max(1, _env_int("TRENDYOL_HTTP_POOL_SIZE", 10))
+
+# Product images
+# Gallery images downloaded per get_product_image call unless the caller asks otherwise
+IMAGE_MAX_COUNT = max(1, _env_int("TRENDYOL_IMAGE_MAX_COUNT", 4))
+# Longest side in pixels of the thumbnails returned to the client
+IMAGE_MAX_SIZE = max(16, _env_int("TRENDYOL_IMAGE_MAX_SIZE", 512))
+# Images downloaded at the same time
+IMAGE_DOWNLOAD_PARALLELISM = max(1, _env_int("TRENDYOL_IMAGE_DOWNLOAD_PARALLELISM", 4))
+# Timeout in seconds for each image download
+IMAGE_TIMEOUT = _env_float("TRENDYOL_IMAGE_TIMEOUT", HTTP_TIMEOUT)
+# JPEG quality of the thumbnails
+IMAGE_JPEG_QUALITY = min(95, max(1, _env_int("TRENDYOL_IMAGE_JPEG_QUALITY", 85)))
+# Directory of the on-disk image store (empty string disables it)
+IMAGE_CACHE_DIR = os.environ.get(
+    "TRENDYOL_IMAGE_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "trendyol_mcp", "images"),
+).strip()
+# Size limit of the image store in bytes; least recently used images go first (0 = unbounded)
+IMAGE_CACHE_MAX_BYTES = max(
+    0, _env_int("TRENDYOL_IMAGE_CACHE_MAX_BYTES", 200 * 1024 * 1024)
+)
+# Seconds a stored image is served without asking the CDN whether it changed
+IMAGE_CACHE_TTL = _env_float("TRENDYOL_IMAGE_CACHE_TTL", 86400.0)
+
+# Product URL resolution
+# Number of product name -> product URL mappings kept in memory
+PRODUCT_URL_CACHE_SIZE = max(1, _env_int("TRENDYOL_PRODUCT_URL_CACHE_SIZE", 256))
+# Seconds a resolved product URL stays valid
+PRODUCT_URL_CACHE_TTL = _env_float("TRENDYOL_PRODUCT_URL_CACHE_TTL", 3600.0)
+
+# Batch tools
+# Items of a batch processed at the same time (capped by the driver pool size)
+BATCH_PARALLELISM = max(1, _env_int("TRENDYOL_BATCH_PARALLELISM", DRIVER_POOL_SIZE))
+# Largest number of products accepted by a single batch call
+BATCH_MAX_ITEMS = max(1, _env_int("TRENDYOL_BATCH_MAX_ITEMS", 30))
+
+# Result cache
+# Tool responses kept in the in-memory LRU tier
+RESULT_CACHE_MEMORY_SIZE = max(1, _env_int("TRENDYOL_RESULT_CACHE_MEMORY_SIZE", 256))
+# SQLite file backing the persistent tier (empty string disables it)
+RESULT_CACHE_DB = os.environ.get(
+    "TRENDYOL_RESULT_CACHE_DB",
+    os.path.join(os.path.expanduser("~"), ".cache", "trendyol_mcp", "results.sqlite3"),
+).strip()
+# Seconds a tool response stays fresh; prices change faster than descriptions
+RESULT_CACHE_TTLS = {
+    "search_trendyol": 600.0,
+    "get_product_details": 1800.0,
+    "get_product_image": 86400.0,
+    "get_product_reviews": 3600.0,
+    "get_product_bundle": 1800.0,
+    "get_product_details_batch": 1800.0,
+    "get_product_reviews_batch": 3600.0,
+}
+# Per-tool overrides, e.g. "search_trendyol=300,get_product_image=0" (0 = do not cache)
+for _item in os.environ.get("TRENDYOL_RESULT_CACHE_TTLS", "").split(","):
+    _tool, _, _ttl = _item.partition("=")
+    try:
+        RESULT_CACHE_TTLS[_tool.strip()] = float(_ttl)
+    except ValueError:
+        continue
+
+# Selector ordering
+# File recording selector hits and misses across restarts (empty string keeps them in memory only)
+SELECTOR_STATS_FILE = os.environ.get(
+    "TRENDYOL_SELECTOR_STATS_FILE",
+    os.path.join(os.path.expanduser("~"), ".cache", "trendyol_mcp", "selectors.json"),
+).strip()
+# Try the most recently successful selector of every fallback list first
+SELECTOR_ADAPTIVE = _env_bool("TRENDYOL_SELECTOR_ADAPTIVE", True)
+# Consecutive lookups in which no selector of a list matched before an alert is raised
+SELECTOR_FAILURE_ALERT = max(1, _env_int("TRENDYOL_SELECTOR_FAILURE_ALERT", 3))
+# Seconds between writes of the selector statistics file
+SELECTOR_SAVE_INTERVAL = max(0.0, _env_float("TRENDYOL_SELECTOR_SAVE_INTERVAL", 30.0))
+
+# Metrics
+# Prometheus text file rewritten after every tool call (empty string disables it)
+METRICS_FILE = os.environ.get("TRENDYOL_METRICS_FILE", "").strip()
+# Most recent tool call traces reported by get_server_metrics
+METRICS_TRACE_HISTORY = max(0, _env_int("TRENDYOL_METRICS_TRACE_HISTORY", 20))
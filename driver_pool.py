@@ -0,0 +1,290 @@
+"""
+Warm Chrome WebDriver pool shared by all Trendyol tools.
+
+Launching Chrome dominates the latency of a tool call, so the server keeps a
+small number of browsers alive and leases one to each call. Browsers are
+reset when they are returned and recycled after a configurable number of uses
+or once they have been idle for too long; a background thread shuts idle
+browsers down even while no calls arrive.
+"""
+
+import atexit
+import threading
+import time
+from contextlib import contextmanager
+
+from selenium import webdriver
+from selenium.common.exceptions import SessionNotCreatedException
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+
+import config
+from chromedriver_cache import invalidate_chromedriver, resolve_chromedriver
+from tracing import span
+
+
+def build_chrome_options():
+    """Build the Chrome options shared by every pooled browser"""
+    options = Options()
+    # Remove headless mode to avoid detection
+    # options.add_argument("--headless")
+    options.add_argument("--disable-gpu")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument("--disable-blink-features=AutomationControlled")
+    options.add_experimental_option("excludeSwitches", ["enable-automation"])
+    options.add_experimental_option("useAutomationExtension", False)
+    options.add_argument(f"--user-agent={config.USER_AGENT}")
+    return options
+
+
+def create_driver():
+    """Launch a new Chrome WebDriver with the stealth settings applied"""
+    # The chromedriver binary is resolved once and cached across restarts
+    service = Service(resolve_chromedriver())
+    try:
+        with span("browser_launch"):
+            driver = webdriver.Chrome(service=service, options=build_chrome_options())
+    except SessionNotCreatedException:
+        # A cached driver no longer matches the installed Chrome, resolve again
+        invalidate_chromedriver()
+        service = Service(resolve_chromedriver())
+        with span("browser_launch"):
+            driver = webdriver.Chrome(service=service, options=build_chrome_options())
+
+    # Add stealth settings
+    driver.execute_script(
+        "Object.defineProperty(navigator, 'webdriver', {get: () => undefined})"
+    )
+    return driver
+
+
+class _PooledDriver:
+    __slots__ = ("driver", "uses", "last_used")
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.uses = 0
+        self.last_used = time.monotonic()
+
+
+class DriverPool:
+    """A bounded pool of warm Chrome WebDriver instances"""
+
+    def __init__(
+        self,
+        size=config.DRIVER_POOL_SIZE,
+        idle_timeout=config.DRIVER_IDLE_TIMEOUT,
+        max_uses=config.DRIVER_MAX_USES,
+        clear_cookies=config.DRIVER_CLEAR_COOKIES,
+        driver_factory=create_driver,
+    ):
+        self.size = max(1, size)
+        self.idle_timeout = idle_timeout
+        self.max_uses = max_uses
+        self.clear_cookies = clear_cookies
+        self._driver_factory = driver_factory
+        self._idle = []
+        self._leased = 0
+        self._closed = False
+        self._condition = threading.Condition()
+        self._reaper = None
+
+    def warm_up(self, count=None):
+        """Launch browsers until the pool holds `count` (default: pool size)"""
+        count = self.size if count is None else min(count, self.size)
+        while True:
+            with self._condition:
+                if self._closed or len(self._idle) + self._leased >= count:
+                    return
+                # Reserve the slot before launching Chrome outside the lock
+                self._leased += 1
+            entry = None
+            try:
+                entry = _PooledDriver(self._driver_factory())
+            finally:
+                with self._condition:
+                    self._leased -= 1
+                    if entry is not None:
+                        self._idle.append(entry)
+                        self._start_reaper()
+                    self._condition.notify()
+
+    @contextmanager
+    def lease(self, clear_cookies=None):
+        """Lease a browser for the duration of the `with` block"""
+        with span("lease"):
+            entry = self._acquire()
+        broken = False
+        try:
+            yield entry.driver
+        except BaseException:
+            # The browser may be in an unknown state, do not hand it out again
+            broken = True
+            raise
+        finally:
+            self._release(entry, clear_cookies, broken)
+
+    def stats(self):
+        """Return the current pool occupancy"""
+        with self._condition:
+            return {
+                "size": self.size,
+                "idle": len(self._idle),
+                "leased": self._leased,
+            }
+
+    def close(self):
+        """Quit every idle browser and refuse further leases"""
+        with self._condition:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._condition.notify_all()
+        for entry in idle:
+            self._quit(entry)
+
+    def _acquire(self):
+        expired = []
+        with self._condition:
+            while True:
+                if self._closed:
+                    raise RuntimeError("Driver pool is closed")
+
+                expired.extend(self._pop_expired())
+
+                if self._idle:
+                    # Most recently used browser first, it is the warmest
+                    entry = self._idle.pop()
+                    self._leased += 1
+                    break
+
+                if self._leased < self.size:
+                    entry = None
+                    self._leased += 1
+                    break
+
+                self._condition.wait()
+
+        for stale in expired:
+            self._quit(stale)
+
+        if entry is None:
+            try:
+                entry = _PooledDriver(self._driver_factory())
+            except BaseException:
+                with self._condition:
+                    self._leased -= 1
+                    self._condition.notify()
+                raise
+
+        entry.uses += 1
+        return entry
+
+    def _release(self, entry, clear_cookies, broken):
+        if clear_cookies is None:
+            clear_cookies = self.clear_cookies
+
+        recycle = broken or self._closed
+        if self.max_uses and entry.uses >= self.max_uses:
+            recycle = True
+
+        if not recycle:
+            try:
+                self._reset(entry.driver, clear_cookies)
+            except Exception:
+                recycle = True
+
+        if recycle:
+            self._quit(entry)
+
+        with self._condition:
+            self._leased -= 1
+            if not recycle:
+                entry.last_used = time.monotonic()
+                self._idle.append(entry)
+                self._start_reaper()
+            self._condition.notify()
+
+    def _pop_expired(self):
+        if not self.idle_timeout or self.idle_timeout <= 0:
+            return []
+        now = time.monotonic()
+        fresh = []
+        expired = []
+        for entry in self._idle:
+            if now - entry.last_used > self.idle_timeout:
+                expired.append(entry)
+            else:
+                fresh.append(entry)
+        self._idle = fresh
+        return expired
+
+    def _start_reaper(self):
+        # Called with self._condition held
+        if self._reaper is None and self.idle_timeout and self.idle_timeout > 0:
+            self._reaper = threading.Thread(
+                target=self._reap_idle, name="trendyol-driver-reaper", daemon=True
+            )
+            self._reaper.start()
+
+    def _reap_idle(self):
+        """Quit browsers as they pass the idle timeout, until the pool closes"""
+        while True:
+            with self._condition:
+                if self._closed:
+                    return
+                expired = self._pop_expired()
+                if not expired:
+                    if self._idle:
+                        oldest = min(entry.last_used for entry in self._idle)
+                        delay = oldest + self.idle_timeout - time.monotonic()
+                    else:
+                        delay = self.idle_timeout
+                    self._condition.wait(max(delay, 0) + 0.05)
+            for entry in expired:
+                self._quit(entry)
+
+    @staticmethod
+    def _reset(driver, clear_cookies):
+        """Close extra tabs and park the browser on a blank page"""
+        handles = driver.window_handles
+        for handle in handles[1:]:
+            driver.switch_to.window(handle)
+            driver.close()
+        driver.switch_to.window(handles[0])
+        if clear_cookies:
+            driver.delete_all_cookies()
+        driver.get("about:blank")
+
+    @staticmethod
+    def _quit(entry):
+        try:
+            entry.driver.quit()
+        except Exception:
+            pass
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_driver_pool():
+    """Return the process-wide driver pool, creating it on first use"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = DriverPool()
+            atexit.register(_pool.close)
+        return _pool
+
+
+def driver_pool_stats():
+    """Return the occupancy of the process-wide pool, or None before it exists"""
+    with _pool_lock:
+        pool = _pool
+    return pool.stats() if pool is not None else None
+
+
+def lease_driver(clear_cookies=None):
+    """Lease a browser from the process-wide pool"""
+    return get_driver_pool().lease(clear_cookies=clear_cookies)
@@ -0,0 +1,63 @@
+from driver_pool import lease_driver
+from models import BUNDLE_SECTIONS, ProductBundle
+from product_resolver import open_product_page
+from get_product_details import (
+    extract_product_details_with_retry,
+    render_product_details,
+)
+from get_product_image import extract_product_images, render_product_images
+from get_product_reviews import collect_product_reviews, render_product_reviews
+from tracing import span
+
+
+def get_product_bundle(
+    product_name=None, product_url=None, content_id=None, sections=BUNDLE_SECTIONS
+):
+    """
+    Open the product page once and run the selected extractors against it.
+    Returns a ProductBundle, or None if the product was not found.
+    Reviews run last because reaching them navigates away from the product page.
+    """
+    sections = [section for section in BUNDLE_SECTIONS if section in sections]
+
+    try:
+        with lease_driver() as driver:
+            # Go to the product page, straight from the cache when possible
+            if open_product_page(driver, product_name, product_url, content_id):
+                bundle = ProductBundle(url=driver.current_url)
+
+                if "details" in sections:
+                    bundle.details = extract_product_details_with_retry(driver)
+
+                if "images" in sections:
+                    # Lists the gallery; the image itself is not downloaded here
+                    with span("extract"):
+                        bundle.images = extract_product_images(driver)
+
+                if "reviews" in sections:
+                    bundle.reviews = collect_product_reviews(driver)
+
+                return bundle
+
+    except Exception as e:
+        pass
+
+    return None
+
+
+def render_product_bundle(bundle):
+    """Render a ProductBundle as the text layouts of its sections"""
+    parts = []
+    if bundle.details is not None:
+        parts.append(render_product_details(bundle.details))
+    if bundle.images is not None:
+        parts.append(render_product_images(bundle.images))
+    if bundle.reviews is not None:
+        parts.append(render_product_reviews(bundle.reviews))
+    return "\n".join(parts)
+
+
+if __name__ == "__main__":
+    bundle = get_product_bundle("laptop")
+    if bundle:
+        print(render_product_bundle(bundle))
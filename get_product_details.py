@@ -1,306 +1,380 @@
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.chrome.service import Service
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.support.ui import WebDriverWait
 import time
 
+import config
+from batch import render_batch_results, run_batch
+from driver_pool import lease_driver
+from models import ProductDetails
+from product_resolver import open_product_page
+from selector_registry import ordered_selectors, record_selector
+from tracing import span
+
+# Selector fallback lists per field, tried most recently successful first
+DETAIL_FIELDS = {
+    "title": [".product-title"],
+    "price": [
+        ".prc-box-dscntd",
+        ".prc-box-sllng",
+        "[class*='price']",
+        ".price-current",
+        "[data-test-id='price-current-price']",
+    ],
+    "description": [".content-description-container"],
+    "features": [
+        ".attribute-item",
+        ".detail-attr li",
+        ".product-features li",
+        "[class*='feature'] li",
+    ],
+    "rating": [
+        ".rating-score",
+        "[class*='rating']",
+        ".star-rating",
+        "[data-test-id='rating']",
+    ],
+    "brand": ["a.product-title-brand-name-anchor"],
+    "stock": [
+        ".stock-info",
+        "[class*='stock']",
+        ".availability",
+        "[data-test-id*='stock']",
+    ],
+}
+
+# Fields whose selectors are ordered by preference, not only by cost
+FIXED_ORDER_FIELDS = {"price"}
+
+# Features kept per product
+MAX_FEATURES = 15
+
+# Reads every requested field in one round trip. Text fields take the first
+# selector whose first match has text. The description groups every rendered
+# text node under its nearest block ancestor, so each piece of text appears in
+# exactly one block and wrappers do not repeat their children's text.
+# Features come back as key/value pairs. Both are de-duplicated with a Set in
+# one pass. Also reports which selector matched each field.
+EXTRACT_DETAILS_SCRIPT = """
+const [fields, maxFeatures] = arguments;
+const hits = {};
+const BLOCK_TAGS = new Set([
+    "P", "DIV", "LI", "UL", "OL", "H1", "H2", "H3", "H4", "H5", "H6",
+    "TABLE", "TR", "TD", "TH", "SECTION", "ARTICLE", "BLOCKQUOTE", "PRE",
+]);
+
+function text(element) {
+    return element ? (element.innerText || "").trim() : "";
+}
+
+function firstText(field, selectors) {
+    for (const selector of selectors) {
+        const value = text(document.querySelector(selector));
+        if (value) {
+            hits[field] = selector;
+            return value;
+        }
+    }
+    return null;
+}
+
+function description(field, selectors) {
+    for (const selector of selectors) {
+        const container = document.querySelector(selector);
+        if (!container) continue;
+
+        // Text parts per nearest block ancestor, in document order
+        const parts = new Map();
+        const walker = document.createTreeWalker(
+            container, NodeFilter.SHOW_TEXT | NodeFilter.SHOW_ELEMENT
+        );
+        for (let node = walker.nextNode(); node; node = walker.nextNode()) {
+            const element = node.nodeType === Node.TEXT_NODE ? node.parentElement : node;
+            if (element.closest("script, style, noscript, template")) continue;
+            if (node.nodeType === Node.ELEMENT_NODE && node.tagName !== "BR") continue;
+            if (node.nodeType === Node.TEXT_NODE) {
+                // Hidden text is left out, as innerText does
+                if (!element.getClientRects().length) continue;
+            }
+            let block = node.nodeType === Node.TEXT_NODE ? element : node.parentElement;
+            while (block !== container && !BLOCK_TAGS.has(block.tagName)) {
+                block = block.parentElement;
+            }
+            if (!parts.has(block)) parts.set(block, []);
+            parts.get(block).push(node.nodeType === Node.TEXT_NODE ? node.data : "\\n");
+        }
+
+        const blocks = [];
+        const seen = new Set();
+        for (const pieces of parts.values()) {
+            const value = pieces
+                .join("")
+                .split("\\n")
+                .map((line) => line.replace(/\\s+/g, " ").trim())
+                .filter(Boolean)
+                .join("\\n");
+            if (value && !seen.has(value)) {
+                seen.add(value);
+                blocks.push(value);
+            }
+        }
+
+        const value = blocks.length ? blocks.join("\\n") : text(container);
+        if (value) {
+            hits[field] = selector;
+            return value;
+        }
+    }
+    return null;
+}
+
+function feature(item) {
+    // Attribute items hold the key and the value in separate children or lines
+    const parts = Array.from(item.children).map(text).filter(Boolean);
+    let key = null;
+    let value = null;
+    if (parts.length >= 2) {
+        key = parts[0];
+        value = parts.slice(1).join(" ");
+    } else {
+        const match = text(item).match(/^([^:\\n]+)[:\\n]\\s*([\\s\\S]+)$/);
+        if (match) {
+            key = match[1].trim();
+            value = match[2].trim().replace(/\\s*\\n\\s*/g, " ");
+        }
+    }
+    const display = key ? `${key}: ${value}` : text(item).replace(/\\s*\\n\\s*/g, " ");
+    return {text: display, key: key, value: value};
+}
+
+function features(field, selectors) {
+    const values = [];
+    const seen = new Set();
+    const items = document.querySelectorAll(selectors.join(", "));
+    if (items.length) hits[field] = selectors.find((selector) => items[0].matches(selector));
+    for (const item of items) {
+        if (values.length >= maxFeatures) break;
+        const entry = feature(item);
+        if (entry.text && !seen.has(entry.text)) {
+            seen.add(entry.text);
+            values.push(entry);
+        }
+    }
+    return values.length ? values : null;
+}
+
+const values = {};
+for (const [field, selectors] of Object.entries(fields)) {
+    if (field === "features") {
+        values[field] = features(field, selectors);
+    } else if (field === "description") {
+        values[field] = description(field, selectors);
+    } else {
+        values[field] = firstText(field, selectors);
+    }
+}
+return {values: values, selectors: hits};
+"""
+
+# True once any of the selectors matches an element with text
+FIELDS_PRESENT_SCRIPT = """
+return arguments[0].some((selector) => {
+    const element = document.querySelector(selector);
+    return element && (element.innerText || "").trim() !== "";
+});
+"""
+
+
+def get_product_details(product_name=None, product_url=None, content_id=None):
+    """Return the ProductDetails of a product, or None if it was not found"""
+    try:
+        with lease_driver() as driver:
+            # Go to the product page, straight from the cache when possible
+            if open_product_page(driver, product_name, product_url, content_id):
+                return extract_product_details_with_retry(driver)
 
-def get_product_details(product_name):
-    url = f"https://www.trendyol.com/sr?q={product_name}"
+    except Exception as e:
+        pass
 
-    options = Options()
-    # Remove headless mode to avoid detection
-    # options.add_argument("--headless")
-    options.add_argument("--disable-gpu")
-    options.add_argument("--no-sandbox")
-    options.add_argument("--disable-dev-shm-usage")
-    options.add_argument("--disable-blink-features=AutomationControlled")
-    options.add_experimental_option("excludeSwitches", ["enable-automation"])
-    options.add_experimental_option("useAutomationExtension", False)
-    options.add_argument(
-        "--user-agent=Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36"
-    )
+    return None
 
-    try:
-        # Initialize the WebDriver with webdriver-manager
-        service = Service(ChromeDriverManager().install())
-        driver = webdriver.Chrome(service=service, options=options)
 
-        # Add stealth settings
-        driver.execute_script(
-            "Object.defineProperty(navigator, 'webdriver', {get: () => undefined})"
-        )
+def get_product_details_batch(product_names, parallelism=None):
+    """Get details of several products in parallel; returns BatchItems in input order"""
+    return run_batch(_product_details_item, product_names, parallelism)
 
-        driver.get(url)
-
-        # Try to find product containers
-        container_selectors = [
-            ".p-card-wrppr",
-            "[class*='product-item']",
-            "[class*='product-card']",
-            ".product-down",
-            "[data-test-id*='product']",
-        ]
-
-        first_product_found = False
-
-        for container_selector in container_selectors:
-            containers = driver.find_elements(By.CSS_SELECTOR, container_selector)
-
-            if len(containers) > 0:
-                first_product_found = True
-                first_container = containers[0]
-
-                # Look for clickable link within the first container
-                link_selectors = [
-                    "a[href*='/p/']",  # Trendyol product links contain '/p/'
-                    "a",
-                    "[href*='product']",
-                    ".p-card-wrppr a",
-                ]
-
-                product_link = None
-                for link_sel in link_selectors:
-                    try:
-                        product_link = first_container.find_element(
-                            By.CSS_SELECTOR, link_sel
-                        )
-                        href = product_link.get_attribute("href")
-                        if href and ("/p/" in href or "product" in href.lower()):
-                            break
-                    except:
-                        continue
-
-                if not product_link:
-                    product_link = first_container
-
-                # Store current window handle
-                main_window = driver.current_window_handle
-
-                # Scroll to element first
-                driver.execute_script(
-                    "arguments[0].scrollIntoView(true);", product_link
-                )
-                # Click using JavaScript to avoid interception
-                driver.execute_script("arguments[0].click();", product_link)
-
-                # Switch to the new tab (product page)
-                all_windows = driver.window_handles
-                if len(all_windows) > 1:
-                    # Switch to the new tab
-                    for window in all_windows:
-                        if window != main_window:
-                            driver.switch_to.window(window)
-                            break
-
-                # Extract product details from the product page with retry logic
-                product_details = {}
-                limit_attempts = 5
-                expected_elements = [
-                    "title",
-                    "price",
-                    "description",
-                    "features",
-                    "rating",
-                    "brand",
-                    "stock",
-                ]
-
-                while limit_attempts > 0:
-                    product_details = extract_product_page_details(driver)
-
-                    # Check which elements are missing
-                    missing_elements = []
-                    for element in expected_elements:
-                        if (
-                            element not in product_details
-                            or not product_details[element]
-                        ):
-                            missing_elements.append(element)
-
-                    if not missing_elements:
-                        break
-
-                    limit_attempts -= 1
-                    time.sleep(1)
-
-                print_product_details(product_details)
-
-                break
-
-        driver.quit()
 
-    except Exception as e:
-        if "driver" in locals():
-            driver.quit()
+def _product_details_item(product_name):
+    with lease_driver() as driver:
+        found = open_product_page(driver, product_name)
+        if found:
+            return extract_product_details_with_retry(driver)
+
+    raise LookupError(f"No product found for '{product_name}'")
 
 
-def extract_product_page_details(driver):
-    """Extract detailed product information from the product page"""
+def extract_product_details_with_retry(
+    driver,
+    max_attempts=config.DETAILS_MAX_ATTEMPTS,
+    retry_wait=config.DETAILS_RETRY_WAIT,
+):
+    """
+    Extract ProductDetails with one script per attempt. Later attempts only
+    re-query the fields that are still missing, after waiting for one of them
+    to appear in the DOM. Per-field attempts and time-to-value are reported in
+    `field_stats`.
+    """
+    started = time.monotonic()
+    with span("wait"):
+        _wait_for_document_ready(driver)
+
     details = {}
+    selector_hits = {}
+    field_stats = {
+        field: {"attempts": 0, "seconds": 0.0, "found": False}
+        for field in DETAIL_FIELDS
+    }
+    missing = list(DETAIL_FIELDS)
+
+    for attempt in range(max_attempts):
+        if attempt:
+            # Wait for the DOM to produce a missing field instead of sleeping
+            with span("wait"):
+                _wait_for_any_field(driver, missing, retry_wait)
+
+        values = extract_product_page_details(driver, missing, selector_hits)
+        details.update(values)
+        elapsed = time.monotonic() - started
+        for field in missing:
+            stats = field_stats[field]
+            stats["attempts"] += 1
+            stats["seconds"] = round(elapsed, 3)
+            stats["found"] = bool(values.get(field))
+
+        missing = [field for field in missing if not details.get(field)]
+        if not missing:
+            break
+
+    # Only the final outcome counts; early misses are usually just slow rendering
+    for field, (tried, hit) in selector_hits.items():
+        record_selector("product", field, tried, hit)
+
+    return ProductDetails(url=driver.current_url, field_stats=field_stats, **details)
+
+
+def extract_product_page_details(driver, fields=None, selector_hits=None):
+    """
+    Extract the requested fields (all by default) from the product page in
+    one execute_script call. Missing fields are left out of the result.
+    `selector_hits`, if given, receives (selectors tried, selector matched)
+    per requested field.
+    """
+    fields = list(DETAIL_FIELDS) if fields is None else fields
+    field_selectors = {
+        field: ordered_selectors(
+            "product", field, DETAIL_FIELDS[field], fixed=field in FIXED_ORDER_FIELDS
+        )
+        for field in fields
+    }
+    try:
+        with span("extract"):
+            result = driver.execute_script(
+                EXTRACT_DETAILS_SCRIPT, field_selectors, MAX_FEATURES
+            )
+    except Exception as e:
+        return {}
+
+    result = result or {}
+    if selector_hits is not None:
+        hits = result.get("selectors") or {}
+        for field, selectors in field_selectors.items():
+            selector_hits[field] = (selectors, hits.get(field))
+
+    values = {
+        field: value for field, value in (result.get("values") or {}).items() if value
+    }
+    if "features" in values:
+        entries = values["features"]
+        values["features"] = [entry["text"] for entry in entries]
+        values["attributes"] = {
+            entry["key"]: entry["value"] for entry in entries if entry["key"]
+        }
+    return values
+
+
+def _wait_for_document_ready(driver, timeout=config.DETAILS_READY_TIMEOUT):
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=0.1).until(
+            lambda driver: driver.execute_script("return document.readyState")
+            == "complete"
+        )
+    except TimeoutException:
+        pass
 
+
+def _wait_for_any_field(driver, fields, timeout):
     try:
-        # Product title
-        title_selectors = [".product-title"]
-
-        for selector in title_selectors:
-            try:
-                title_element = driver.find_element(By.CSS_SELECTOR, selector)
-                details["title"] = title_element.text.strip()
-                break
-            except:
-                continue
-
-        # Product price
-        price_selectors = [
-            ".prc-box-dscntd",
-            ".prc-box-sllng",
-            "[class*='price']",
-            ".price-current",
-            "[data-test-id='price-current-price']",
-        ]
-
-        for selector in price_selectors:
-            try:
-                price_element = driver.find_element(By.CSS_SELECTOR, selector)
-                details["price"] = price_element.text.strip()
-                break
-            except:
-                continue
-
-        # Product description
-        description_selectors = [".content-description-container"]
-
-        for selector in description_selectors:
-            try:
-                desc_element = driver.find_element(By.CSS_SELECTOR, selector)
-                # If it's the content-description-container, get all child elements text
-                if "content-description-container" in selector:
-                    # Get all text content from child elements
-                    child_elements = desc_element.find_elements(By.CSS_SELECTOR, "*")
-                    description_parts = []
-                    for child in child_elements:
-                        child_text = child.text.strip()
-                        if child_text and child_text not in description_parts:
-                            description_parts.append(child_text)
-                    if description_parts:
-                        details["description"] = "\n".join(description_parts)
-                    else:
-                        details["description"] = desc_element.text.strip()
-                else:
-                    details["description"] = desc_element.text.strip()
-                break
-            except:
-                continue
-
-        # Product features/specifications
-        try:
-            features_elements = driver.find_elements(
-                By.CSS_SELECTOR,
-                ".attribute-item, .detail-attr li, .product-features li, [class*='feature'] li",
+        WebDriverWait(driver, timeout, poll_frequency=0.1).until(
+            lambda driver: driver.execute_script(
+                FIELDS_PRESENT_SCRIPT,
+                [selector for field in fields for selector in DETAIL_FIELDS[field]],
             )
-            if features_elements:
-                features = []
-                for feature in features_elements[:15]:  # Get first 15 features
-                    feature_text = feature.text.strip()
-                    if feature_text:
-                        # For attribute-item divs, the text might contain both key and value
-                        # Clean up the text to make it more readable
-                        if "attribute-item" in feature.get_attribute("class"):
-                            # Split by common separators and clean up
-                            if ":" in feature_text:
-                                feature_text = feature_text.replace(":", ": ")
-                            elif "\n" in feature_text:
-                                feature_text = feature_text.replace("\n", ": ")
-
-                        if feature_text not in features:
-                            features.append(feature_text)
-                details["features"] = features
-        except:
-            pass
-
-        # Product rating
-        rating_selectors = [
-            ".rating-score",
-            "[class*='rating']",
-            ".star-rating",
-            "[data-test-id='rating']",
-        ]
-
-        for selector in rating_selectors:
-            try:
-                rating_element = driver.find_element(By.CSS_SELECTOR, selector)
-                details["rating"] = rating_element.text.strip()
-                break
-            except:
-                continue
-
-        # Brand
-        brand_selectors = ["a.product-title-brand-name-anchor"]
-
-        for selector in brand_selectors:
-            try:
-                brand_element = driver.find_element(By.CSS_SELECTOR, selector)
-                details["brand"] = brand_element.text.strip()
-                break
-            except:
-                continue
-
-        # Stock status
-        stock_selectors = [
-            ".stock-info",
-            "[class*='stock']",
-            ".availability",
-            "[data-test-id*='stock']",
-        ]
-
-        for selector in stock_selectors:
-            try:
-                stock_element = driver.find_element(By.CSS_SELECTOR, selector)
-                details["stock"] = stock_element.text.strip()
-                break
-            except:
-                continue
-
-    except:
+        )
+    except TimeoutException:
         pass
 
-    return details
 
+def render_product_details(details):
+    """Render ProductDetails in the formatted text layout"""
+    lines = ["", "=" * 60, "PRODUCT DETAILS", "=" * 60]
 
-def print_product_details(details):
-    """Print the extracted product details in a formatted way"""
-    print("\n" + "=" * 60)
-    print("PRODUCT DETAILS")
-    print("=" * 60)
+    if details.title:
+        lines.append(f"Title: {details.title}")
 
-    if "title" in details:
-        print(f"Title: {details['title']}")
+    if details.brand:
+        lines.append(f"Brand: {details.brand}")
 
-    if "brand" in details:
-        print(f"Brand: {details['brand']}")
+    if details.price:
+        lines.append(f"Price: {details.price}")
 
-    if "price" in details:
-        print(f"Price: {details['price']}")
+    if details.rating:
+        lines.append(f"Rating: {details.rating}")
 
-    if "rating" in details:
-        print(f"Rating: {details['rating']}")
+    if details.stock:
+        lines.append(f"Stock: {details.stock}")
 
-    if "stock" in details:
-        print(f"Stock: {details['stock']}")
+    if details.description:
+        lines.append("\nDescription:")
+        lines.append(details.description)
 
-    if "description" in details:
-        print(f"\nDescription:")
-        print(f"{details['description']}")
+    if details.features:
+        lines.append("\nFeatures:")
+        for i, feature in enumerate(details.features, 1):
+            lines.append(f"  {i}. {feature}")
 
-    if "features" in details and details["features"]:
-        print(f"\nFeatures:")
-        for i, feature in enumerate(details["features"], 1):
-            print(f"  {i}. {feature}")
+    if details.field_stats:
+        lines.append("\nExtraction:")
+        for field, stats in details.field_stats.items():
+            status = "found" if stats["found"] else "missing"
+            lines.append(
+                f"  {field}: {status} after {stats['seconds']:.2f}s "
+                f"({stats['attempts']} attempts)"
+            )
 
-    print("=" * 60)
+    lines.append("=" * 60)
+    return "\n".join(lines)
+
+
+def render_product_details_batch(items):
+    """Render the BatchItems of get_product_details_batch"""
+    return render_batch_results(items, "PRODUCT DETAILS BATCH", render_product_details)
+
+
+def print_product_details(details):
+    """Print the extracted product details in a formatted way"""
+    print(render_product_details(details))
 
 
 if __name__ == "__main__":
-    get_product_details("laptop")
+    details = get_product_details("laptop")
+    if details:
+        print_product_details(details)
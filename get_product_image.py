@@ -1,121 +1,78 @@
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.chrome.service import Service
-import time
-import requests
-import matplotlib.pyplot as plt
-from PIL import Image
-from io import BytesIO
-
-
-def get_product_image(product_name):
-    url = f"https://www.trendyol.com/sr?q={product_name}"
-
-    options = Options()
-    # Remove headless mode to avoid detection
-    # options.add_argument("--headless")
-    options.add_argument("--disable-gpu")
-    options.add_argument("--no-sandbox")
-    options.add_argument("--disable-dev-shm-usage")
-    options.add_argument("--disable-blink-features=AutomationControlled")
-    options.add_experimental_option("excludeSwitches", ["enable-automation"])
-    options.add_experimental_option("useAutomationExtension", False)
-    options.add_argument(
-        "--user-agent=Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36"
-    )
 
+import config
+from driver_pool import lease_driver
+from image_download import download_images
+from models import ProductImage, ProductImages
+from product_resolver import open_product_page
+from selector_registry import ordered_selectors, record_selector
+from tracing import span
+
+# Image containers or images used when the gallery carousel is missing,
+# tried most recently successful first
+IMAGE_FALLBACK_SELECTORS = [
+    "[class*='image-gallery']",
+    "[class*='product-image']",
+    ".product-photos",
+    "img[class*='product']",
+    "main img",
+]
+
+
+def get_product_image(
+    product_name=None,
+    product_url=None,
+    content_id=None,
+    max_images=config.IMAGE_MAX_COUNT,
+    max_size=config.IMAGE_MAX_SIZE,
+):
+    """
+    Return the ProductImages of a product with the first `max_images` gallery
+    images downloaded and thumbnailed to fit `max_size` pixels, or None if the
+    product was not found
+    """
+    product_images = None
     try:
-        service = Service(ChromeDriverManager().install())
-        driver = webdriver.Chrome(service=service, options=options)
+        with lease_driver() as driver:
+            # Go to the product page, straight from the cache when possible
+            if open_product_page(driver, product_name, product_url, content_id):
+                # Extract product images from the product page
+                with span("extract"):
+                    product_images = extract_product_images(driver)
 
-        # Add stealth settings
-        driver.execute_script(
-            "Object.defineProperty(navigator, 'webdriver', {get: () => undefined})"
-        )
-
-        driver.get(url)
-
-        # Try to find product containers
-        container_selectors = [
-            ".p-card-wrppr",
-            "[class*='product-item']",
-            "[class*='product-card']",
-            ".product-down",
-            "[data-test-id*='product']",
-        ]
-
-        first_product_found = False
-
-        for container_selector in container_selectors:
-            containers = driver.find_elements(By.CSS_SELECTOR, container_selector)
-
-            if len(containers) > 0:
-                first_product_found = True
-                first_container = containers[0]
-
-                # Look for clickable link within the first container
-                link_selectors = [
-                    "a[href*='/p/']",  # Trendyol product links contain '/p/'
-                    "a",
-                    "[href*='product']",
-                    ".p-card-wrppr a",
-                ]
-
-                product_link = None
-                for link_sel in link_selectors:
-                    try:
-                        product_link = first_container.find_element(
-                            By.CSS_SELECTOR, link_sel
-                        )
-                        href = product_link.get_attribute("href")
-                        if href and ("/p/" in href or "product" in href.lower()):
-                            break
-                    except:
-                        continue
-
-                if not product_link:
-                    product_link = first_container
-
-                # Store current window handle
-                main_window = driver.current_window_handle
+    except Exception as e:
+        pass
 
-                # Scroll to element first
-                driver.execute_script(
-                    "arguments[0].scrollIntoView(true);", product_link
-                )
-                # Click using JavaScript to avoid interception
-                driver.execute_script("arguments[0].click();", product_link)
-
-                # Switch to the new tab (product page)
-                all_windows = driver.window_handles
-                if len(all_windows) > 1:
-                    # Switch to the new tab
-                    for window in all_windows:
-                        if window != main_window:
-                            driver.switch_to.window(window)
-                            break
+    if product_images is None:
+        return None
 
-                # Extract product image from the product page
-                image_url = extract_and_display_product_image(driver)
+    # Download after the browser went back to the pool
+    add_image_downloads(product_images, max_images, max_size)
+    return product_images
 
-                # Download and display the image if URL is found
-                if image_url:
-                    download_and_show_image(image_url)
 
-                break
+def add_image_downloads(
+    product_images, max_images=config.IMAGE_MAX_COUNT, max_size=config.IMAGE_MAX_SIZE
+):
+    """Download the first `max_images` gallery images into `product_images`"""
+    urls = []
+    for image in product_images.images:
+        if image.src and image.src not in urls:
+            urls.append(image.src)
+    urls = urls[:max_images]
 
-        driver.quit()
+    for info, thumbnail in download_images(urls, max_size):
+        product_images.downloads.append(info)
+        if thumbnail is not None:
+            product_images.thumbnails.append(thumbnail)
 
-    except Exception as e:
-        if "driver" in locals():
-            driver.quit()
+    if product_images.downloads:
+        product_images.main_image = product_images.downloads[0]
 
 
-def extract_and_display_product_image(driver):
-    """Extract and display product image from the product-image-gallery-carousel element"""
-    main_image_url = None
+def extract_product_images(driver):
+    """Extract the gallery images from the product-image-gallery-carousel element"""
+    product_images = ProductImages(url=driver.current_url)
 
     try:
         # First try to find the specific carousel element
@@ -128,49 +85,28 @@ def extract_and_display_product_image(driver):
             img_elements = carousel_element.find_elements(By.TAG_NAME, "img")
 
             if img_elements:
-                # Display all images found in the carousel
-                for i, img in enumerate(img_elements):
+                # Collect all images found in the carousel
+                for img in img_elements:
                     img_src = img.get_attribute("src")
-                    img_alt = img.get_attribute("alt")
-                    img_class = img.get_attribute("class")
-
                     if img_src:
-                        print(f"\nImage {i+1}:")
-                        print(f"  Source: {img_src}")
-                        print(f"  Alt Text: {img_alt or 'No alt text'}")
-                        print(f"  Class: {img_class or 'No class'}")
-                        print(
-                            f"  HTML: <img src='{img_src}' alt='{img_alt or ''}' class='{img_class or ''}' />"
+                        product_images.images.append(
+                            ProductImage(
+                                src=img_src,
+                                alt=img.get_attribute("alt") or None,
+                                css_class=img.get_attribute("class") or None,
+                            )
                         )
 
-                # Get the main/first image details
-                main_img = img_elements[0]
-                main_src = main_img.get_attribute("src")
-                main_alt = main_img.get_attribute("alt")
-                main_image_url = main_src
-
-                print(f"\n" + "=" * 80)
-                print("MAIN PRODUCT IMAGE")
-                print("=" * 80)
-                print(f"Main Image URL: {main_src}")
-                print(f"Main Image Alt: {main_alt or 'Product Image'}")
-                print(f"Total Images in Gallery: {len(img_elements)}")
-                print(
-                    f"Main Image Element: <img src='{main_src}' alt='{main_alt or 'Product Image'}' />"
-                )
-                print("=" * 80)
+                # The main image is the first one in the carousel
+                if product_images.images:
+                    product_images.main_image_url = product_images.images[0].src
 
         except Exception as e:
             # Fallback selectors if the main carousel isn't found
-            fallback_selectors = [
-                "[class*='image-gallery']",
-                "[class*='product-image']",
-                ".product-photos",
-                "img[class*='product']",
-                "main img",
-            ]
-
-            image_found = False
+            fallback_selectors = ordered_selectors(
+                "product", "image", IMAGE_FALLBACK_SELECTORS
+            )
+
             for selector in fallback_selectors:
                 try:
                     elements = driver.find_elements(By.CSS_SELECTOR, selector)
@@ -183,67 +119,100 @@ def extract_and_display_product_image(driver):
 
                         if img_elements:
                             img_src = img_elements[0].get_attribute("src")
-                            img_alt = img_elements[0].get_attribute("alt")
-                            main_image_url = img_src
-
-                            print("\n" + "=" * 80)
-                            print("PRODUCT IMAGE (FALLBACK)")
-                            print("=" * 80)
-                            print(f"Image URL: {img_src}")
-                            print(f"Image Alt: {img_alt or 'Product Image'}")
-                            print(f"Found using selector: {selector}")
-                            print(
-                                f"Image Element: <img src='{img_src}' alt='{img_alt or 'Product Image'}' />"
+                            product_images.images.append(
+                                ProductImage(
+                                    src=img_src,
+                                    alt=img_elements[0].get_attribute("alt") or None,
+                                )
                             )
-                            print("=" * 80)
-
-                            image_found = True
+                            product_images.main_image_url = img_src
+                            product_images.fallback_selector = selector
                             break
                 except:
                     continue
 
+            record_selector(
+                "product",
+                "image",
+                fallback_selectors,
+                product_images.fallback_selector,
+            )
+
     except Exception as e:
         pass
 
-    return main_image_url
+    return product_images
 
 
-def download_and_show_image(image_url):
-    """Download image from URL and display it using matplotlib"""
-    try:
-        # Set headers to mimic a browser request
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36"
-        }
-
-        # Download the image
-        response = requests.get(image_url, headers=headers, timeout=10)
-        response.raise_for_status()
-
-        # Open the image using PIL
-        image = Image.open(BytesIO(response.content))
-
-        # Create a matplotlib figure
-        plt.figure(figsize=(10, 12))
-        plt.imshow(image)
-        plt.axis("off")  # Hide axes
-        plt.title("Product Image from Trendyol", fontsize=16, fontweight="bold")
-
-        # Show the image
-        plt.tight_layout()
-        plt.show()
-
-        # Print image info
-        print(f"\nImage Information:")
-        print(f"Format: {image.format}")
-        print(f"Size: {image.size}")
-        print(f"Mode: {image.mode}")
-
-    except requests.exceptions.RequestException as e:
-        pass
-    except Exception as e:
-        pass
+def render_product_images(product_images):
+    """Render ProductImages in the formatted text layout"""
+    lines = []
+
+    if product_images.fallback_selector is None:
+        for i, image in enumerate(product_images.images):
+            lines.append(f"\nImage {i+1}:")
+            lines.append(f"  Source: {image.src}")
+            lines.append(f"  Alt Text: {image.alt or 'No alt text'}")
+            lines.append(f"  Class: {image.css_class or 'No class'}")
+            lines.append(
+                f"  HTML: <img src='{image.src}' alt='{image.alt or ''}' class='{image.css_class or ''}' />"
+            )
+
+        if product_images.images:
+            main = product_images.images[0]
+            lines.append("\n" + "=" * 80)
+            lines.append("MAIN PRODUCT IMAGE")
+            lines.append("=" * 80)
+            lines.append(f"Main Image URL: {main.src}")
+            lines.append(f"Main Image Alt: {main.alt or 'Product Image'}")
+            lines.append(f"Total Images in Gallery: {len(product_images.images)}")
+            lines.append(
+                f"Main Image Element: <img src='{main.src}' alt='{main.alt or 'Product Image'}' />"
+            )
+            lines.append("=" * 80)
+
+    elif product_images.images:
+        image = product_images.images[0]
+        lines.append("\n" + "=" * 80)
+        lines.append("PRODUCT IMAGE (FALLBACK)")
+        lines.append("=" * 80)
+        lines.append(f"Image URL: {image.src}")
+        lines.append(f"Image Alt: {image.alt or 'Product Image'}")
+        lines.append(f"Found using selector: {product_images.fallback_selector}")
+        lines.append(
+            f"Image Element: <img src='{image.src}' alt='{image.alt or 'Product Image'}' />"
+        )
+        lines.append("=" * 80)
+
+    if product_images.main_image and not product_images.main_image.error:
+        info = product_images.main_image
+        lines.append("\nImage Information:")
+        lines.append(f"Format: {info.format}")
+        lines.append(f"Size: ({info.width}, {info.height})")
+        lines.append(f"Mode: {info.mode}")
+
+    if product_images.downloads:
+        lines.append("\nDownloaded Images:")
+        for i, info in enumerate(product_images.downloads):
+            if info.error:
+                lines.append(f"  {i+1}. {info.url} - failed: {info.error}")
+            else:
+                lines.append(
+                    f"  {i+1}. {info.url} - {info.format} {info.width}x{info.height}, "
+                    f"thumbnail {info.thumbnail_width}x{info.thumbnail_height}"
+                )
+
+    if not lines:
+        lines.append("No product images found")
+    return "\n".join(lines)
+
+
+def print_product_images(product_images):
+    """Print the extracted gallery in a formatted way"""
+    print(render_product_images(product_images))
 
 
 if __name__ == "__main__":
-    get_product_image("laptop")
+    product_images = get_product_image("laptop")
+    if product_images:
+        print_product_images(product_images)
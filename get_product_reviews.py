@@ -1,234 +1,411 @@
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.chrome.service import Service
-import time
-
-
-def get_product_reviews(product_name):
-    url = f"https://www.trendyol.com/sr?q={product_name}"
-
-    options = Options()
-    # Remove headless mode to avoid detection
-    # options.add_argument("--headless")
-    options.add_argument("--disable-gpu")
-    options.add_argument("--no-sandbox")
-    options.add_argument("--disable-dev-shm-usage")
-    options.add_argument("--disable-blink-features=AutomationControlled")
-    options.add_experimental_option("excludeSwitches", ["enable-automation"])
-    options.add_experimental_option("useAutomationExtension", False)
-    options.add_argument(
-        "--user-agent=Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36"
-    )
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.support.ui import WebDriverWait
+
+import config
+from batch import render_batch_results, run_batch
+from driver_pool import lease_driver
+from models import ProductReviews, Review
+from product_resolver import open_product_page, resolve_content_id
+from product_urls import reviews_url_from_product_url
+from review_cursor import is_newer, next_cursor, parse_review_date, parse_since
+from reviews_http import get_reviews_http
+from search_trendyol import SCROLL_STEP_SCRIPT, wait_for_more_cards
+from tracing import span
+
+REVIEW_TEXT_SELECTOR = ".comment-text"
+
+# Empty states shown on the reviews page of a product without reviews
+NO_REVIEWS_SELECTORS = [
+    ".no-comment",
+    "[class*='no-comment']",
+    "[class*='no-review']",
+    "[class*='empty-review']",
+    "[class*='empty-comment']",
+]
+
+# "reviews" once a review is rendered, "empty" on an empty state, else null
+FIRST_REVIEWS_STATE_SCRIPT = """
+const [textSelector, emptySelectors] = arguments;
+if (document.querySelector(textSelector)) return "reviews";
+for (const selector of emptySelectors) {
+    if (document.querySelector(selector)) return "empty";
+}
+return null;
+"""
+
+# Elements that may hold the reviews button, tried in order
+REVIEW_BUTTON_SELECTORS = [
+    ".show-more-button-show-more-button",
+    "[class*='show-more-button']",
+    "button",
+    "a",
+    "[class*='review']",
+    "[class*='comment']",
+    ".btn",
+]
+
+# Finds and clicks the reviews button in one round trip. Returns "clicked",
+# "inline" when reviews are already on the page, or null after scrolling
+# further down so the lazily rendered reviews section can appear.
+FIND_REVIEWS_BUTTON_SCRIPT = """
+const selectors = arguments[0];
+for (const selector of selectors) {
+    for (const element of document.querySelectorAll(selector)) {
+        const text = (element.innerText || "").trim().toLocaleUpperCase("tr-TR");
+        if (text.length < 80 && text.includes("TÜM") && text.includes("YORUM")) {
+            element.scrollIntoView({block: "center"});
+            element.click();
+            return "clicked";
+        }
+    }
+}
+if (document.querySelector(".comment-text")) {
+    return "inline";
+}
+window.scrollBy(0, window.innerHeight);
+return null;
+"""
+
+# Stop scrolling the reviews page after this many rounds without new reviews
+NO_NEW_REVIEWS_LIMIT = 2
+
+# Reads the review cards [offset:] in one round trip. The text lives in
+# .comment-text; rating, date, seller and ID come from the surrounding card.
+EXTRACT_REVIEWS_SCRIPT = """
+const [textSelector, offset] = arguments;
+const datePattern = /\\d{1,2}[ .\\/][^ .\\/]+[ .\\/]\\d{4}/;
+
+function cardOf(textElement) {
+    return textElement.closest(".comment, [class*='review-card'], [class*='comment-item']")
+        || textElement.parentElement || textElement;
+}
+
+function reviewId(card) {
+    for (const element of [card, card.closest("[data-review-id], [data-id]")]) {
+        if (!element) continue;
+        const value = element.getAttribute("data-review-id") || element.getAttribute("data-id") || element.id;
+        const match = value && value.match(/\\d+/);
+        if (match) return match[0];
+    }
+    return null;
+}
+
+function rating(card) {
+    const stars = card.querySelectorAll(".star-w .full, [class*='star'] .full");
+    if (!stars.length) return null;
+    let total = 0;
+    stars.forEach((star) => { total += parseFloat(star.style.width || "100") / 100; });
+    return Math.round(total);
+}
+
+function dateText(card) {
+    for (const element of card.querySelectorAll(".comment-info-item, [class*='date'], time")) {
+        const match = (element.getAttribute("datetime") || element.innerText || "").match(datePattern);
+        if (match) return match[0];
+    }
+    return null;
+}
+
+function seller(card) {
+    const element = card.querySelector(".seller-name-info, [class*='seller-name'], [class*='seller']");
+    if (!element) return null;
+    const text = element.innerText.replace(/sat[ıi]c[ıi]s[ıi]ndan al[ıi]nd[ıi]\\.?/i, "").trim();
+    return text || null;
+}
+
+return Array.from(document.querySelectorAll(textSelector)).slice(offset).map((textElement) => {
+    const card = cardOf(textElement);
+    const paragraphs = Array.from(textElement.querySelectorAll("p"))
+        .map((p) => p.innerText.trim())
+        .filter(Boolean);
+    return {
+        text: paragraphs.length ? paragraphs.join(" ") : textElement.innerText.trim(),
+        review_id: reviewId(card),
+        rating: rating(card),
+        date: dateText(card),
+        seller: seller(card),
+    };
+});
+"""
+
+
+def get_product_reviews(
+    product_name=None,
+    product_url=None,
+    content_id=None,
+    max_reviews=config.REVIEWS_DEFAULT_COUNT,
+    since=None,
+    on_reviews=None,
+    backend=config.REVIEWS_BACKEND,
+):
+    """
+    Return the ProductReviews of a product, or None if it was not found.
+    Up to `max_reviews` reviews newer than the `since` cursor are harvested;
+    `on_reviews`, if given, receives every batch as it is read.
+    `backend` is "auto" (reviews endpoint, falling back to the browser),
+    "http" or "browser".
+    """
+    parse_since(since)  # Reject a malformed cursor before opening a browser
+
+    if backend in ("auto", "http"):
+        streamed = []
+
+        def stream(reviews):
+            streamed.append(len(reviews))
+            on_reviews(reviews)
+
+        try:
+            product_reviews = get_product_reviews_http(
+                product_name,
+                product_url,
+                content_id,
+                max_reviews,
+                since,
+                stream if on_reviews else None,
+            )
+        except Exception as e:
+            if backend == "http":
+                raise
+            # The browser would stream those reviews again; its final
+            # result still holds them all
+            if streamed:
+                on_reviews = None
+        else:
+            if product_reviews is not None or backend == "http":
+                return product_reviews
 
     try:
-        # Initialize the WebDriver with webdriver-manager
-        service = Service(ChromeDriverManager().install())
-        driver = webdriver.Chrome(service=service, options=options)
-
-        # Add stealth settings
-        driver.execute_script(
-            "Object.defineProperty(navigator, 'webdriver', {get: () => undefined})"
-        )
-
-        driver.get(url)
-
-        # Try to find product containers
-        container_selectors = [
-            ".p-card-wrppr",
-            "[class*='product-item']",
-            "[class*='product-card']",
-            ".product-down",
-            "[data-test-id*='product']",
-        ]
-
-        first_product_found = False
-
-        for container_selector in container_selectors:
-            containers = driver.find_elements(By.CSS_SELECTOR, container_selector)
-
-            if len(containers) > 0:
-                first_product_found = True
-                first_container = containers[0]
-
-                # Look for clickable link within the first container
-                link_selectors = [
-                    "a[href*='/p/']",  # Trendyol product links contain '/p/'
-                    "a",
-                    "[href*='product']",
-                    ".p-card-wrppr a",
-                ]
-
-                product_link = None
-                for link_sel in link_selectors:
-                    try:
-                        product_link = first_container.find_element(
-                            By.CSS_SELECTOR, link_sel
-                        )
-                        href = product_link.get_attribute("href")
-                        if href and ("/p/" in href or "product" in href.lower()):
-                            break
-                    except:
-                        continue
-
-                if not product_link:
-                    product_link = first_container
-
-                # Store current window handle
-                main_window = driver.current_window_handle
-
-                # Scroll to element first
-                driver.execute_script(
-                    "arguments[0].scrollIntoView(true);", product_link
-                )
-                # Click using JavaScript to avoid interception
-                driver.execute_script("arguments[0].click();", product_link)
-
-                # Switch to the new tab (product page)
-                all_windows = driver.window_handles
-                if len(all_windows) > 1:
-                    # Switch to the new tab
-                    for window in all_windows:
-                        if window != main_window:
-                            driver.switch_to.window(window)
-                            break
-
-                # Scroll down smoothly to load all content and find the reviews section
-                driver.execute_script(
-                    """
-                    window.scrollTo({
-                        top: document.body.scrollHeight,
-                        behavior: 'smooth'
-                    });
-                """
-                )
-
-                # Look for the reviews button and click it
-                reviews_found = click_reviews_button(driver)
-
-                if reviews_found:
-                    # Extract reviews from the reviews page
-                    reviews = extract_product_reviews(driver)
-                    print_product_reviews(reviews)
-
-                break
-
-        driver.quit()
+        with lease_driver() as driver:
+            # Go to the product page, straight from the cache when possible
+            if open_product_page(driver, product_name, product_url, content_id):
+                return collect_product_reviews(driver, max_reviews, since, on_reviews)
 
     except Exception as e:
-        if "driver" in locals():
-            driver.quit()
+        pass
 
+    return None
+
+
+def get_product_reviews_http(
+    product_name=None,
+    product_url=None,
+    content_id=None,
+    max_reviews=config.REVIEWS_DEFAULT_COUNT,
+    since=None,
+    on_reviews=None,
+):
+    """
+    Fetch reviews from the reviews endpoint without a browser.
+    Returns None when the product's content ID cannot be resolved.
+    """
+    content_id = resolve_content_id(product_name, product_url, content_id)
+    if content_id is None:
+        return None
+    return get_reviews_http(content_id, product_url, max_reviews, since, on_reviews)
+
+
+def get_product_reviews_batch(product_names, parallelism=None):
+    """Get reviews of several products in parallel; returns BatchItems in input order"""
+    return run_batch(_product_reviews_item, product_names, parallelism)
+
+
+def _product_reviews_item(product_name):
+    if config.REVIEWS_BACKEND != "browser":
+        try:
+            product_reviews = get_product_reviews_http(product_name)
+        except Exception as e:
+            if config.REVIEWS_BACKEND == "http":
+                raise
+            product_reviews = None
+        if product_reviews is not None:
+            return product_reviews
+
+    with lease_driver() as driver:
+        found = open_product_page(driver, product_name)
+        if found:
+            return collect_product_reviews(driver)
+
+    raise LookupError(f"No product found for '{product_name}'")
+
+
+def collect_product_reviews(
+    driver, max_reviews=config.REVIEWS_DEFAULT_COUNT, since=None, on_reviews=None
+):
+    """
+    Go from the product page to its reviews and harvest them.
+    `found` is False when no reviews section could be found.
+    """
+    product_reviews = ProductReviews(url=driver.current_url)
+
+    if not open_reviews_page(driver):
+        product_reviews.found = False
+        return product_reviews
+
+    # Harvest reviews from the reviews page
+    product_reviews.reviews = harvest_product_reviews(
+        driver, max_reviews, since, on_reviews
+    )
+    product_reviews.cursor = next_cursor(product_reviews.reviews, since)
+    return product_reviews
+
+
+def open_reviews_page(driver):
+    """
+    Go to the reviews of the product page open in `driver`: straight to its
+    reviews URL when it can be derived, else through the reviews button.
+    Returns False when no reviews could be reached.
+    """
+    with span("reviews_page"):
+        reviews_url = reviews_url_from_product_url(driver.current_url)
+        if reviews_url:
+            driver.get(reviews_url)
+            return True
+        return click_reviews_button(driver)
 
-def click_reviews_button(driver):
-    """Click the button to go to reviews page"""
+
+def click_reviews_button(driver, timeout=config.REVIEWS_BUTTON_TIMEOUT):
+    """
+    Click the "TÜM YORUMLARI GÖSTER" button to go to the reviews page.
+    Gives up after `timeout` seconds; returns True when the button was
+    clicked or the reviews are already on the current page.
+    """
     try:
-        # First try: Look for any button or clickable element containing the text
-        all_buttons = driver.find_elements(
-            By.XPATH, "//*[contains(text(), 'TÜM YORUMLARI GÖSTERRR')]"
+        outcome = WebDriverWait(driver, timeout, poll_frequency=0.25).until(
+            lambda driver: driver.execute_script(
+                FIND_REVIEWS_BUTTON_SCRIPT, REVIEW_BUTTON_SELECTORS
+            )
         )
-        if all_buttons:
-            reviews_button = all_buttons[0]
-        else:
-            # Second try: Look for specific class patterns
-            button_selectors = [
-                ".show-more-button-show-more-button",
-                "[class*='show-more-button']",
-                "[class*='review']",
-                "[class*='comment']",
-                "button",
-                ".btn",
-            ]
-
-            reviews_button = None
-            while reviews_button is None:
-                time.sleep(1)
-                for selector in button_selectors:
-                    try:
-                        buttons = driver.find_elements(By.CSS_SELECTOR, selector)
-                        for button in buttons:
-                            button_text = button.text.strip()
-                            if "YORUM" in button_text and "TÜM" in button_text:
-                                reviews_button = button
-                                break
-                        if reviews_button:
-                            break
-                    except:
-                        continue
-
-        if reviews_button:
-            # Scroll to the button and click it
-            driver.execute_script("arguments[0].scrollIntoView(true);", reviews_button)
-            driver.execute_script("arguments[0].click();", reviews_button)
-            return True
-        else:
-            # Maybe reviews are already on the current page
-            review_containers = driver.find_elements(By.CSS_SELECTOR, ".comment-text")
-            if review_containers:
-                return True
-            else:
-                return False
-
+    except TimeoutException:
+        return False
     except Exception as e:
         return False
+    return outcome in ("clicked", "inline")
+
+
+def harvest_product_reviews(
+    driver, max_reviews=config.REVIEWS_DEFAULT_COUNT, since=None, on_reviews=None
+):
+    """
+    Read reviews from the reviews page, scrolling to load more, until
+    `max_reviews` reviews newer than `since` are collected or the list ends.
+    The page's sort order is not guaranteed, so older reviews are skipped
+    rather than taken as the end of the new ones.
+    """
+    cursor = parse_since(since)
+    reviews = []
+
+    # Wait for the first reviews to render or the page to say there are none
+    with span("wait"):
+        if wait_for_first_reviews(driver) != "reviews":
+            return reviews
+
+    extracted_count = 0
+    no_new_reviews_count = 0
+    while len(reviews) < max_reviews:
+        with span("extract"):
+            raw_reviews = driver.execute_script(
+                EXTRACT_REVIEWS_SCRIPT, REVIEW_TEXT_SELECTOR, extracted_count
+            )
+        extracted_count += len(raw_reviews)
+
+        batch = []
+        for raw in raw_reviews:
+            if len(reviews) + len(batch) >= max_reviews:
+                break
+            review = _review_from_raw(raw, len(reviews) + len(batch) + 1)
+            if review is not None and is_newer(review, cursor):
+                batch.append(review)
+        reviews.extend(batch)
+        if on_reviews and batch:
+            on_reviews(batch)
+
+        if len(reviews) >= max_reviews:
+            break
+
+        # Scroll for the next page of reviews
+        with span("scroll"):
+            driver.execute_script(SCROLL_STEP_SCRIPT, REVIEW_TEXT_SELECTOR)
+        with span("wait"):
+            grew = wait_for_more_cards(driver, REVIEW_TEXT_SELECTOR, extracted_count)
+        if grew:
+            no_new_reviews_count = 0
+        else:
+            no_new_reviews_count += 1
+            if no_new_reviews_count >= NO_NEW_REVIEWS_LIMIT:
+                break
 
+    return reviews
 
-def extract_product_reviews(driver):
-    """Extract reviews from the reviews page"""
-    reviews = []
 
+def wait_for_first_reviews(driver, timeout=config.REVIEWS_WAIT_TIMEOUT):
+    """
+    Wait up to `timeout` seconds for the reviews page to show its first
+    reviews or an empty state. Returns "reviews", "empty" or None.
+    """
     try:
-        # Find all review containers
-        limit_review_attempts = 5
-        review_containers = []
-        while len(review_containers) == 0 and limit_review_attempts > 0:
-            time.sleep(1)
-            review_containers = driver.find_elements(By.CSS_SELECTOR, ".comment-text")
-            limit_review_attempts -= 1
-
-        for i, container in enumerate(review_containers[:20]):  # Get first 20 reviews
-            try:
-                # Extract text from <p> elements inside the comment-text div
-                review_paragraphs = container.find_elements(By.TAG_NAME, "p")
-                review_text_parts = []
-
-                for p in review_paragraphs:
-                    p_text = p.text.strip()
-                    if p_text:
-                        review_text_parts.append(p_text)
-
-                if review_text_parts:
-                    full_review = " ".join(review_text_parts)
-                    reviews.append({"id": i + 1, "text": full_review})
-
-            except Exception as e:
-                continue
+        return WebDriverWait(driver, timeout, poll_frequency=0.1).until(
+            lambda driver: driver.execute_script(
+                FIRST_REVIEWS_STATE_SCRIPT, REVIEW_TEXT_SELECTOR, NO_REVIEWS_SELECTORS
+            )
+        )
+    except TimeoutException:
+        return None
+
+
+def _review_from_raw(raw, position):
+    text = (raw.get("text") or "").strip()
+    if not text:
+        return None
+    return Review(
+        id=position,
+        text=text,
+        review_id=raw.get("review_id"),
+        rating=raw.get("rating"),
+        date=parse_review_date(raw.get("date")),
+        seller=raw.get("seller"),
+    )
 
-    except Exception as e:
-        pass
 
-    return reviews
+def render_product_reviews(product_reviews):
+    """Render ProductReviews in the formatted text layout"""
+    lines = ["", "=" * 80, "PRODUCT REVIEWS", "=" * 80]
 
+    if not product_reviews.reviews:
+        lines.append("No reviews found")
+        return "\n".join(lines)
 
-def print_product_reviews(reviews):
-    """Print the extracted reviews in a formatted way"""
-    print("\n" + "=" * 80)
-    print("PRODUCT REVIEWS")
-    print("=" * 80)
+    for review in product_reviews.reviews:
+        lines.append(f"\n--- Review {review.id} ---")
+        details = []
+        if review.rating is not None:
+            details.append(f"Rating: {review.rating}/5")
+        if review.date:
+            details.append(f"Date: {review.date}")
+        if review.seller:
+            details.append(f"Seller: {review.seller}")
+        if details:
+            lines.append(" | ".join(details))
+        lines.append(review.text)
+        lines.append("-" * 50)
+
+    lines.append(f"\nTotal Reviews: {len(product_reviews.reviews)}")
+    if product_reviews.cursor:
+        lines.append(f"Cursor: {product_reviews.cursor}")
+    lines.append("=" * 80)
+    return "\n".join(lines)
 
-    if not reviews:
-        print("No reviews found")
-        return
 
-    for review in reviews:
-        print(f"\n--- Review {review['id']} ---")
-        print(f"{review['text']}")
-        print("-" * 50)
+def render_product_reviews_batch(items):
+    """Render the BatchItems of get_product_reviews_batch"""
+    return render_batch_results(items, "PRODUCT REVIEWS BATCH", render_product_reviews)
 
-    print(f"\nTotal Reviews: {len(reviews)}")
-    print("=" * 80)
+
+def print_product_reviews(product_reviews):
+    """Print the extracted reviews in a formatted way"""
+    print(render_product_reviews(product_reviews))
 
 
 if __name__ == "__main__":
-    get_product_reviews("laptop")
+    product_reviews = get_product_reviews("laptop")
+    if product_reviews:
+        print_product_reviews(product_reviews)
@@ -0,0 +1,48 @@
+"""
+Shared, connection-pooled HTTP session for the browserless code paths.
+"""
+
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+import config
+
+_session = None
+_lock = threading.Lock()
+
+
+def get_http_session():
+    """Return the process-wide requests.Session, creating it on first use"""
+    global _session
+    with _lock:
+        if _session is None:
+            _session = _build_session()
+        return _session
+
+
+def _build_session():
+    session = requests.Session()
+    session.headers.update(
+        {
+            "User-Agent": config.USER_AGENT,
+            "Accept-Language": "tr-TR,tr;q=0.9,en;q=0.8",
+        }
+    )
+    # Retry transient failures on idempotent requests only
+    retry = Retry(
+        total=2,
+        backoff_factor=0.3,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=("GET", "HEAD"),
+    )
+    adapter = HTTPAdapter(
+        pool_connections=config.HTTP_POOL_SIZE,
+        pool_maxsize=config.HTTP_POOL_SIZE,
+        max_retries=retry,
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
@@ -0,0 +1,125 @@
+"""
+Concurrent download and thumbnailing of product images.
+
+Gallery images are fetched in parallel over the shared connection-pooled HTTP
+session, each with its own timeout, so one slow CDN response never holds up
+the others. Every image is decoded with Pillow and shrunk to a thumbnail that
+fits the requested size before it is returned to the client. Downloads and
+thumbnails go through the on-disk image store, so repeats are served locally.
+"""
+
+import base64
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+import config
+from image_store import get_image_store
+from models import ImageInfo, ImageThumbnail
+from tracing import bind_trace, span
+
+# Pillow formats used for thumbnails and their MIME types
+THUMBNAIL_MIME_TYPES = {"JPEG": "image/jpeg", "PNG": "image/png"}
+
+
+def download_images(urls, max_size=config.IMAGE_MAX_SIZE):
+    """
+    Download `urls` concurrently and thumbnail them to fit `max_size` pixels.
+    Returns an ImageInfo and an ImageThumbnail (None on failure) per URL, in
+    input order.
+    """
+    if not urls:
+        return []
+
+    parallelism = max(1, min(config.IMAGE_DOWNLOAD_PARALLELISM, len(urls)))
+    with ThreadPoolExecutor(
+        max_workers=parallelism, thread_name_prefix="trendyol-image"
+    ) as executor:
+        return list(
+            executor.map(bind_trace(lambda url: download_image(url, max_size)), urls)
+        )
+
+
+def download_image(url, max_size=config.IMAGE_MAX_SIZE):
+    """
+    Download one image through the image store; returns its ImageInfo and
+    ImageThumbnail. Stored images with a thumbnail of this size are served
+    without decoding anything.
+    """
+    # Pillow is only needed by the image tools
+    from PIL import Image
+
+    info = ImageInfo(url=url)
+    store = get_image_store()
+    try:
+        with span("image_download"):
+            content_hash, content = store.fetch(url, config.IMAGE_TIMEOUT)
+
+        metadata = store.metadata(content_hash)
+        stored_thumbnail = store.thumbnail(content_hash, max_size)
+        if metadata is not None and stored_thumbnail is not None:
+            info.format, info.width, info.height, info.mode, info.bytes = metadata
+            mime_type, width, height, data = stored_thumbnail
+            thumbnail = ImageThumbnail(
+                url=url,
+                mime_type=mime_type,
+                width=width,
+                height=height,
+                data=base64.b64encode(data).decode("ascii"),
+            )
+        else:
+            image = Image.open(BytesIO(content))
+            info.format = image.format
+            info.width, info.height = image.size
+            info.mode = image.mode
+            info.bytes = len(content)
+            store.set_metadata(
+                content_hash, info.format, info.width, info.height, info.mode
+            )
+
+            # Pillow decodes lazily, so this includes the decode
+            with span("thumbnail"):
+                thumbnail, data = make_thumbnail(url, image, max_size)
+            store.save_thumbnail(
+                content_hash,
+                max_size,
+                thumbnail.mime_type,
+                thumbnail.width,
+                thumbnail.height,
+                data,
+            )
+
+        info.thumbnail_width = thumbnail.width
+        info.thumbnail_height = thumbnail.height
+        return info, thumbnail
+
+    except Exception as e:
+        info.error = str(e) or type(e).__name__
+        return info, None
+
+
+def make_thumbnail(url, image, max_size):
+    """
+    Shrink a decoded image to fit `max_size` and encode it for MCP.
+    Returns the ImageThumbnail and its raw encoded bytes.
+    """
+    image.thumbnail((max_size, max_size))
+
+    # Keep transparency as PNG, everything else becomes a compact JPEG
+    if image.mode in ("RGBA", "LA", "P"):
+        output_format = "PNG"
+    else:
+        output_format = "JPEG"
+        if image.mode != "RGB":
+            image = image.convert("RGB")
+
+    buffer = BytesIO()
+    image.save(buffer, format=output_format, quality=config.IMAGE_JPEG_QUALITY)
+    data = buffer.getvalue()
+    thumbnail = ImageThumbnail(
+        url=url,
+        mime_type=THUMBNAIL_MIME_TYPES[output_format],
+        width=image.size[0],
+        height=image.size[1],
+        data=base64.b64encode(data).decode("ascii"),
+    )
+    return thumbnail, data
@@ -0,0 +1,376 @@
+"""
+Content-addressed on-disk store for product images.
+
+Downloaded images are saved once under the SHA-256 of their bytes, so the
+same CDN image reached through different URLs or product variants is kept a
+single time. A SQLite index maps URLs to content hashes together with their
+ETag / Last-Modified validators, and remembers the decoded image metadata and
+the thumbnails generated per size. Entries older than the freshness window
+are revalidated with a conditional request, and the least recently used
+images are evicted once the store grows past its size limit.
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+import config
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_image_store():
+    """Return the process-wide ImageStore, creating it on first use"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ImageStore()
+        return _store
+
+
+class ImageStore:
+    """URL- and hash-keyed image store with cached thumbnails"""
+
+    def __init__(
+        self,
+        directory=config.IMAGE_CACHE_DIR,
+        max_bytes=config.IMAGE_CACHE_MAX_BYTES,
+        ttl=config.IMAGE_CACHE_TTL,
+    ):
+        self.directory = directory or None
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._db = None
+        self._lock = threading.Lock()
+        self.counters = {
+            "fresh_hits": 0,
+            "revalidated": 0,
+            "downloads": 0,
+            "deduplicated": 0,
+            "thumbnail_hits": 0,
+            "evictions": 0,
+        }
+
+    @property
+    def enabled(self):
+        with self._lock:
+            return self._connection() is not None
+
+    def fetch(self, url, timeout=config.IMAGE_TIMEOUT):
+        """
+        Return the content hash and the bytes of the image at `url`,
+        downloading it only when it is not stored yet or a conditional request
+        reports a change. Stored bytes are read under the lock, so an eviction
+        on another thread never removes them mid-read.
+        """
+        from http_session import get_http_session
+
+        session = get_http_session()
+        row = self._url_row(url)
+
+        headers = {}
+        if row is not None:
+            content_hash, etag, last_modified, fetched_at = row
+            if time.time() - fetched_at < self.ttl:
+                content = self.read(content_hash)
+                if content is not None:
+                    self._count("fresh_hits")
+                    self._touch(content_hash)
+                    return content_hash, content
+            elif self._has_blob(content_hash):
+                if etag:
+                    headers["If-None-Match"] = etag
+                if last_modified:
+                    headers["If-Modified-Since"] = last_modified
+
+        response = session.get(url, headers=headers, timeout=timeout)
+        if response.status_code == 304 and headers:
+            content = self.read(content_hash)
+            if content is not None:
+                self._count("revalidated")
+                self._execute(
+                    "UPDATE urls SET fetched_at = ? WHERE url = ?", (time.time(), url)
+                )
+                self._touch(content_hash)
+                return content_hash, content
+            # Evicted while revalidating, download it again
+            response = session.get(url, timeout=timeout)
+        response.raise_for_status()
+
+        content = response.content
+        content_hash = hashlib.sha256(content).hexdigest()
+        self._count("downloads")
+        self._save_blob(content_hash, content)
+        self._execute(
+            "INSERT OR REPLACE INTO urls (url, hash, etag, last_modified, fetched_at)"
+            " VALUES (?, ?, ?, ?, ?)",
+            (
+                url,
+                content_hash,
+                response.headers.get("ETag"),
+                response.headers.get("Last-Modified"),
+                time.time(),
+            ),
+        )
+        self._evict()
+        return content_hash, content
+
+    def read(self, content_hash):
+        """Return the original bytes of a stored image, or None if it is gone"""
+        # Holding the lock keeps _evict from deleting the blob mid-read
+        with self._lock:
+            db = self._connection()
+            if db is None:
+                return None
+            try:
+                if (
+                    db.execute(
+                        "SELECT 1 FROM blobs WHERE hash = ?", (content_hash,)
+                    ).fetchone()
+                    is None
+                ):
+                    return None
+                with open(self._blob_path(content_hash), "rb") as f:
+                    return f.read()
+            except (OSError, sqlite3.Error):
+                return None
+
+    def metadata(self, content_hash):
+        """Return (format, width, height, mode, bytes) of a decoded image, or None"""
+        return self._query(
+            "SELECT format, width, height, mode, size FROM blobs"
+            " WHERE hash = ? AND width IS NOT NULL",
+            (content_hash,),
+        )
+
+    def set_metadata(self, content_hash, image_format, width, height, mode):
+        self._execute(
+            "UPDATE blobs SET format = ?, width = ?, height = ?, mode = ? WHERE hash = ?",
+            (image_format, width, height, mode, content_hash),
+        )
+
+    def thumbnail(self, content_hash, max_size):
+        """Return (mime_type, width, height, bytes) of a stored thumbnail, or None"""
+        row = self._query(
+            "SELECT mime_type, width, height FROM thumbnails"
+            " WHERE hash = ? AND max_size = ?",
+            (content_hash, max_size),
+        )
+        if row is None:
+            return None
+        try:
+            with open(self._thumbnail_path(content_hash, max_size), "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+        self._count("thumbnail_hits")
+        return (*row, data)
+
+    def save_thumbnail(self, content_hash, max_size, mime_type, width, height, data):
+        if not self.enabled:
+            return
+        path = self._thumbnail_path(content_hash, max_size)
+        try:
+            _write_atomic(path, data)
+        except OSError:
+            return
+        self._execute(
+            "INSERT OR REPLACE INTO thumbnails"
+            " (hash, max_size, mime_type, width, height, size) VALUES (?, ?, ?, ?, ?, ?)",
+            (content_hash, max_size, mime_type, width, height, len(data)),
+        )
+        self._evict()
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self.counters)
+        row = self._query("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM blobs", ()) or (
+            0,
+            0,
+        )
+        thumbnail_row = self._query(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM thumbnails", ()
+        ) or (0, 0)
+        url_row = self._query("SELECT COUNT(*) FROM urls", ()) or (0,)
+        counters.update(
+            {
+                "enabled": self.enabled,
+                "urls": url_row[0],
+                "images": row[0],
+                "thumbnails": thumbnail_row[0],
+                "bytes": row[1] + thumbnail_row[1],
+                "max_bytes": self.max_bytes,
+            }
+        )
+        return counters
+
+    def _count(self, counter):
+        with self._lock:
+            self.counters[counter] += 1
+
+    def _blob_path(self, content_hash):
+        return os.path.join(self.directory, "blobs", content_hash[:2], content_hash)
+
+    def _thumbnail_path(self, content_hash, max_size):
+        return os.path.join(
+            self.directory, "thumbnails", content_hash[:2], f"{content_hash}-{max_size}"
+        )
+
+    def _has_blob(self, content_hash):
+        return self._query(
+            "SELECT 1 FROM blobs WHERE hash = ?", (content_hash,)
+        ) is not None and os.path.exists(self._blob_path(content_hash))
+
+    def _save_blob(self, content_hash, content):
+        if not self.enabled:
+            return
+        if self._has_blob(content_hash):
+            # Same bytes already stored under another URL
+            self._count("deduplicated")
+            self._touch(content_hash)
+            return
+        try:
+            _write_atomic(self._blob_path(content_hash), content)
+        except OSError:
+            return
+        self._execute(
+            "INSERT OR REPLACE INTO blobs (hash, size, last_used) VALUES (?, ?, ?)",
+            (content_hash, len(content), time.time()),
+        )
+
+    def _touch(self, content_hash):
+        self._execute(
+            "UPDATE blobs SET last_used = ? WHERE hash = ?", (time.time(), content_hash)
+        )
+
+    def _url_row(self, url):
+        return self._query(
+            "SELECT hash, etag, last_modified, fetched_at FROM urls WHERE url = ?",
+            (url,),
+        )
+
+    def _evict(self):
+        """Drop least recently used images until the store fits its limit"""
+        if self.max_bytes <= 0:
+            return
+        with self._lock:
+            db = self._connection()
+            if db is None:
+                return
+            try:
+                total = db.execute(
+                    "SELECT (SELECT COALESCE(SUM(size), 0) FROM blobs)"
+                    " + (SELECT COALESCE(SUM(size), 0) FROM thumbnails)"
+                ).fetchone()[0]
+                if total <= self.max_bytes:
+                    return
+
+                # Evict down to 90% so every new image does not trigger a pass
+                target = self.max_bytes * 0.9
+                victims = []
+                for content_hash, size in db.execute(
+                    "SELECT hash, size + COALESCE((SELECT SUM(size) FROM thumbnails"
+                    " WHERE thumbnails.hash = blobs.hash), 0)"
+                    " FROM blobs ORDER BY last_used"
+                ):
+                    if total <= target:
+                        break
+                    victims.append(content_hash)
+                    total -= size
+
+                for content_hash in victims:
+                    sizes = [
+                        row[0]
+                        for row in db.execute(
+                            "SELECT max_size FROM thumbnails WHERE hash = ?",
+                            (content_hash,),
+                        )
+                    ]
+                    paths = [self._blob_path(content_hash)] + [
+                        self._thumbnail_path(content_hash, size) for size in sizes
+                    ]
+                    for path in paths:
+                        try:
+                            os.remove(path)
+                        except OSError:
+                            pass
+                    db.execute("DELETE FROM thumbnails WHERE hash = ?", (content_hash,))
+                    db.execute("DELETE FROM urls WHERE hash = ?", (content_hash,))
+                    db.execute("DELETE FROM blobs WHERE hash = ?", (content_hash,))
+                    self.counters["evictions"] += 1
+                db.commit()
+            except sqlite3.Error:
+                pass
+
+    def _connection(self):
+        # Called with self._lock held
+        if self._db is None and self.directory:
+            try:
+                os.makedirs(self.directory, exist_ok=True)
+                db = sqlite3.connect(
+                    os.path.join(self.directory, "index.sqlite3"),
+                    check_same_thread=False,
+                )
+                db.execute(
+                    "CREATE TABLE IF NOT EXISTS blobs ("
+                    " hash TEXT PRIMARY KEY,"
+                    " size INTEGER NOT NULL,"
+                    " last_used REAL NOT NULL,"
+                    " format TEXT, width INTEGER, height INTEGER, mode TEXT)"
+                )
+                db.execute(
+                    "CREATE TABLE IF NOT EXISTS urls ("
+                    " url TEXT PRIMARY KEY,"
+                    " hash TEXT NOT NULL,"
+                    " etag TEXT, last_modified TEXT,"
+                    " fetched_at REAL NOT NULL)"
+                )
+                db.execute(
+                    "CREATE TABLE IF NOT EXISTS thumbnails ("
+                    " hash TEXT NOT NULL,"
+                    " max_size INTEGER NOT NULL,"
+                    " mime_type TEXT NOT NULL,"
+                    " width INTEGER NOT NULL, height INTEGER NOT NULL,"
+                    " size INTEGER NOT NULL,"
+                    " PRIMARY KEY (hash, max_size))"
+                )
+                db.execute("CREATE INDEX IF NOT EXISTS urls_hash ON urls (hash)")
+                db.commit()
+                self._db = db
+            except (OSError, sqlite3.Error):
+                # Keep downloading directly if the store is unusable
+                self.directory = None
+        return self._db
+
+    def _query(self, sql, params):
+        with self._lock:
+            db = self._connection()
+            if db is None:
+                return None
+            try:
+                return db.execute(sql, params).fetchone()
+            except sqlite3.Error:
+                return None
+
+    def _execute(self, sql, params):
+        with self._lock:
+            db = self._connection()
+            if db is None:
+                return
+            try:
+                db.execute(sql, params)
+                db.commit()
+            except sqlite3.Error:
+                pass
+
+
+def _write_atomic(path, data):
+    """Write a file so readers never see it half-written"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(temp_path, "wb") as f:
+        f.write(data)
+    os.replace(temp_path, path)
@@ -0,0 +1,139 @@
+"""
+Typed result records returned by the Trendyol tools.
+
+The records use `__slots__` dataclasses to keep large result sets compact,
+and serialize straight to JSON for MCP responses. The printed formats live in
+the tool modules as optional renderers.
+"""
+
+from dataclasses import asdict, dataclass, field
+
+
+@dataclass(slots=True)
+class SearchProduct:
+    name: str
+    description: str
+    price: str
+    url: str | None = None
+    content_id: str | None = None
+
+
+@dataclass(slots=True)
+class SearchResult:
+    query: str
+    products: list[SearchProduct] = field(default_factory=list)
+    # "http" or "browser"
+    backend: str = "browser"
+    timings: dict[str, float] = field(default_factory=dict)
+
+
+@dataclass(slots=True)
+class ProductDetails:
+    url: str | None = None
+    title: str | None = None
+    brand: str | None = None
+    price: str | None = None
+    rating: str | None = None
+    stock: str | None = None
+    description: str | None = None
+    features: list[str] = field(default_factory=list)
+    # Feature attributes as key -> value, e.g. {"Renk": "Siyah"}
+    attributes: dict[str, str] = field(default_factory=dict)
+    # Per field: extraction attempts, seconds until found (or given up), found
+    field_stats: dict[str, dict] = field(default_factory=dict)
+
+
+@dataclass(slots=True)
+class ProductImage:
+    src: str
+    alt: str | None = None
+    css_class: str | None = None
+
+
+@dataclass(slots=True)
+class ImageInfo:
+    url: str
+    format: str | None = None
+    width: int | None = None
+    height: int | None = None
+    mode: str | None = None
+    bytes: int | None = None
+    thumbnail_width: int | None = None
+    thumbnail_height: int | None = None
+    error: str | None = None
+
+
+@dataclass(slots=True)
+class ImageThumbnail:
+    url: str
+    mime_type: str
+    width: int
+    height: int
+    # Base64-encoded image bytes, sent to the client as MCP image content
+    data: str = field(repr=False)
+
+
+@dataclass(slots=True)
+class ProductImages:
+    url: str | None = None
+    images: list[ProductImage] = field(default_factory=list)
+    main_image_url: str | None = None
+    # Selector that located the images when the gallery carousel was missing
+    fallback_selector: str | None = None
+    main_image: ImageInfo | None = None
+    downloads: list[ImageInfo] = field(default_factory=list)
+    thumbnails: list[ImageThumbnail] = field(default_factory=list)
+
+
+@dataclass(slots=True)
+class Review:
+    # Position in the harvest, starting at 1
+    id: int
+    text: str
+    review_id: str | None = None
+    rating: int | None = None
+    # ISO date, "YYYY-MM-DD"
+    date: str | None = None
+    seller: str | None = None
+
+
+@dataclass(slots=True)
+class ProductReviews:
+    url: str | None = None
+    reviews: list[Review] = field(default_factory=list)
+    # False when the product page had no reachable reviews section
+    found: bool = True
+    # Pass back as `since` to harvest only newer reviews next time
+    cursor: str | None = None
+    # "http" (reviews endpoint) or "browser"
+    backend: str = "browser"
+
+
+# Sections a ProductBundle can hold, in extraction order
+BUNDLE_SECTIONS = ("details", "images", "reviews")
+
+
+@dataclass(slots=True)
+class ProductBundle:
+    url: str | None = None
+    details: ProductDetails | None = None
+    images: ProductImages | None = None
+    reviews: ProductReviews | None = None
+
+
+@dataclass(slots=True)
+class BatchItem:
+    index: int
+    item: str
+    result: object = None
+    error: str | None = None
+    seconds: float = 0.0
+
+
+def to_dict(record):
+    """Convert a record (or list of records) into JSON-ready data"""
+    if isinstance(record, list):
+        return [to_dict(item) for item in record]
+    if record is None:
+        return None
+    return asdict(record)
@@ -0,0 +1,187 @@
+"""
+Product name -> product page resolution shared by the product tools.
+
+The details, image and reviews tools all start by searching for the product
+name, clicking the first result and switching to its tab. The resolved
+product URL is cached (LRU + TTL) so repeated requests for the same product
+navigate straight to the product page, and callers that already know the
+product URL or content ID skip the search entirely. Browserless tools
+resolve the content ID through the same cache and the HTTP search backend.
+"""
+
+from urllib.parse import urlencode
+
+from selenium.webdriver.common.by import By
+
+import config
+from product_urls import (
+    check_product_url,
+    content_id_from_url,
+    is_product_url,
+    product_url_from_content_id,
+)
+from search_http import SEARCH_URL, search_trendyol_http
+from search_pages import search_page_params
+from selector_registry import ordered_selectors, record_selector
+from tracing import span
+from ttl_cache import TTLCache
+
+# Product containers on the search result page, tried most recently successful first
+CONTAINER_SELECTORS = [
+    ".p-card-wrppr",
+    "[class*='product-item']",
+    "[class*='product-card']",
+    ".product-down",
+    "[data-test-id*='product']",
+]
+
+# Clickable links within a product container, tried most recently successful first
+LINK_SELECTORS = [
+    "a[href*='-p-']",  # Trendyol product links end in -p-<content id>
+    "a[href*='/p/']",
+    "a",
+    "[href*='product']",
+    ".p-card-wrppr a",
+]
+
+_url_cache = TTLCache(config.PRODUCT_URL_CACHE_SIZE, config.PRODUCT_URL_CACHE_TTL)
+
+
+def normalize_product_name(product_name):
+    """Normalize a product name into a cache key"""
+    return " ".join(product_name.casefold().split())
+
+
+def open_product_page(driver, product_name=None, product_url=None, content_id=None):
+    """
+    Navigate `driver` to a product page. A `product_url` or `content_id` is
+    opened directly; otherwise the first search result for `product_name` is
+    used. Returns True when a product page was opened.
+    """
+    if product_url:
+        product_url = check_product_url(product_url)
+        with span("navigate"):
+            driver.get(product_url)
+        return True
+
+    if content_id:
+        with span("navigate"):
+            driver.get(product_url_from_content_id(content_id))
+        return True
+
+    if not product_name:
+        return False
+
+    key = normalize_product_name(product_name)
+    cached_url = _url_cache.get(key)
+    if cached_url:
+        with span("navigate"):
+            driver.get(cached_url)
+        if is_product_url(driver.current_url):
+            return True
+        # Trendyol redirects away from removed products; search again
+        forget_product_url(product_name)
+
+    product_url = _open_first_search_result(driver, product_name)
+    if product_url is None:
+        return False
+
+    if is_product_url(product_url):
+        _url_cache.set(key, product_url)
+    return True
+
+
+def resolve_content_id(product_name=None, product_url=None, content_id=None):
+    """
+    Find a product's content ID without a browser: from the arguments, the
+    URL cache or the first plain-HTTP search result. Returns None if unknown.
+    """
+    if content_id:
+        return str(content_id).strip()
+
+    if product_url:
+        return content_id_from_url(product_url)
+
+    if not product_name:
+        return None
+
+    key = normalize_product_name(product_name)
+    cached_url = _url_cache.get(key)
+    if cached_url:
+        return content_id_from_url(cached_url)
+
+    products, timings = search_trendyol_http(product_name, 1)
+    if not products or not products[0].url:
+        return None
+
+    if is_product_url(products[0].url):
+        _url_cache.set(key, products[0].url)
+    return products[0].content_id or content_id_from_url(products[0].url)
+
+
+def forget_product_url(product_name):
+    """Drop a cached resolution, e.g. when the cached page turned out stale"""
+    _url_cache.delete(normalize_product_name(product_name))
+
+
+def product_url_cache_stats():
+    return _url_cache.stats()
+
+
+def _open_first_search_result(driver, product_name):
+    """Search, click the first result and switch to its tab; returns the URL"""
+    with span("search_navigation"):
+        driver.get(SEARCH_URL + "?" + urlencode(search_page_params(product_name, 1)))
+
+    # Try to find product containers
+    container_selectors = ordered_selectors("search", "container", CONTAINER_SELECTORS)
+    for container_selector in container_selectors:
+        containers = driver.find_elements(By.CSS_SELECTOR, container_selector)
+        if not containers:
+            continue
+        record_selector("search", "container", container_selectors, container_selector)
+
+        first_container = containers[0]
+
+        # Look for clickable link within the first container
+        product_link = None
+        href = None
+        link_selectors = ordered_selectors("search", "link", LINK_SELECTORS)
+        for link_sel in link_selectors:
+            try:
+                product_link = first_container.find_element(By.CSS_SELECTOR, link_sel)
+                href = product_link.get_attribute("href")
+                if is_product_url(href):
+                    record_selector("search", "link", link_selectors, link_sel)
+                    break
+            except:
+                continue
+        else:
+            record_selector("search", "link", link_selectors, None)
+
+        if not product_link:
+            product_link = first_container
+
+        with span("click_through"):
+            # Store current window handle
+            main_window = driver.current_window_handle
+
+            # Scroll to element first
+            driver.execute_script("arguments[0].scrollIntoView(true);", product_link)
+            # Click using JavaScript to avoid interception
+            driver.execute_script("arguments[0].click();", product_link)
+
+            # Switch to the new tab (product page)
+            all_windows = driver.window_handles
+            if len(all_windows) > 1:
+                for window in all_windows:
+                    if window != main_window:
+                        driver.switch_to.window(window)
+                        break
+
+        if href and is_product_url(href):
+            return href
+        return driver.current_url
+
+    record_selector("search", "container", container_selectors, None)
+    return None
@@ -0,0 +1,77 @@
+"""
+Helpers for Trendyol product page URLs and content IDs.
+
+Product pages look like https://www.trendyol.com/<brand>/<slug>-p-<content id>
+and Trendyol routes them by the trailing content ID alone. The reviews of a
+product live at the product path followed by /yorumlar.
+"""
+
+import re
+from urllib.parse import urljoin, urlsplit
+
+import config
+
+BASE_URL = config.BASE_URL
+
+_CONTENT_ID_PATTERN = re.compile(r"-p-(\d+)")
+
+REVIEWS_PATH_SUFFIX = "/yorumlar"
+
+
+def absolute_url(href):
+    """Resolve a possibly relative product link against the Trendyol origin"""
+    if not href:
+        return None
+    return urljoin(BASE_URL + "/", href)
+
+
+def content_id_from_url(url):
+    """Return the content ID of a product URL, or None"""
+    if not url:
+        return None
+    match = _CONTENT_ID_PATTERN.search(urlsplit(url).path)
+    return match.group(1) if match else None
+
+
+def product_url_from_content_id(content_id):
+    """Build a product page URL that Trendyol redirects to the canonical page"""
+    content_id = str(content_id).strip()
+    if not content_id.isdigit():
+        raise ValueError(f"Invalid content_id: {content_id}")
+    return f"{BASE_URL}/brand/product-p-{content_id}"
+
+
+def reviews_url_from_product_url(url):
+    """Return the reviews page URL of a product page URL, or None"""
+    if not url or content_id_from_url(url) is None:
+        return None
+    parts = urlsplit(url)
+    path = parts.path.rstrip("/")
+    if not path.endswith(REVIEWS_PATH_SUFFIX):
+        path += REVIEWS_PATH_SUFFIX
+    return f"{parts.scheme}://{parts.netloc}{path}"
+
+
+def check_product_url(url):
+    """
+    Return `url` if it is a product page on the configured Trendyol site;
+    raise ValueError for other sites, other schemes (e.g. file://) or URLs
+    without a content ID, which must never be loaded into a pooled browser.
+    """
+    url = str(url).strip()
+    parts = urlsplit(url)
+    base = urlsplit(BASE_URL)
+    if parts.scheme != base.scheme or _host(parts.netloc) != _host(base.netloc):
+        raise ValueError(f"product_url must be a page on {BASE_URL}")
+    if content_id_from_url(url) is None:
+        raise ValueError("product_url must be a product page URL ending in -p-<id>")
+    return url
+
+
+def _host(netloc):
+    host = netloc.lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+def is_product_url(url):
+    return bool(url) and url.startswith("http") and ("/p/" in url or "-p-" in url)
@@ -0,0 +1,202 @@
+"""
+Two-tier cache for tool responses.
+
+Responses are keyed on the tool name plus its normalized arguments. A bounded
+in-memory LRU answers hot repeats; a SQLite store behind it survives server
+restarts. Each tool has its own TTL because prices go stale much faster than
+descriptions or images.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+
+import config
+from ttl_cache import TTLCache
+
+# Arguments that never change the response
+IGNORED_ARGUMENTS = {"no_cache", "parallelism", "stream"}
+# Free-text arguments compared case- and whitespace-insensitively
+TEXT_ARGUMENTS = {"query", "product_name", "product_names"}
+
+
+def normalize_arguments(arguments):
+    """Return the cache-relevant arguments in a canonical form"""
+    normalized = {}
+    for name, value in (arguments or {}).items():
+        if name in IGNORED_ARGUMENTS or value is None:
+            continue
+        if name in TEXT_ARGUMENTS:
+            value = _normalize_text(value)
+        normalized[name] = value
+    return normalized
+
+
+def _normalize_text(value):
+    if isinstance(value, str):
+        return " ".join(value.casefold().split())
+    if isinstance(value, list):
+        return [_normalize_text(item) for item in value]
+    return value
+
+
+def cache_key(tool_name, arguments):
+    """Cache key for a tool call"""
+    return (
+        tool_name
+        + ":"
+        + json.dumps(normalize_arguments(arguments), sort_keys=True, ensure_ascii=False)
+    )
+
+
+class ResultCache:
+    """In-memory LRU in front of a persistent SQLite store"""
+
+    def __init__(
+        self,
+        memory_size=config.RESULT_CACHE_MEMORY_SIZE,
+        db_path=config.RESULT_CACHE_DB,
+        ttls=None,
+    ):
+        self.ttls = dict(config.RESULT_CACHE_TTLS if ttls is None else ttls)
+        self._memory = TTLCache(memory_size)
+        self._db_path = db_path or None
+        self._db = None
+        self._db_lock = threading.Lock()
+        self._counters_lock = threading.Lock()
+        self.counters = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "bypassed": 0,
+            "stores": 0,
+        }
+
+    def is_cached_tool(self, tool_name):
+        return self.ttls.get(tool_name, 0) > 0
+
+    def get(self, tool_name, arguments):
+        """Return the cached response or None"""
+        if not self.is_cached_tool(tool_name):
+            return None
+
+        key = cache_key(tool_name, arguments)
+        value = self._memory.get(key)
+        if value is not None:
+            self._count("memory_hits")
+            return value
+
+        row = self._db_get(key)
+        if row is not None:
+            value, expires_at = row
+            # Promote to memory for the rest of its lifetime
+            self._memory.set(key, value, ttl=expires_at - time.time())
+            self._count("disk_hits")
+            return value
+
+        self._count("misses")
+        return None
+
+    def set(self, tool_name, arguments, value):
+        """Store a response under the tool's TTL"""
+        ttl = self.ttls.get(tool_name, 0)
+        if ttl <= 0:
+            return
+        key = cache_key(tool_name, arguments)
+        self._memory.set(key, value, ttl=ttl)
+        self._db_set(key, tool_name, value, time.time() + ttl)
+        self._count("stores")
+
+    def record_bypass(self):
+        self._count("bypassed")
+
+    def stats(self):
+        with self._counters_lock:
+            counters = dict(self.counters)
+        lookups = counters["memory_hits"] + counters["disk_hits"] + counters["misses"]
+        hits = counters["memory_hits"] + counters["disk_hits"]
+        counters["hit_rate"] = round(hits / lookups, 3) if lookups else 0.0
+        counters["memory"] = self._memory.stats()
+        counters["disk_entries"] = self._db_count()
+        return counters
+
+    def _count(self, counter):
+        with self._counters_lock:
+            self.counters[counter] += 1
+
+    def _connection(self):
+        # Called with self._db_lock held
+        if self._db is None and self._db_path:
+            try:
+                directory = os.path.dirname(self._db_path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                self._db = sqlite3.connect(self._db_path, check_same_thread=False)
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS results ("
+                    " key TEXT PRIMARY KEY,"
+                    " tool TEXT NOT NULL,"
+                    " value TEXT NOT NULL,"
+                    " expires_at REAL NOT NULL)"
+                )
+                self._db.execute(
+                    "CREATE INDEX IF NOT EXISTS results_expires_at ON results (expires_at)"
+                )
+                self._db.execute(
+                    "DELETE FROM results WHERE expires_at <= ?", (time.time(),)
+                )
+                self._db.commit()
+            except (OSError, sqlite3.Error):
+                # Keep serving from memory if the disk tier is unusable
+                if self._db is not None:
+                    self._db.close()
+                self._db = None
+                self._db_path = None
+        return self._db
+
+    def _db_get(self, key):
+        with self._db_lock:
+            db = self._connection()
+            if db is None:
+                return None
+            try:
+                row = db.execute(
+                    "SELECT value, expires_at FROM results WHERE key = ? AND expires_at > ?",
+                    (key, time.time()),
+                ).fetchone()
+            except sqlite3.Error:
+                return None
+        if row is None:
+            return None
+        try:
+            return json.loads(row[0]), row[1]
+        except ValueError:
+            return None
+
+    def _db_set(self, key, tool_name, value, expires_at):
+        with self._db_lock:
+            db = self._connection()
+            if db is None:
+                return
+            try:
+                db.execute(
+                    "INSERT OR REPLACE INTO results (key, tool, value, expires_at) VALUES (?, ?, ?, ?)",
+                    (key, tool_name, json.dumps(value, ensure_ascii=False), expires_at),
+                )
+                db.commit()
+            except sqlite3.Error:
+                pass
+
+    def _db_count(self):
+        with self._db_lock:
+            db = self._connection()
+            if db is None:
+                return 0
+            try:
+                return db.execute(
+                    "SELECT COUNT(*) FROM results WHERE expires_at > ?", (time.time(),)
+                ).fetchone()[0]
+            except sqlite3.Error:
+                return 0
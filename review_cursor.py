@@ -0,0 +1,143 @@
+"""
+Incremental review harvesting cursors.
+
+A harvest returns a cursor naming the newest review it saw; passing it back
+as `since` on the next run keeps only reviews newer than that. A cursor is
+either a review ID (Trendyol review IDs grow over time) or an ISO date. A
+date alone cannot tell the reviews of the boundary day apart, so a date
+cursor also lists short hashes of the reviews already seen on that day:
+"2024-06-30:1a2b3c4d,5e6f7a8b". Reviews posted later that day still count
+as newer.
+"""
+
+import hashlib
+import re
+from datetime import date, datetime
+
+TURKISH_MONTHS = {
+    "ocak": 1,
+    "şubat": 2,
+    "mart": 3,
+    "nisan": 4,
+    "mayıs": 5,
+    "haziran": 6,
+    "temmuz": 7,
+    "ağustos": 8,
+    "eylül": 9,
+    "ekim": 10,
+    "kasım": 11,
+    "aralık": 12,
+}
+
+_WORD_DATE = re.compile(r"(\d{1,2})\s+([^\W\d_]+)\s+(\d{4})")
+_DOTTED_DATE = re.compile(r"(\d{1,2})[./](\d{1,2})[./](\d{4})")
+
+
+def parse_review_date(value):
+    """
+    Return a review date as an ISO "YYYY-MM-DD" string, or None.
+    Accepts "12 Ocak 2024", "12.01.2024", ISO strings and epoch milliseconds.
+    """
+    if value is None or value == "":
+        return None
+    if isinstance(value, (int, float)):
+        return datetime.fromtimestamp(value / 1000).date().isoformat()
+
+    text = str(value).strip()
+    try:
+        return date.fromisoformat(text[:10]).isoformat()
+    except ValueError:
+        pass
+
+    match = _WORD_DATE.search(text)
+    if match:
+        # Turkish casing: "İ" lowers to "i" and "I" to "ı"
+        name = match.group(2).replace("İ", "i").replace("I", "ı").lower()
+        month = TURKISH_MONTHS.get(name)
+        if month:
+            return _iso_date(int(match.group(3)), month, int(match.group(1)))
+
+    match = _DOTTED_DATE.search(text)
+    if match:
+        return _iso_date(int(match.group(3)), int(match.group(2)), int(match.group(1)))
+    return None
+
+
+def _iso_date(year, month, day):
+    try:
+        return date(year, month, day).isoformat()
+    except ValueError:
+        return None
+
+
+def parse_since(since):
+    """
+    Turn a `since` argument into ("id", int) or ("date", "YYYY-MM-DD",
+    hashes of the reviews seen on that date). Raises ValueError when it is
+    neither a review ID nor a date.
+    """
+    if since is None or since == "":
+        return None
+    text = str(since).strip()
+    if text.isdigit():
+        return ("id", int(text))
+    text, _, seen = text.partition(":") if _is_iso_prefix(text) else (text, "", "")
+    iso_date = parse_review_date(text)
+    if iso_date is None:
+        raise ValueError("since must be a review ID or a date (YYYY-MM-DD)")
+    return ("date", iso_date, frozenset(filter(None, seen.split(","))))
+
+
+def _is_iso_prefix(text):
+    return bool(re.match(r"\d{4}-\d{2}-\d{2}(:|$)", text))
+
+
+def is_newer(review, cursor):
+    """Whether a Review is newer than a parsed cursor; unknown keys count as newer"""
+    if cursor is None:
+        return True
+    if cursor[0] == "id":
+        if review.review_id and str(review.review_id).isdigit():
+            return int(review.review_id) > cursor[1]
+        return True
+    _, value, seen = cursor
+    if review.date:
+        if review.date == value:
+            return review_hash(review) not in seen
+        return review.date > value
+    return True
+
+
+def next_cursor(reviews, since=None):
+    """Cursor of the newest review seen, falling back to the previous `since`"""
+    review_ids = [
+        int(review.review_id)
+        for review in reviews
+        if review.review_id and str(review.review_id).isdigit()
+    ]
+    if review_ids:
+        return str(max(review_ids))
+    dates = [review.date for review in reviews if review.date]
+    if not dates:
+        return None if since is None else str(since)
+
+    newest = max(dates)
+    seen = {review_hash(review) for review in reviews if review.date == newest}
+    previous = _parse_date_cursor(since)
+    if previous is not None and previous[1] == newest:
+        seen |= previous[2]
+    return f"{newest}:{','.join(sorted(seen))}"
+
+
+def review_hash(review):
+    """Short hash identifying a review within its date"""
+    text = " ".join((review.text or "").split())
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()[:8]
+
+
+def _parse_date_cursor(since):
+    try:
+        cursor = parse_since(since)
+    except ValueError:
+        return None
+    return cursor if cursor is not None and cursor[0] == "date" else None
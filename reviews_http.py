@@ -0,0 +1,155 @@
+"""
+Browserless reviews backend.
+
+Trendyol's reviews page is filled from a JSON endpoint keyed by the product's
+content ID. This module pages through that endpoint with the shared HTTP
+session, several pages at a time, and turns each review into the same Review
+record the browser harvester produces, so no page render, scroll or button
+hunt is needed.
+"""
+
+import config
+from http_session import get_http_session
+from models import ProductReviews, Review
+from product_urls import product_url_from_content_id
+from review_cursor import is_newer, next_cursor, parse_review_date, parse_since
+from search_pages import collect_pages
+from tracing import span
+
+# Keys of the review list inside the endpoint's JSON, tried in order
+_REVIEW_LIST_PATHS = (
+    ("result", "productReviews", "content"),
+    ("result", "reviews"),
+    ("reviews",),
+)
+
+
+class ReviewsParseError(Exception):
+    """Raised when the reviews endpoint does not answer with a recognizable review list"""
+
+
+def get_reviews_http(
+    content_id,
+    product_url=None,
+    max_reviews=config.REVIEWS_DEFAULT_COUNT,
+    since=None,
+    on_reviews=None,
+):
+    """
+    Fetch up to `max_reviews` reviews newer than `since` from the reviews
+    endpoint and return a ProductReviews. `on_reviews`, if given, receives
+    every page of reviews in order.
+    """
+    cursor = parse_since(since)
+    session = get_http_session()
+    url = config.REVIEWS_API_URL.format(content_id=content_id)
+    position = 0
+
+    def fetch_page(page):
+        with span("http_fetch"):
+            response = session.get(
+                url,
+                params={
+                    "page": page - 1,  # The endpoint counts pages from 0
+                    "order": config.REVIEWS_API_ORDER,
+                    "culture": "tr-TR",
+                    "storefrontId": 1,
+                },
+                headers={"Accept": "application/json"},
+                timeout=config.HTTP_TIMEOUT,
+            )
+            response.raise_for_status()
+        with span("parse"):
+            reviews = [
+                _review_from_item(item) for item in parse_reviews_json(response.json())
+            ]
+        # Older reviews are dropped here, so a page of them ends the harvest
+        return [
+            review
+            for review in reviews
+            if review is not None and is_newer(review, cursor)
+        ]
+
+    def number_reviews(reviews):
+        nonlocal position
+        for review in reviews:
+            position += 1
+            review.id = position
+        if on_reviews:
+            on_reviews(reviews)
+
+    reviews, timings = collect_pages(
+        fetch_page,
+        max_reviews,
+        config.REVIEWS_PAGE_PARALLELISM,
+        number_reviews,
+        # Every page adds a review or ends the harvest, so this never cuts it short
+        max_pages=max_reviews,
+        key=_review_key,
+    )
+    return ProductReviews(
+        url=product_url or product_url_from_content_id(content_id),
+        reviews=reviews,
+        found=True,
+        cursor=next_cursor(reviews, since),
+        backend="http",
+    )
+
+
+def parse_reviews_json(data):
+    """Return the list of raw review objects of an endpoint response"""
+    for path in _REVIEW_LIST_PATHS:
+        value = data
+        for key in path:
+            value = value.get(key) if isinstance(value, dict) else None
+        if isinstance(value, list):
+            return value
+
+    found = _find_review_list(data)
+    if found is None:
+        raise ReviewsParseError("No review list found in reviews response")
+    return found
+
+
+def _find_review_list(value):
+    # Any list of objects that carry a comment
+    if isinstance(value, list):
+        if value and all(
+            isinstance(item, dict) and "comment" in item for item in value
+        ):
+            return value
+        items = value
+    elif isinstance(value, dict):
+        items = value.values()
+    else:
+        return None
+    for item in items:
+        found = _find_review_list(item)
+        if found is not None:
+            return found
+    return None
+
+
+def _review_from_item(item):
+    text = (item.get("comment") or "").strip()
+    if not text:
+        return None
+
+    rating = item.get("rate")
+    review_id = item.get("id")
+    return Review(
+        id=0,
+        text=text,
+        review_id=None if review_id is None else str(review_id),
+        rating=int(rating) if isinstance(rating, (int, float)) else None,
+        date=parse_review_date(
+            item.get("commentDateISOtype")
+            or item.get("lastModifiedDate")
+            or item.get("commentDate")
+        ),
+        seller=item.get("sellerName") or None,
+    )
+
+
+def _review_key(review):
+    return review.review_id or (review.text, review.date)
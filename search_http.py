@@ -0,0 +1,289 @@
+"""
+Browserless search backend.
+
+Trendyol's search page is server-rendered: the product list is embedded both
+as a JSON state blob and as product card markup. This module fetches the page
+with the shared HTTP session and parses either representation into the same
+product fields the Selenium path produces.
+"""
+
+import json
+import re
+import threading
+from html.parser import HTMLParser
+
+import config
+from http_session import get_http_session
+from models import SearchProduct
+from product_urls import absolute_url, content_id_from_url
+from search_pages import collect_pages, search_page_params
+from tracing import span
+
+SEARCH_URL = config.BASE_URL + "/sr"
+
+_STATE_MARKERS = (
+    "window.__SEARCH_APP_INITIAL_STATE__",
+    "__SEARCH_APP_INITIAL_STATE__",
+    "window.__INITIAL_STATE__",
+)
+
+
+class SearchParseError(Exception):
+    """Raised when a search page does not contain a recognizable product list"""
+
+
+def search_trendyol_http(query, target_count=100, on_products=None):
+    """
+    Fetch search result pages over plain HTTP, several at a time, until
+    `target_count` products are collected. Returns the products and the time
+    spent per phase (fetch and parse are summed over all pages);
+    `on_products`, if given, receives the new products of every page in rank
+    order.
+    """
+    session = get_http_session()
+    timings = {"fetch": 0.0, "parse": 0.0}
+    timings_lock = threading.Lock()
+
+    def fetch_page(page):
+        with span("http_fetch") as fetch_span:
+            response = session.get(
+                SEARCH_URL,
+                params=search_page_params(query, page),
+                timeout=config.HTTP_TIMEOUT,
+            )
+            response.raise_for_status()
+
+        with span("parse") as parse_span:
+            try:
+                page_products = parse_search_html(response.text)
+            except SearchParseError:
+                # Running past the last page is not an error
+                if page == 1:
+                    raise
+                page_products = []
+
+        with timings_lock:
+            timings["fetch"] += fetch_span.seconds
+            timings["parse"] += parse_span.seconds
+        return page_products
+
+    products, page_timings = collect_pages(
+        fetch_page,
+        target_count,
+        config.SEARCH_PAGE_PARALLELISM,
+        on_products,
+    )
+    timings.update(page_timings)
+    return products, timings
+
+
+def parse_search_html(html):
+    """Parse a search page into SearchProducts, preferring the embedded JSON state"""
+    state = extract_initial_state(html)
+    if state is not None:
+        products = [
+            _product_from_state(item) for item in _find_product_list(state) or []
+        ]
+        products = [product for product in products if product is not None]
+        if products:
+            return products
+
+    parser = _ProductCardParser()
+    parser.feed(html)
+    parser.close()
+    products = [_product_from_card(card) for card in parser.cards]
+    products = [product for product in products if product is not None]
+    if products:
+        return products
+
+    raise SearchParseError("No products found in search page")
+
+
+def extract_initial_state(html):
+    """Return the embedded JSON state object of a Trendyol page, if any"""
+    decoder = json.JSONDecoder()
+    for marker in _STATE_MARKERS:
+        index = html.find(marker)
+        if index == -1:
+            continue
+        match = re.compile(r"\s*=\s*").match(html, index + len(marker))
+        if not match:
+            continue
+        try:
+            state, _ = decoder.raw_decode(html, match.end())
+        except ValueError:
+            continue
+        if isinstance(state, dict):
+            return state
+    return None
+
+
+def _find_product_list(node, depth=0):
+    """Find the first list of product-like dicts anywhere in the state tree"""
+    if depth > 8:
+        return None
+    if isinstance(node, dict):
+        products = node.get("products")
+        if isinstance(products, list) and any(
+            isinstance(item, dict) and "name" in item for item in products
+        ):
+            return products
+        children = node.values()
+    elif isinstance(node, list):
+        children = node
+    else:
+        return None
+
+    for child in children:
+        found = _find_product_list(child, depth + 1)
+        if found:
+            return found
+    return None
+
+
+def _product_from_state(item):
+    if not isinstance(item, dict) or not item.get("name"):
+        return None
+
+    brand = item.get("brand")
+    if isinstance(brand, dict):
+        brand = brand.get("name")
+
+    price = item.get("price")
+    price_text = None
+    if isinstance(price, dict):
+        for key in ("discountedPrice", "sellingPrice", "originalPrice"):
+            value = price.get(key)
+            if isinstance(value, dict):
+                value = value.get("value") or value.get("text")
+            if value:
+                price_text = format_price(value)
+                break
+    elif price:
+        price_text = format_price(price)
+
+    url = absolute_url(item.get("url"))
+    content_id = item.get("id") or content_id_from_url(url)
+    return SearchProduct(
+        name=str(item["name"]).strip(),
+        # The state has no card subtitle; cards without one show the brand
+        description=str(brand).strip() if brand else "Description not found",
+        price=price_text or "Price not found",
+        url=url,
+        content_id=str(content_id) if content_id else None,
+    )
+
+
+def _product_from_card(card):
+    if not card.get("name"):
+        return None
+    url = absolute_url(card.get("url"))
+    return SearchProduct(
+        name=card["name"],
+        description=card.get("description") or "Description not found",
+        price=_main_price_line(card.get("price")) or "Price not found",
+        url=url,
+        content_id=content_id_from_url(url),
+    )
+
+
+def format_price(value):
+    """Format a numeric price the way Trendyol displays it, e.g. '12.999,90 TL'"""
+    if isinstance(value, str):
+        value = value.strip()
+        return value if "TL" in value else f"{value} TL"
+    amount = f"{float(value):,.2f}"
+    # 12,999.90 -> 12.999,90
+    amount = amount.replace(",", "_").replace(".", ",").replace("_", ".")
+    if amount.endswith(",00"):
+        amount = amount[:-3]
+    return f"{amount} TL"
+
+
+def _main_price_line(price_text):
+    if not price_text:
+        return None
+    for line in price_text.split("\n"):
+        if "TL" in line and any(char.isdigit() for char in line):
+            return line.strip()
+    return price_text.strip()
+
+
+class _ProductCardParser(HTMLParser):
+    """Collects name, description, price and link from `.p-card-wrppr` cards"""
+
+    # Class names per field, in priority order (mirrors the Selenium selectors)
+    FIELD_CLASSES = {
+        "name": ("prdct-desc-cntnr-name",),
+        "description": ("product-desc-sub-text", "prdct-desc-cntnr-ttl"),
+        "price": ("prc-box-dscntd", "prc-box-sllng"),
+    }
+    VOID_TAGS = {
+        "area", "base", "br", "col", "embed", "hr", "img", "input",
+        "link", "meta", "source", "track", "wbr",
+    }  # fmt: skip
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.cards = []
+        self._depth = 0
+        self._card = None
+        self._card_depth = None
+        # field -> [depth, priority, text parts]
+        self._captures = {}
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.VOID_TAGS:
+            return
+        self._depth += 1
+        classes = (dict(attrs).get("class") or "").split()
+
+        if self._card is None:
+            if "p-card-wrppr" in classes:
+                self._card = {}
+                self._card_depth = self._depth
+                # Some layouts wrap the whole card in its product link
+                href = dict(attrs).get("href")
+                if tag == "a" and href:
+                    self._card["url"] = href
+            return
+
+        if tag == "a" and "url" not in self._card:
+            href = dict(attrs).get("href")
+            if href and "-p-" in href:
+                self._card["url"] = href
+
+        for field, class_names in self.FIELD_CLASSES.items():
+            for priority, class_name in enumerate(class_names):
+                if class_name not in classes:
+                    continue
+                best = self._card.get(f"_{field}_priority")
+                if field not in self._captures and (best is None or priority < best):
+                    self._captures[field] = [self._depth, priority, []]
+
+    def handle_endtag(self, tag):
+        if tag in self.VOID_TAGS or self._card is None:
+            if tag not in self.VOID_TAGS:
+                self._depth -= 1
+            return
+
+        for field, (depth, priority, parts) in list(self._captures.items()):
+            if depth == self._depth:
+                text = " ".join("".join(parts).split())
+                if text:
+                    self._card[field] = text
+                    self._card[f"_{field}_priority"] = priority
+                del self._captures[field]
+
+        if self._depth == self._card_depth:
+            self.cards.append(
+                {key: value for key, value in self._card.items() if key[0] != "_"}
+            )
+            self._card = None
+            self._card_depth = None
+            self._captures = {}
+        self._depth -= 1
+
+    def handle_data(self, data):
+        for _, _, parts in self._captures.values():
+            parts.append(data)
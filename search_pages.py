@@ -0,0 +1,112 @@
+"""
+Parallel page walk shared by the HTTP and browser search backends.
+
+Trendyol search results can be addressed page by page with the `pi` query
+parameter, so instead of scrolling one feed serially the pages needed for a
+target count are fetched at the same time. Pages are merged back in rank
+order and products repeated across pages (the listing shifts while it is
+being read) are dropped.
+"""
+
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import config
+from tracing import bind_trace
+
+
+def search_page_params(query, page):
+    """Query parameters for one search result page (pages start at 1)"""
+    params = {"q": query}
+    if page > 1:
+        params["pi"] = page
+    return params
+
+
+def product_key(product):
+    """Identity of a search product used to de-duplicate pages"""
+    if product.content_id:
+        return product.content_id
+    if product.url:
+        return product.url
+    return (product.name, product.description, product.price)
+
+
+def collect_pages(
+    fetch_page,
+    target_count,
+    parallelism=config.SEARCH_PAGE_PARALLELISM,
+    on_products=None,
+    max_pages=config.SEARCH_MAX_PAGES,
+    key=product_key,
+):
+    """
+    Collect `target_count` products by calling `fetch_page(page)` for as many
+    pages as needed. The first page is fetched alone to learn the page size;
+    the remaining pages are fetched `parallelism` at a time and merged in rank
+    order. A page without new products marks the end of the results.
+    `key` identifies a record for de-duplication. Returns the products and
+    the page timings.
+    """
+    products = []
+    seen = set()
+    timings = {"pages": 0, "first_page": 0.0, "other_pages": 0.0}
+
+    def add(page_products):
+        # Returns the number of products not seen on earlier pages
+        new_products = []
+        for product in page_products:
+            if len(products) + len(new_products) >= target_count:
+                break
+            product_id = key(product)
+            if product_id in seen:
+                continue
+            seen.add(product_id)
+            new_products.append(product)
+        products.extend(new_products)
+        if on_products and new_products:
+            on_products(new_products)
+        return len(new_products)
+
+    started = time.monotonic()
+    first_page = fetch_page(1)
+    timings["first_page"] = time.monotonic() - started
+    timings["pages"] = 1
+    add(first_page)
+
+    page_size = len(first_page)
+    if not page_size:
+        return products, timings
+
+    exhausted = False
+    next_page = 2
+    started = time.monotonic()
+    parallelism = max(1, parallelism)
+    executor = ThreadPoolExecutor(
+        max_workers=parallelism, thread_name_prefix="trendyol-page"
+    )
+    try:
+        while len(products) < target_count and not exhausted and next_page <= max_pages:
+            # Pages still needed if none of them repeat a product
+            needed = math.ceil((target_count - len(products)) / page_size)
+            wave = min(needed, parallelism)
+            pages = range(next_page, min(next_page + wave, max_pages + 1))
+            next_page = pages.stop
+
+            futures = [executor.submit(bind_trace(fetch_page), page) for page in pages]
+            # Consume in page order so products keep their rank
+            for future in futures:
+                if exhausted or len(products) >= target_count:
+                    future.cancel()
+                    continue
+                page_products = future.result()
+                timings["pages"] += 1
+                # Past the last page Trendyol answers with nothing or repeats
+                if not add(page_products) and len(products) < target_count:
+                    exhausted = True
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+    timings["other_pages"] = time.monotonic() - started
+
+    return products, timings
@@ -1,220 +1,614 @@
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.chrome.service import Service
-import time
-
-
-def search_trendyol(query, target_count=100, max_scroll_attempts=15):
-    url = f"https://www.trendyol.com/sr?q={query}"
-
-    options = Options()
-    # Remove headless mode to avoid detection
-    # options.add_argument("--headless")
-    options.add_argument("--disable-gpu")
-    options.add_argument("--no-sandbox")
-    options.add_argument("--disable-dev-shm-usage")
-    options.add_argument("--disable-blink-features=AutomationControlled")
-    options.add_experimental_option("excludeSwitches", ["enable-automation"])
-    options.add_experimental_option("useAutomationExtension", False)
-    options.add_argument(
-        "--user-agent=Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36"
+from selenium.common.exceptions import TimeoutException
+from collections import Counter
+from urllib.parse import urlencode
+
+import config
+from driver_pool import get_driver_pool, lease_driver
+from models import SearchProduct, SearchResult
+from product_urls import absolute_url, content_id_from_url
+from search_http import SEARCH_URL, search_trendyol_http
+from search_pages import collect_pages, search_page_params
+from selector_registry import first_match, ordered_selectors, record_selector
+from tracing import span
+
+# Stop scrolling after this many consecutive rounds without new cards
+NO_NEW_PRODUCTS_LIMIT = 10
+
+# Product card containers on a search page, tried most recently successful first
+CONTAINER_SELECTORS = [
+    ".p-card-wrppr",
+    "[class*='product-item']",
+    "[class*='product-card']",
+    ".product-down",
+    "[data-test-id*='product']",
+]
+
+# Selector fallback lists, tried inside every product card most recently
+# successful first
+NAME_SELECTORS = [
+    "span.prdct-desc-cntnr-name",
+    ".name",
+    "span[class*='name']",
+    "[class*='title']",
+]
+DESCRIPTION_SELECTORS = [
+    ".product-desc-sub-text",
+    "div[class*='desc']",
+    "[class*='description']",
+    ".prdct-desc-cntnr-ttl",
+    "div[title]",
+]
+PRICE_SELECTORS = [
+    ".prc-box-dscntd",
+    ".prc-box-sllng",
+    "[class*='price']",
+    ".price",
+    "span[class*='prc']",
+]
+
+# Applies the selector fallback lists to every card in a single round trip and
+# reports which selector of each list matched
+EXTRACT_CARDS_SCRIPT = """
+const [containerSelector, offset, limit, nameSelectors, descSelectors, priceSelectors] = arguments;
+const pick = (card, selectors) => {
+    for (const selector of selectors) {
+        const element = card.querySelector(selector);
+        if (element) return {element: element, selector: selector};
+    }
+    return {element: null, selector: null};
+};
+const text = (element) => (element ? (element.innerText || "").trim() : null);
+const productLink = (card) =>
+    card.querySelector("a[href*='-p-']") ||
+    card.querySelector("a[href]") ||
+    card.closest("a[href]");
+return Array.from(document.querySelectorAll(containerSelector))
+    .slice(offset, limit)
+    .map((card) => {
+        const name = pick(card, nameSelectors);
+        const desc = pick(card, descSelectors);
+        const price = pick(card, priceSelectors);
+        let description = text(desc.element);
+        if (desc.element && !description) {
+            description = (desc.element.getAttribute("title") || "").trim();
+        }
+        const link = productLink(card);
+        return {
+            name: text(name.element),
+            description: description,
+            price: text(price.element),
+            url: link ? link.href : null,
+            selectors: {name: name.selector, description: desc.selector, price: price.selector},
+        };
+    });
+"""
+
+
+def search_trendyol(
+    query,
+    target_count=100,
+    max_scroll_attempts=15,
+    extraction="js",
+    backend=config.SEARCH_BACKEND,
+    on_products=None,
+    pagination="scroll",
+):
+    """
+    Search Trendyol and return a SearchResult.
+    `backend` is "auto" (plain HTTP, falling back to the browser when the page
+    cannot be parsed), "http" or "browser". `extraction` is "js" (one script
+    for all cards, falling back to the per-element path if it fails) or
+    "element" (one WebDriver call per field) and only applies to the browser.
+    `on_products`, if given, is called with every batch of products as soon
+    as it is loaded, before the final result is returned.
+    `pagination` is "scroll" (one infinite-scroll feed in the browser) or
+    "pages" (result pages fetched in parallel by page index); the HTTP
+    backend always reads pages.
+    """
+    if backend in ("auto", "http"):
+        streamed = []
+
+        def stream(products):
+            streamed.append(len(products))
+            on_products(products)
+
+        try:
+            products, timings = search_trendyol_http(
+                query, target_count, on_products=stream if on_products else None
+            )
+        except Exception as e:
+            if backend == "http":
+                raise
+            # The browser would stream those products again; its final
+            # result still holds them all
+            if streamed:
+                on_products = None
+        else:
+            return SearchResult(query, products, "http", timings)
+
+    if pagination == "pages":
+        return search_trendyol_browser_pages(
+            query, target_count, extraction, on_products
+        )
+    return search_trendyol_browser(
+        query, target_count, max_scroll_attempts, extraction, on_products
     )
 
+
+def search_trendyol_browser(
+    query, target_count=100, max_scroll_attempts=15, extraction="js", on_products=None
+):
+    """
+    Search Trendyol in a pooled Chrome browser and return a SearchResult.
+    `on_products`, if given, receives each batch of newly loaded products
+    while the page is still being scrolled.
+    """
+    url = SEARCH_URL + "?" + urlencode(search_page_params(query, 1))
+    result = SearchResult(query, backend="browser")
+
     try:
-        # Initialize the WebDriver with webdriver-manager
-        service = Service(ChromeDriverManager().install())
-        driver = webdriver.Chrome(service=service, options=options)
+        with lease_driver() as driver:
+            with span("navigate"):
+                driver.get(url)
+
+            # Try to find product containers first, then extract name and price from each container
+            found_containers = False
+
+            container_selectors = ordered_selectors(
+                "search", "container", CONTAINER_SELECTORS
+            )
+            for container_selector in container_selectors:
+                containers = driver.find_elements(By.CSS_SELECTOR, container_selector)
+
+                if len(containers) > 0:
+                    found_containers = True
+                    record_selector(
+                        "search", "container", container_selectors, container_selector
+                    )
 
-        # Add stealth settings
-        driver.execute_script(
-            "Object.defineProperty(navigator, 'webdriver', {get: () => undefined})"
-        )
+                    products = []
+                    extracted_count = 0
+                    extract_seconds = 0.0
+
+                    def collect_new_cards(containers):
+                        # Extract only the cards that appeared since the last call
+                        nonlocal extracted_count, extract_seconds
+                        end = min(len(containers), target_count)
+                        if end <= extracted_count:
+                            return
+                        with span("extract") as extract_span:
+                            new_products = [
+                                product
+                                for product in extract_cards(
+                                    driver,
+                                    container_selector,
+                                    containers,
+                                    extracted_count,
+                                    end,
+                                    extraction,
+                                )
+                                if product.name != "Name not found"
+                            ]
+                        extract_seconds += extract_span.seconds
+                        extracted_count = end
+                        products.extend(new_products)
+                        if on_products and new_products:
+                            on_products(new_products)
+
+                    # Stream the first screen right away
+                    if on_products:
+                        collect_new_cards(containers)
+
+                    # If we don't have enough containers, scroll to load more
+                    containers, timings = scroll_for_more_cards(
+                        driver,
+                        container_selector,
+                        containers,
+                        target_count,
+                        max_scroll_attempts,
+                        on_growth=collect_new_cards if on_products else None,
+                    )
 
-        driver.get(url)
+                    # Show up to target_count products (or however many we found)
+                    collect_new_cards(containers)
+                    timings["extract"] = extract_seconds
 
-        # Try to find product containers first, then extract name and price from each container
-        container_selectors = [
-            ".p-card-wrppr",
-            "[class*='product-item']",
-            "[class*='product-card']",
-            ".product-down",
-            "[data-test-id*='product']",
-        ]
+                    result.products = products
+                    result.timings = timings
 
-        found_containers = False
+                    break
+            else:
+                record_selector("search", "container", container_selectors, None)
 
-        for container_selector in container_selectors:
-            containers = driver.find_elements(By.CSS_SELECTOR, container_selector)
+    except Exception as e:
+        pass
+
+    return result
+
+
+def search_trendyol_browser_pages(
+    query, target_count=100, extraction="js", on_products=None
+):
+    """
+    Search Trendyol by page index, loading several result pages at once in
+    pooled browsers, and return a SearchResult with products in rank order
+    """
+    parallelism = min(config.SEARCH_PAGE_PARALLELISM, get_driver_pool().size)
+    products, timings = collect_pages(
+        lambda page: fetch_search_page_browser(query, page, extraction),
+        target_count,
+        parallelism,
+        on_products,
+    )
+    return SearchResult(query, products, "browser", timings)
 
-            if len(containers) > 0:
-                found_containers = True
-                print(f"\n=== Product Results ===")
-
-                # If we don't have enough containers, try scrolling to load more
-                scroll_attempts = 0
-                no_new_products_count = 0
-
-                while (
-                    len(containers) < target_count
-                    and scroll_attempts < max_scroll_attempts
-                ):
-                    current_count = len(containers)
-
-                    # Simply scroll to 80% of the page to load new products
-                    driver.execute_script(
-                        """
-                            window.scrollTo({
-                            top: 0,
-                            behavior: 'smooth'
-                            });
-                        """
-                    )
-                    time.sleep(1)
-                    driver.execute_script(
-                        """
-                            window.scrollTo({
-                            top: document.body.scrollHeight,
-                            behavior: 'smooth'
-                            });
-                        """
-                    )
-                    time.sleep(1)
 
-                    # Re-check for containers
-                    new_containers = driver.find_elements(
-                        By.CSS_SELECTOR, container_selector
+def fetch_search_page_browser(query, page, extraction="js"):
+    """Load one search result page in a pooled browser and extract its cards"""
+    with lease_driver() as driver:
+        with span("navigate"):
+            driver.get(SEARCH_URL + "?" + urlencode(search_page_params(query, page)))
+
+        container_selector, containers = first_match(
+            "search",
+            "container",
+            CONTAINER_SELECTORS,
+            lambda selector: driver.find_elements(By.CSS_SELECTOR, selector),
+        )
+        if containers:
+            with span("extract"):
+                return [
+                    product
+                    for product in extract_cards(
+                        driver,
+                        container_selector,
+                        containers,
+                        0,
+                        len(containers),
+                        extraction,
                     )
-                    if len(new_containers) > current_count:
-                        containers = new_containers
-                        no_new_products_count = 0  # Reset counter
-                    else:
-                        no_new_products_count += 1
-
-                        # If we haven't found new products for 10 consecutive attempts, stop
-                        if no_new_products_count >= 10:
-                            break
-
-                    scroll_attempts += 1
-
-                # Show up to 100 products (or however many we found)
-                products_to_show = min(len(containers), target_count)
-
-                for i, container in enumerate(containers[:products_to_show]):
-                    try:
-                        # Look for name within this container
-                        name_element = None
-                        name_selectors_in_container = [
-                            "span.prdct-desc-cntnr-name",
-                            ".name",
-                            "span[class*='name']",
-                            "[class*='title']",
-                        ]
-
-                        for name_sel in name_selectors_in_container:
-                            try:
-                                name_element = container.find_element(
-                                    By.CSS_SELECTOR, name_sel
-                                )
-                                break
-                            except:
-                                continue
-
-                        # Look for description within this container
-                        description_element = None
-                        description_selectors_in_container = [
-                            ".product-desc-sub-text",
-                            "div[class*='desc']",
-                            "[class*='description']",
-                            ".prdct-desc-cntnr-ttl",
-                            "div[title]",
-                        ]
-
-                        for desc_sel in description_selectors_in_container:
-                            try:
-                                description_element = container.find_element(
-                                    By.CSS_SELECTOR, desc_sel
-                                )
-                                break
-                            except:
-                                continue
-
-                        # Look for price within this container
-                        price_element = None
-                        price_selectors_in_container = [
-                            ".prc-box-dscntd",
-                            ".prc-box-sllng",
-                            "[class*='price']",
-                            ".price",
-                            "span[class*='prc']",
-                        ]
-
-                        for price_sel in price_selectors_in_container:
-                            try:
-                                price_element = container.find_element(
-                                    By.CSS_SELECTOR, price_sel
-                                )
-                                break
-                            except:
-                                continue
-
-                        name_text = (
-                            name_element.text.strip()
-                            if name_element
-                            else "Name not found"
-                        )
-                        description_text = (
-                            description_element.text.strip()
-                            if description_element
-                            else "Description not found"
-                        )
-                        price_text = (
-                            price_element.text.strip()
-                            if price_element
-                            else "Price not found"
-                        )
-
-                        # If description is empty, try to get it from title attribute
-                        if (
-                            description_text == "Description not found"
-                            and description_element
-                        ):
-                            try:
-                                title_attr = description_element.get_attribute("title")
-                                if title_attr:
-                                    description_text = title_attr.strip()
-                            except:
-                                pass
-
-                        # Clean up price text - extract only the main price
-                        if price_text and price_text != "Price not found":
-                            # Split by newlines and take the first line that contains "TL"
-                            price_lines = price_text.split("\n")
-                            for line in price_lines:
-                                if "TL" in line and any(
-                                    char.isdigit() for char in line
-                                ):
-                                    price_text = line.strip()
-                                    break
-
-                        if name_text and name_text != "Name not found":
-                            print(f"{i+1}. Product: {name_text} | {description_text}")
-                            print(f"    Price: {price_text}")
-                            print()
-
-                    except Exception as e:
-                        continue
+                    if product.name != "Name not found"
+                ]
+
+    # No cards: past the last page
+    return []
+
+
+# Counts the page's fetch and XHR requests still in flight. Resource Timing
+# only lists finished requests and stops at its buffer size, so the feed
+# requests are tracked directly; installed once per page.
+NETWORK_TRACKER_SCRIPT = """
+if (!window.__trendyolNetwork) {
+    const network = {pending: 0, changed: performance.now()};
+    const start = () => { network.pending += 1; network.changed = performance.now(); };
+    const end = () => { network.pending -= 1; network.changed = performance.now(); };
+    if (window.fetch) {
+        const fetch = window.fetch;
+        window.fetch = function () {
+            start();
+            return fetch.apply(this, arguments).finally(end);
+        };
+    }
+    const send = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function () {
+        start();
+        this.addEventListener("loadend", end);
+        return send.apply(this, arguments);
+    };
+    window.__trendyolNetwork = network;
+}
+"""
+
+# Scrolls one viewport further down, keeping the last loaded card in view so
+# the infinite-scroll sentinel below it becomes visible
+SCROLL_STEP_SCRIPT = NETWORK_TRACKER_SCRIPT + """
+const cards = document.querySelectorAll(arguments[0]);
+if (cards.length) {
+    cards[cards.length - 1].scrollIntoView({block: "center"});
+}
+window.scrollBy(0, window.innerHeight);
+"""
+
+# Resolves true as soon as a card beyond arguments[1] is added, false once
+# no fetch or XHR has been in flight for arguments[2] ms or after
+# arguments[3] ms
+WAIT_FOR_CARDS_SCRIPT = NETWORK_TRACKER_SCRIPT + """
+const [selector, currentCount, idleMs, timeoutMs, done] = arguments;
+const network = window.__trendyolNetwork;
+const grew = () => document.querySelectorAll(selector).length > currentCount;
+if (grew()) {
+    done(true);
+    return;
+}
+const started = performance.now();
+let observer, timer, deadline;
+const finish = (result) => {
+    observer.disconnect();
+    clearInterval(timer);
+    clearTimeout(deadline);
+    done(result);
+};
+observer = new MutationObserver(() => {
+    if (grew()) finish(true);
+});
+observer.observe(document.body, {childList: true, subtree: true});
+timer = setInterval(() => {
+    const quiet = performance.now() - Math.max(network.changed, started);
+    if (network.pending <= 0 && quiet >= idleMs) finish(grew());
+}, 50);
+deadline = setTimeout(() => finish(grew()), timeoutMs);
+"""
+
+
+def scroll_for_more_cards(
+    driver,
+    container_selector,
+    containers,
+    target_count,
+    max_scroll_attempts,
+    on_growth=None,
+):
+    """
+    Scroll incrementally until `target_count` cards are loaded.
+    After each step, wait until the card count grows or no feed request has
+    been in flight for SCROLL_NETWORK_IDLE, capped at SCROLL_WAIT_TIMEOUT; `on_growth` is called with the
+    containers whenever new cards arrived. Returns the containers and the
+    time spent per phase.
+    """
+    timings = {"rounds": 0, "scroll": 0.0, "wait": 0.0, "extract": 0.0}
+    scroll_attempts = 0
+    no_new_products_count = 0
+
+    while len(containers) < target_count and scroll_attempts < max_scroll_attempts:
+        current_count = len(containers)
+
+        with span("scroll") as scroll_span:
+            driver.execute_script(SCROLL_STEP_SCRIPT, container_selector)
+        timings["scroll"] += scroll_span.seconds
+
+        with span("wait") as wait_span:
+            grew = wait_for_more_cards(driver, container_selector, current_count)
+        timings["wait"] += wait_span.seconds
+
+        if grew:
+            containers = driver.find_elements(By.CSS_SELECTOR, container_selector)
+            no_new_products_count = 0  # Reset counter
+            if on_growth:
+                on_growth(containers)
+        else:
+            no_new_products_count += 1
+
+            # Give up once several rounds in a row brought nothing new
+            if no_new_products_count >= NO_NEW_PRODUCTS_LIMIT:
+                scroll_attempts += 1
+                break
+
+        scroll_attempts += 1
 
+    timings["rounds"] = scroll_attempts
+    return containers, timings
+
+
+def wait_for_more_cards(
+    driver,
+    container_selector,
+    current_count,
+    timeout=config.SCROLL_WAIT_TIMEOUT,
+    network_idle=config.SCROLL_NETWORK_IDLE,
+):
+    """
+    Wait until more than `current_count` cards exist. Returns False early once
+    no fetch or XHR request has been in flight for `network_idle` seconds.
+    """
+    try:
+        return bool(
+            driver.execute_async_script(
+                WAIT_FOR_CARDS_SCRIPT,
+                container_selector,
+                current_count,
+                network_idle * 1000,
+                timeout * 1000,
+            )
+        )
+    except TimeoutException:
+        # The driver's script timeout is shorter than `timeout`
+        return (
+            len(driver.find_elements(By.CSS_SELECTOR, container_selector))
+            > current_count
+        )
+
+
+def extract_cards(driver, container_selector, containers, start, end, extraction):
+    """
+    Extract the cards [start:end], in one script when `extraction` is "js"
+    and with one WebDriver call per field otherwise or when the script fails.
+    """
+    products = None
+    if extraction == "js":
+        try:
+            products = extract_cards_js(driver, container_selector, end, start)
+        except Exception as e:
+            products = None
+
+    # Fall back to one WebDriver call per element
+    if not products:
+        products = extract_cards_per_element(containers[start:end])
+    return products
+
+
+def extract_cards_js(driver, container_selector, limit, offset=0):
+    """Extract name, description, price and link of cards [offset:limit] with one execute_script"""
+    field_selectors = _card_field_selectors()
+    raw_cards = driver.execute_script(
+        EXTRACT_CARDS_SCRIPT,
+        container_selector,
+        offset,
+        limit,
+        field_selectors["name"],
+        field_selectors["description"],
+        field_selectors["price"],
+    )
+    _record_card_selectors(raw_cards or [], field_selectors)
+    return [
+        _normalize_card(
+            card.get("name"),
+            card.get("description"),
+            card.get("price"),
+            card.get("url"),
+        )
+        for card in raw_cards or []
+    ]
+
+
+def extract_cards_per_element(containers):
+    """Extract name, description, price and link with one WebDriver call per lookup"""
+    field_selectors = _card_field_selectors()
+    products = []
+    for container in containers:
+        try:
+            # Look for name within this container
+            name_element = None
+            for name_sel in field_selectors["name"]:
+                try:
+                    name_element = container.find_element(By.CSS_SELECTOR, name_sel)
+                    break
+                except:
+                    continue
+
+            # Look for description within this container
+            description_element = None
+            for desc_sel in field_selectors["description"]:
+                try:
+                    description_element = container.find_element(
+                        By.CSS_SELECTOR, desc_sel
+                    )
+                    break
+                except:
+                    continue
+
+            # Look for price within this container
+            price_element = None
+            for price_sel in field_selectors["price"]:
+                try:
+                    price_element = container.find_element(By.CSS_SELECTOR, price_sel)
+                    break
+                except:
+                    continue
+
+            name_text = name_element.text.strip() if name_element else None
+            description_text = (
+                description_element.text.strip() if description_element else None
+            )
+            price_text = price_element.text.strip() if price_element else None
+
+            # If description is empty, try to get it from title attribute
+            if not description_text and description_element:
+                try:
+                    title_attr = description_element.get_attribute("title")
+                    if title_attr:
+                        description_text = title_attr.strip()
+                except:
+                    pass
+
+            # Product link, used to chain into the product tools
+            url = None
+            for link_sel in ("a[href*='-p-']", "a[href]"):
+                try:
+                    url = container.find_element(
+                        By.CSS_SELECTOR, link_sel
+                    ).get_attribute("href")
+                    break
+                except:
+                    continue
+
+            products.append(
+                _normalize_card(name_text, description_text, price_text, url)
+            )
+
+        except Exception as e:
+            products.append(_normalize_card(None, None, None))
+
+    return products
+
+
+def _card_field_selectors():
+    return {
+        "name": ordered_selectors("search", "name", NAME_SELECTORS),
+        # Subtitle before brand and discounted before regular price are
+        # preferences, so these lists keep their order
+        "description": ordered_selectors(
+            "search", "description", DESCRIPTION_SELECTORS, fixed=True
+        ),
+        "price": ordered_selectors("search", "price", PRICE_SELECTORS, fixed=True),
+    }
+
+
+def _record_card_selectors(raw_cards, field_selectors):
+    # One record per field and batch: the selector that matched most cards
+    if not raw_cards:
+        return
+    for field, selectors in field_selectors.items():
+        hits = Counter((card.get("selectors") or {}).get(field) for card in raw_cards)
+        hits.pop(None, None)
+        hit = hits.most_common(1)[0][0] if hits else None
+        record_selector("search", field, selectors, hit)
+
+
+def _normalize_card(name_text, description_text, price_text, url=None):
+    name_text = name_text or "Name not found"
+    description_text = description_text or "Description not found"
+    price_text = price_text or "Price not found"
+
+    # Clean up price text - extract only the main price
+    if price_text != "Price not found":
+        # Split by newlines and take the first line that contains "TL"
+        for line in price_text.split("\n"):
+            if "TL" in line and any(char.isdigit() for char in line):
+                price_text = line.strip()
                 break
 
-        driver.quit()
+    url = absolute_url(url)
+    return SearchProduct(
+        name_text, description_text, price_text, url, content_id_from_url(url)
+    )
+
+
+def render_search_result(result):
+    """Render a SearchResult in the numbered text format"""
+    lines = ["", "=== Product Results ==="]
+    for i, product in enumerate(result.products):
+        lines.append(f"{i+1}. Product: {product.name} | {product.description}")
+        lines.append(f"    Price: {product.price}")
+        if product.url:
+            lines.append(f"    URL: {product.url}")
+        if product.content_id:
+            lines.append(f"    Content ID: {product.content_id}")
+        lines.append("")
+
+    if result.timings:
+        lines.append(f"Timing ({result.backend}): " + format_timings(result.timings))
+    return "\n".join(lines)
 
-    except Exception as e:
-        if "driver" in locals():
-            driver.quit()
+
+def format_timings(timings):
+    """Format a phase -> seconds mapping; integer entries are counts"""
+    parts = []
+    for phase, value in timings.items():
+        if isinstance(value, int):
+            parts.append(f"{phase} {value}")
+        else:
+            parts.append(f"{phase} {value:.2f}s")
+    return " | ".join(parts)
+
+
+def print_search_results(result):
+    """Print a SearchResult in the numbered text format"""
+    print(render_search_result(result))
 
 
 if __name__ == "__main__":
     # Example usage
-    search_trendyol("laptop", target_count=100, max_scroll_attempts=10)
+    print_search_results(
+        search_trendyol("laptop", target_count=100, max_scroll_attempts=10)
+    )
@@ -0,0 +1,221 @@
+"""
+Adaptive ordering of CSS selector fallback lists.
+
+The scrapers try several selectors per element because Trendyol serves more
+than one page layout, and every miss before the working selector costs a
+lookup. The registry records, per page type and fallback list, which
+selector matched and which missed, keeps those counts in a small JSON file
+across restarts, and hands the lists back with the most recently successful
+selector first. Only true alternatives for the same value are reordered:
+lists ordered by preference (e.g. discounted before regular price) are
+marked fixed by their callers, and broad catch-alls (bare tag names,
+substring or presence attribute matches) keep their place in every list,
+since promoting them changes the value found rather than the lookup cost.
+A list in which no selector matched for several lookups in a row is reported
+on stderr, since it usually means the page markup changed.
+"""
+
+import atexit
+import json
+import os
+import re
+import sys
+import threading
+import time
+
+import config
+
+_registry = None
+_registry_lock = threading.Lock()
+
+# Bare tag names, substring attribute matches ([class*='price']) and attribute
+# presence tests ([title]) match far more than the element looked for
+_BROAD_SELECTOR = re.compile(r"^[a-z][a-z0-9]*$|\*=|\[[\w-]+\]")
+
+
+def get_selector_registry():
+    """Return the process-wide SelectorRegistry, creating it on first use"""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = SelectorRegistry()
+            atexit.register(_registry.save)
+        return _registry
+
+
+def ordered_selectors(page_type, name, selectors, fixed=False):
+    """
+    Return `selectors` in the order they should be tried; a `fixed` list is
+    ordered by preference and is never reordered.
+    """
+    return get_selector_registry().ordered(page_type, name, selectors, fixed)
+
+
+def record_selector(page_type, name, tried, hit):
+    """Record a lookup that tried `tried` in order and matched `hit` (None if nothing did)"""
+    get_selector_registry().record(page_type, name, tried, hit)
+
+
+def first_match(page_type, name, selectors, find, fixed=False):
+    """
+    Try the selectors in adaptive order and return (selector, result) for the
+    first one for which `find(selector)` returns something truthy, or
+    (None, None). Exceptions raised by `find` count as misses.
+    """
+    tried = ordered_selectors(page_type, name, selectors, fixed)
+    for selector in tried:
+        try:
+            result = find(selector)
+        except Exception as e:
+            result = None
+        if result:
+            record_selector(page_type, name, tried, selector)
+            return selector, result
+    record_selector(page_type, name, tried, None)
+    return None, None
+
+
+class SelectorRegistry:
+    """Per page type and list hit/miss counts of fallback selectors"""
+
+    def __init__(
+        self,
+        path=config.SELECTOR_STATS_FILE,
+        adaptive=config.SELECTOR_ADAPTIVE,
+        failure_alert=config.SELECTOR_FAILURE_ALERT,
+        save_interval=config.SELECTOR_SAVE_INTERVAL,
+    ):
+        self.path = path or None
+        self.adaptive = adaptive
+        self.failure_alert = failure_alert
+        self.save_interval = save_interval
+        self._lock = threading.Lock()
+        self._lists = self._load()
+        self._dirty = False
+        self._saved_at = time.monotonic()
+
+    def ordered(self, page_type, name, selectors, fixed=False):
+        if fixed or not self.adaptive:
+            return list(selectors)
+        with self._lock:
+            entry = self._lists.get(_list_key(page_type, name))
+            if entry is None:
+                return list(selectors)
+            last_hits = {
+                selector: stats.get("last_hit") or 0.0
+                for selector, stats in entry["selectors"].items()
+            }
+        # Most recent success first; never-matched selectors keep their place
+        # and broad ones keep their slot
+        positions = {selector: i for i, selector in enumerate(selectors)}
+        movable = iter(
+            sorted(
+                (selector for selector in selectors if not is_broad_selector(selector)),
+                key=lambda selector: (
+                    -last_hits.get(selector, 0.0),
+                    positions[selector],
+                ),
+            )
+        )
+        return [
+            selector if is_broad_selector(selector) else next(movable)
+            for selector in selectors
+        ]
+
+    def record(self, page_type, name, tried, hit):
+        key = _list_key(page_type, name)
+        now = time.time()
+        alert = False
+        with self._lock:
+            entry = self._lists.setdefault(
+                key, {"selectors": {}, "failures": 0, "consecutive_failures": 0}
+            )
+            for selector in tried:
+                stats = entry["selectors"].setdefault(
+                    selector, {"hits": 0, "misses": 0, "last_hit": None}
+                )
+                if selector == hit:
+                    stats["hits"] += 1
+                    stats["last_hit"] = now
+                    break
+                stats["misses"] += 1
+
+            if hit is None:
+                entry["failures"] += 1
+                entry["consecutive_failures"] += 1
+                alert = entry["consecutive_failures"] == self.failure_alert
+            else:
+                entry["consecutive_failures"] = 0
+            self._dirty = True
+            due = time.monotonic() - self._saved_at >= self.save_interval
+
+        if alert:
+            print(
+                f"Selector alert: no selector of {key} matched in "
+                f"{self.failure_alert} consecutive lookups; the page layout may have changed",
+                file=sys.stderr,
+            )
+        if due:
+            self.save()
+
+    def stats(self):
+        with self._lock:
+            lists = json.loads(json.dumps(self._lists))
+        failing = sorted(
+            key
+            for key, entry in lists.items()
+            if entry["consecutive_failures"] >= self.failure_alert
+        )
+        return {
+            "adaptive": self.adaptive,
+            "file": self.path,
+            "failing": failing,
+            "lists": lists,
+        }
+
+    def save(self):
+        """Write the statistics file if anything changed since the last write"""
+        with self._lock:
+            if not self._dirty or not self.path:
+                return
+            data = json.dumps({"lists": self._lists}, indent=2)
+            self._dirty = False
+            self._saved_at = time.monotonic()
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(data)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            # The statistics are an optimisation only
+            pass
+
+    def _load(self):
+        if not self.path:
+            return {}
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                lists = json.load(f).get("lists")
+        except (OSError, ValueError, AttributeError):
+            return {}
+        if not isinstance(lists, dict):
+            return {}
+        loaded = {}
+        for key, entry in lists.items():
+            if isinstance(entry, dict) and isinstance(entry.get("selectors"), dict):
+                entry.setdefault("failures", 0)
+                entry.setdefault("consecutive_failures", 0)
+                loaded[key] = entry
+        return loaded
+
+
+def is_broad_selector(selector):
+    """True for catch-all selectors that must not be promoted"""
+    return bool(_BROAD_SELECTOR.search(selector))
+
+
+def _list_key(page_type, name):
+    return f"{page_type}:{name}"
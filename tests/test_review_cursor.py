@@ -0,0 +1,37 @@
+from models import Review
+from review_cursor import is_newer, next_cursor, parse_since
+
+
+def review(text, date):
+    return Review(id=0, text=text, date=date)
+
+
+def test_date_cursor_keeps_reviews_posted_later_that_day():
+    morning = [review("Sabah gelen yorum", "2024-06-30"), review("Eski", "2024-06-29")]
+    cursor = next_cursor(morning, None)
+    assert cursor.startswith("2024-06-30:")
+
+    since = parse_since(cursor)
+    assert not is_newer(morning[0], since)
+    assert not is_newer(morning[1], since)
+    assert is_newer(review("Öğleden sonra gelen yorum", "2024-06-30"), since)
+    assert is_newer(review("Yarın", "2024-07-01"), since)
+
+
+def test_plain_date_includes_the_whole_day():
+    assert is_newer(review("Aynı gün", "2024-06-30"), parse_since("2024-06-30"))
+
+
+def test_boundary_day_hashes_accumulate():
+    first = next_cursor([review("a", "2024-06-30")], None)
+    second = next_cursor([review("b", "2024-06-30")], first)
+    since = parse_since(second)
+    assert not is_newer(review("a", "2024-06-30"), since)
+    assert not is_newer(review("b", "2024-06-30"), since)
+    assert next_cursor([], second) == second
+
+
+def test_id_cursor_is_strict():
+    since = parse_since("1005")
+    assert not is_newer(Review(id=0, text="x", review_id="1005"), since)
+    assert is_newer(Review(id=0, text="y", review_id="1006"), since)
@@ -0,0 +1,48 @@
+import os
+import re
+
+import pytest
+
+from models import SearchProduct
+from product_urls import BASE_URL
+from search_http import SearchParseError, extract_initial_state, parse_search_html
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+@pytest.fixture
+def search_html():
+    with open(os.path.join(FIXTURES_DIR, "search_page.html"), encoding="utf-8") as f:
+        return f.read()
+
+
+def without_state(html):
+    return re.sub(r"<script\b.*?</script>", "", html, flags=re.S)
+
+
+def test_state_path_parses_saved_page(search_html):
+    assert extract_initial_state(search_html)["query"] == "laptop"
+    assert parse_search_html(search_html)[0] == SearchProduct(
+        name='IdeaPad Slim 3 Intel Core i5 12450H 16GB 512GB SSD 15.6" FHD',
+        description="Lenovo",
+        price="19.499,90 TL",
+        url=BASE_URL
+        + "/lenovo/ideapad-slim-3-intel-core-i5-12450h-16gb-512gb-ssd-15-6-p-734117865"
+        "?boutiqueId=61&merchantId=968",
+        content_id="734117865",
+    )
+
+
+def test_card_path_matches_state_path(search_html):
+    card_html = without_state(search_html)
+    assert extract_initial_state(card_html) is None
+
+    state_products = parse_search_html(search_html)
+    card_products = parse_search_html(card_html)
+    assert len(state_products) == 3
+    assert card_products == state_products
+
+
+def test_page_without_products_is_a_parse_error():
+    with pytest.raises(SearchParseError):
+        parse_search_html("<html><body><p>Sonuç bulunamadı</p></body></html>")
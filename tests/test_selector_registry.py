@@ -0,0 +1,56 @@
+import pytest
+
+import selector_registry
+from get_product_details import DETAIL_FIELDS, extract_product_page_details
+from search_trendyol import _card_field_selectors, _record_card_selectors
+from selector_registry import SelectorRegistry
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    registry = SelectorRegistry(path=None, adaptive=True)
+    monkeypatch.setattr(selector_registry, "_registry", registry)
+    return registry
+
+
+def test_recent_hit_is_tried_first(registry):
+    selectors = [".rating-score", "[class*='rating']", ".star-rating"]
+    registry.record("product", "rating", selectors, ".star-rating")
+    assert registry.ordered("product", "rating", selectors) == [
+        ".star-rating",
+        "[class*='rating']",
+        ".rating-score",
+    ]
+
+
+def test_broad_selector_keeps_its_place(registry):
+    selectors = [".p-card-wrppr", "[class*='product-item']", ".product-down"]
+    registry.record("search", "container", selectors, "[class*='product-item']")
+    assert registry.ordered("search", "container", selectors) == selectors
+
+
+def test_discounted_search_price_after_undiscounted_card(registry):
+    # A batch of cards without a discount matches the regular price
+    field_selectors = _card_field_selectors()
+    _record_card_selectors(
+        [{"selectors": {"price": ".prc-box-sllng"}}] * 20
+        + [{"selectors": {"price": ".prc-box-dscntd"}}],
+        field_selectors,
+    )
+    assert _card_field_selectors()["price"][0] == ".prc-box-dscntd"
+
+
+class RecordingDriver:
+    def __init__(self):
+        self.field_selectors = None
+
+    def execute_script(self, script, field_selectors, *args):
+        self.field_selectors = field_selectors
+        return {"values": {}, "hits": {}}
+
+
+def test_discounted_detail_price_after_undiscounted_product(registry):
+    registry.record("product", "price", DETAIL_FIELDS["price"], ".prc-box-sllng")
+    driver = RecordingDriver()
+    extract_product_page_details(driver, ["price"])
+    assert driver.field_selectors["price"] == DETAIL_FIELDS["price"]
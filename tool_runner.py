@@ -0,0 +1,68 @@
+"""
+Off-loop execution of the blocking Trendyol scrapers.
+
+The scrapers drive Selenium and sleep while pages load, so running them on
+the asyncio event loop would stall the whole MCP server. Tool calls are
+handed to a bounded thread pool instead; each call returns its own result
+record through its future.
+"""
+
+import asyncio
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import config
+
+
+class ToolQueueFullError(RuntimeError):
+    """Raised when too many tool calls are already waiting for a worker"""
+
+
+class ToolRunner:
+    """Runs blocking tool functions on a bounded pool of worker threads"""
+
+    def __init__(
+        self,
+        max_concurrency=config.TOOL_MAX_CONCURRENCY,
+        max_queue=config.TOOL_MAX_QUEUE,
+    ):
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_queue = max(0, max_queue)
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_concurrency, thread_name_prefix="trendyol-tool"
+        )
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    async def run(self, func, *args, **kwargs):
+        """Run `func` on a worker thread and return its result"""
+        with self._lock:
+            if self._pending >= self.max_concurrency + self.max_queue:
+                raise ToolQueueFullError(
+                    f"Too many tool calls in progress ({self._pending}), try again later"
+                )
+            self._pending += 1
+
+        try:
+            loop = asyncio.get_running_loop()
+            # Carry the caller's context, e.g. its trace, over to the worker
+            context = contextvars.copy_context()
+            return await loop.run_in_executor(
+                self._executor, lambda: context.run(func, *args, **kwargs)
+            )
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def stats(self):
+        """Return the number of running plus queued tool calls"""
+        with self._lock:
+            return {
+                "max_concurrency": self.max_concurrency,
+                "max_queue": self.max_queue,
+                "pending": self._pending,
+            }
+
+    def shutdown(self, wait=False):
+        self._executor.shutdown(wait=wait, cancel_futures=True)
@@ -0,0 +1,342 @@
+"""
+Per-phase latency tracing and server metrics.
+
+Every tool call runs inside a trace, and the scrapers wrap each of their
+phases (driver install, Chrome launch, pool lease, navigation, click-through,
+scrolling, waiting, extraction, HTTP fetches, ...) in a span. A span times
+its phase and counts the exception that escapes it before the scrapers'
+catch-all handlers swallow it, so a slow or failing call can be traced back
+to the phase responsible. Latencies go into fixed-bucket histograms per tool
+and per phase. They are reported by the get_server_metrics tool and, when
+configured, written to a Prometheus text file after every call.
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+import config
+
+# Upper bounds in seconds of the latency histogram buckets
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+# Spans kept per trace; scroll loops can produce many
+MAX_TRACE_SPANS = 200
+
+_current_trace = ContextVar("trendyol_trace", default=None)
+
+
+class Histogram:
+    """Cumulative latency histogram with Prometheus-style buckets"""
+
+    __slots__ = ("counts", "count", "sum", "max")
+
+    def __init__(self):
+        self.counts = [0] * len(LATENCY_BUCKETS)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds):
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if seconds <= bound:
+                self.counts[i] += 1
+                break
+        self.count += 1
+        self.sum += seconds
+        self.max = max(self.max, seconds)
+
+    def cumulative(self):
+        """(upper bound, observations at or below it) per bucket, ending with +Inf"""
+        buckets = []
+        total = 0
+        for bound, count in zip(LATENCY_BUCKETS, self.counts):
+            total += count
+            buckets.append((bound, total))
+        buckets.append((float("inf"), self.count))
+        return buckets
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "seconds_total": round(self.sum, 3),
+            "seconds_mean": round(self.sum / self.count, 3) if self.count else 0.0,
+            "seconds_max": round(self.max, 3),
+            "buckets": {
+                _format_bound(bound): count for bound, count in self.cumulative()
+            },
+        }
+
+
+class Trace:
+    """The spans of one tool call"""
+
+    def __init__(self, tool):
+        self.tool = tool
+        self.started_at = time.time()
+        self.started = time.monotonic()
+        self.outcome = "ok"
+        self.error = None
+        self.seconds = None
+        self.spans = []
+        self._lock = threading.Lock()
+
+    def add_span(self, phase, started, seconds, error):
+        with self._lock:
+            if len(self.spans) < MAX_TRACE_SPANS:
+                self.spans.append(
+                    {
+                        "phase": phase,
+                        "offset": round(started - self.started, 3),
+                        "seconds": round(seconds, 3),
+                        "error": error,
+                    }
+                )
+
+    def to_dict(self):
+        with self._lock:
+            spans = list(self.spans)
+        return {
+            "tool": self.tool,
+            "started_at": self.started_at,
+            "seconds": None if self.seconds is None else round(self.seconds, 3),
+            "outcome": self.outcome,
+            "error": self.error,
+            "spans": spans,
+        }
+
+
+class Span:
+    """Timing of one phase; `seconds` is set when the phase ends"""
+
+    __slots__ = ("phase", "seconds")
+
+    def __init__(self, phase):
+        self.phase = phase
+        self.seconds = 0.0
+
+
+class Metrics:
+    """Process-wide call counters, failure counters and latency histograms"""
+
+    def __init__(self, trace_history=config.METRICS_TRACE_HISTORY):
+        self.started_at = time.time()
+        self._lock = threading.Lock()
+        self._calls = {}  # (tool, outcome) -> count
+        self._tool_latency = {}  # tool -> Histogram
+        self._phase_latency = {}  # (tool, phase) -> Histogram
+        self._phase_failures = {}  # (tool, phase, error type) -> count
+        self._recent = deque(maxlen=max(0, trace_history))
+
+    def record_call(self, trace):
+        with self._lock:
+            key = (trace.tool, trace.outcome)
+            self._calls[key] = self._calls.get(key, 0) + 1
+            self._tool_latency.setdefault(trace.tool, Histogram()).observe(
+                trace.seconds
+            )
+            self._recent.append(trace)
+
+    def record_phase(self, tool, phase, seconds, error=None):
+        with self._lock:
+            self._phase_latency.setdefault((tool, phase), Histogram()).observe(seconds)
+            if error is not None:
+                key = (tool, phase, error)
+                self._phase_failures[key] = self._phase_failures.get(key, 0) + 1
+
+    def snapshot(self):
+        """Return the metrics as a JSON-serializable dict"""
+        with self._lock:
+            tools = {}
+            for (tool, outcome), count in sorted(self._calls.items()):
+                entry = tools.setdefault(tool, {"calls": 0, "outcomes": {}})
+                entry["calls"] += count
+                entry["outcomes"][outcome] = count
+            for tool, histogram in self._tool_latency.items():
+                tools.setdefault(tool, {"calls": 0, "outcomes": {}})[
+                    "latency"
+                ] = histogram.to_dict()
+
+            phases = {}
+            for (tool, phase), histogram in sorted(self._phase_latency.items()):
+                phases.setdefault(tool, {})[phase] = {
+                    "latency": histogram.to_dict(),
+                    "failures": {},
+                }
+            for (tool, phase, error), count in sorted(self._phase_failures.items()):
+                phases[tool][phase]["failures"][error] = count
+
+            recent = list(self._recent)
+
+        return {
+            "uptime_seconds": round(time.time() - self.started_at, 1),
+            "tools": tools,
+            "phases": phases,
+            "recent_traces": [trace.to_dict() for trace in reversed(recent)],
+        }
+
+    def render_prometheus(self):
+        """Return the metrics in the Prometheus text exposition format"""
+        with self._lock:
+            calls = sorted(self._calls.items())
+            tool_latency = sorted(
+                (tool, histogram.cumulative(), histogram.sum, histogram.count)
+                for tool, histogram in self._tool_latency.items()
+            )
+            phase_latency = sorted(
+                (key, histogram.cumulative(), histogram.sum, histogram.count)
+                for key, histogram in self._phase_latency.items()
+            )
+            failures = sorted(self._phase_failures.items())
+
+        lines = [
+            "# HELP trendyol_tool_calls_total Tool calls by outcome.",
+            "# TYPE trendyol_tool_calls_total counter",
+        ]
+        for (tool, outcome), count in calls:
+            lines.append(
+                f"trendyol_tool_calls_total{_labels(tool=tool, outcome=outcome)} {count}"
+            )
+
+        lines += [
+            "# HELP trendyol_tool_latency_seconds Tool call latency.",
+            "# TYPE trendyol_tool_latency_seconds histogram",
+        ]
+        for tool, buckets, total, count in tool_latency:
+            lines += _histogram_lines(
+                "trendyol_tool_latency_seconds", {"tool": tool}, buckets, total, count
+            )
+
+        lines += [
+            "# HELP trendyol_phase_latency_seconds Latency of each phase of a tool call.",
+            "# TYPE trendyol_phase_latency_seconds histogram",
+        ]
+        for (tool, phase), buckets, total, count in phase_latency:
+            lines += _histogram_lines(
+                "trendyol_phase_latency_seconds",
+                {"tool": tool, "phase": phase},
+                buckets,
+                total,
+                count,
+            )
+
+        lines += [
+            "# HELP trendyol_phase_failures_total Exceptions raised per phase.",
+            "# TYPE trendyol_phase_failures_total counter",
+        ]
+        for (tool, phase, error), count in failures:
+            lines.append(
+                "trendyol_phase_failures_total"
+                f"{_labels(tool=tool, phase=phase, error=error)} {count}"
+            )
+        return "\n".join(lines) + "\n"
+
+
+_metrics = Metrics()
+
+
+def get_metrics():
+    """Return the process-wide Metrics"""
+    return _metrics
+
+
+@contextmanager
+def trace(tool):
+    """
+    Trace one call of `tool`. Spans opened on this thread, or on threads
+    started through bind_trace, are attributed to it. Set `outcome` on the
+    yielded Trace to label calls that did not simply succeed.
+    """
+    current = Trace(tool)
+    token = _current_trace.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.outcome = "error"
+        current.error = type(e).__name__
+        raise
+    finally:
+        _current_trace.reset(token)
+        current.seconds = time.monotonic() - current.started
+        _metrics.record_call(current)
+        write_metrics_file()
+
+
+@contextmanager
+def span(phase):
+    """Time one phase of the current tool call and count its failures"""
+    current = _current_trace.get()
+    timing = Span(phase)
+    started = time.monotonic()
+    error = None
+    try:
+        yield timing
+    except BaseException as e:
+        error = type(e).__name__
+        raise
+    finally:
+        timing.seconds = time.monotonic() - started
+        tool = current.tool if current is not None else "none"
+        _metrics.record_phase(tool, phase, timing.seconds, error)
+        if current is not None:
+            current.add_span(phase, started, timing.seconds, error)
+
+
+def bind_trace(func):
+    """Wrap `func` so it records its spans into the caller's trace on any thread"""
+    current = _current_trace.get()
+
+    def run(*args, **kwargs):
+        token = _current_trace.set(current)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _current_trace.reset(token)
+
+    return run
+
+
+def write_metrics_file(path=config.METRICS_FILE):
+    """Write the Prometheus text file, e.g. for node_exporter's textfile collector"""
+    if not path:
+        return
+    try:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(_metrics.render_prometheus())
+        os.replace(tmp_path, path)
+    except OSError:
+        # Metrics must never break a tool call
+        pass
+
+
+def _histogram_lines(name, labels, buckets, total, count):
+    lines = [
+        f"{name}_bucket{_labels(**labels, le=_format_bound(bound))} {cumulative}"
+        for bound, cumulative in buckets
+    ]
+    lines.append(f"{name}_sum{_labels(**labels)} {total:.6f}")
+    lines.append(f"{name}_count{_labels(**labels)} {count}")
+    return lines
+
+
+def _labels(**labels):
+    return (
+        "{"
+        + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items())
+        + "}"
+    )
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_bound(bound):
+    return "+Inf" if bound == float("inf") else f"{bound:g}"
@@ -6,24 +6,118 @@ An MCP server that provides Trendyol product search functionality.
 """
 
 import asyncio
+import importlib
 import json
 import sys
-from typing import Any, Sequence
+import threading
+from typing import Any
 
 import mcp.types as types
 from mcp.server import NotificationOptions, Server
 from mcp.server.models import InitializationOptions
 import mcp.server.stdio
 
-# Import the search function from our existing module
-from search_trendyol import search_trendyol
-from get_product_details import get_product_details
-from get_product_image import get_product_image
-from get_product_reviews import get_product_reviews
+# The tool modules pull in Selenium, Pillow and requests; they are imported
+# on first use so a server launch only pays for MCP itself
+from models import (
+    BUNDLE_SECTIONS,
+    BatchItem,
+    ProductBundle,
+    ProductDetails,
+    ProductImages,
+    ProductReviews,
+    SearchResult,
+    to_dict,
+)
+from product_urls import check_product_url
+from review_cursor import parse_since
+
+import config
+from result_cache import ResultCache
+from tool_runner import ToolRunner
+from tracing import get_metrics, span, trace
 
 # Create the server instance
 server = Server("trendyol-search")
 
+# Worker threads that execute the blocking scraper tools
+tool_runner = ToolRunner()
+
+# Tool responses cached in memory and on disk
+result_cache = ResultCache()
+
+# Optional text renderers as (module, function); tools answer with JSON
+# records by default
+RENDERERS = {
+    "search_trendyol": ("search_trendyol", "render_search_result"),
+    "get_product_details": ("get_product_details", "render_product_details"),
+    "get_product_image": ("get_product_image", "render_product_images"),
+    "get_product_reviews": ("get_product_reviews", "render_product_reviews"),
+    "get_product_bundle": ("get_product_bundle", "render_product_bundle"),
+    "get_product_details_batch": (
+        "get_product_details",
+        "render_product_details_batch",
+    ),
+    "get_product_reviews_batch": (
+        "get_product_reviews",
+        "render_product_reviews_batch",
+    ),
+}
+
+
+# Tools that stream batches as progress notifications:
+# name -> (message key, count argument, default count)
+STREAMED_TOOLS = {
+    "search_trendyol": ("products", "target_count", 100),
+    "get_product_reviews": ("reviews", "max_reviews", config.REVIEWS_DEFAULT_COUNT),
+}
+
+
+def _renderer(name: str) -> Any:
+    """Import the text renderer of a tool"""
+    module_name, function_name = RENDERERS[name]
+    return getattr(importlib.import_module(module_name), function_name)
+
+
+def _product_target_properties(purpose: str) -> dict[str, Any]:
+    """Input schema properties that identify a product; one of them is required"""
+    return {
+        "product_name": {
+            "type": "string",
+            "description": f"The product name to search for and {purpose}",
+        },
+        "product_url": {
+            "type": "string",
+            "description": "Product page URL (e.g. from search_trendyol results); skips the search",
+        },
+        "content_id": {
+            "type": ["string", "integer"],
+            "description": "Trendyol product content ID (e.g. from search_trendyol results); skips the search",
+        },
+    }
+
+
+def _batch_input_schema(purpose: str) -> dict[str, Any]:
+    """Input schema shared by the batch product tools"""
+    return {
+        "type": "object",
+        "properties": {
+            "product_names": {
+                "type": "array",
+                "items": {"type": "string"},
+                "description": f"Product names to search for and {purpose}",
+                "minItems": 1,
+                "maxItems": config.BATCH_MAX_ITEMS,
+            },
+            "parallelism": {
+                "type": "integer",
+                "description": f"Products processed at the same time (default: {config.BATCH_PARALLELISM}, capped by the browser pool size)",
+                "minimum": 1,
+            },
+        },
+        "required": ["product_names"],
+    }
+
 
 @server.list_tools()
 async def handle_list_tools() -> list[types.Tool]:
@@ -31,7 +125,7 @@ async def handle_list_tools() -> list[types.Tool]:
     List available tools.
     Each tool specifies its arguments using JSON Schema validation.
     """
-    return [
+    tools = [
         types.Tool(
             name="search_trendyol",
             description="Search for products on Trendyol with detailed information including names, descriptions, and prices",
@@ -44,10 +138,33 @@ async def handle_list_tools() -> list[types.Tool]:
                     },
                     "target_count": {
                         "type": "integer",
-                        "description": "Number of products to retrieve (default: 100, max: 100)",
+                        "description": f"Number of products to retrieve (default: 100, max: 100 when scrolling, {config.SEARCH_MAX_RESULTS} with pagination 'pages' or the HTTP backend)",
                         "default": 100,
                         "minimum": 1,
-                        "maximum": 100,
+                        "maximum": config.SEARCH_MAX_RESULTS,
+                    },
+                    "pagination": {
+                        "type": "string",
+                        "enum": ["scroll", "pages"],
+                        "description": "How the browser collects results: 'scroll' reads one infinite-scroll feed, 'pages' loads result pages in parallel by page index (default: scroll; the HTTP backend always reads pages)",
+                        "default": "scroll",
+                    },
+                    "extraction": {
+                        "type": "string",
+                        "enum": ["js", "element"],
+                        "description": "How product cards are read: 'js' extracts all cards in one browser script, 'element' queries each field separately (default: js)",
+                        "default": "js",
+                    },
+                    "backend": {
+                        "type": "string",
+                        "enum": ["auto", "http", "browser"],
+                        "description": "Where results come from: 'http' parses the server-rendered page without a browser, 'browser' uses Chrome, 'auto' tries HTTP first and falls back to Chrome (default: auto)",
+                        "default": "auto",
+                    },
+                    "stream": {
+                        "type": "boolean",
+                        "description": "Send products as progress notifications while the search runs; needs a progressToken in the request (default: true)",
+                        "default": True,
                     },
                 },
                 "required": ["query"],
@@ -58,27 +175,31 @@ async def handle_list_tools() -> list[types.Tool]:
             description="Get detailed information about a specific product including title, price, description, features, rating, and brand",
             inputSchema={
                 "type": "object",
-                "properties": {
-                    "product_name": {
-                        "type": "string",
-                        "description": "The product name to search for and get details",
-                    }
-                },
-                "required": ["product_name"],
+                "properties": _product_target_properties("get details"),
             },
         ),
         types.Tool(
             name="get_product_image",
-            description="Extract and display product images from the product gallery carousel",
+            description="List the product gallery images and return them as downloaded thumbnails",
             inputSchema={
                 "type": "object",
                 "properties": {
-                    "product_name": {
-                        "type": "string",
-                        "description": "The product name to search for and get images",
-                    }
+                    **_product_target_properties("get images"),
+                    "max_images": {
+                        "type": "integer",
+                        "description": f"Number of gallery images to download (default: {config.IMAGE_MAX_COUNT})",
+                        "default": config.IMAGE_MAX_COUNT,
+                        "minimum": 0,
+                        "maximum": 20,
+                    },
+                    "max_size": {
+                        "type": "integer",
+                        "description": f"Longest side of the returned thumbnails in pixels (default: {config.IMAGE_MAX_SIZE})",
+                        "default": config.IMAGE_MAX_SIZE,
+                        "minimum": 16,
+                        "maximum": 2048,
+                    },
                 },
-                "required": ["product_name"],
             },
         ),
         types.Tool(
@@ -87,91 +208,329 @@ async def handle_list_tools() -> list[types.Tool]:
             inputSchema={
                 "type": "object",
                 "properties": {
-                    "product_name": {
+                    **_product_target_properties("get reviews"),
+                    "max_reviews": {
+                        "type": "integer",
+                        "description": f"Number of reviews to harvest (default: {config.REVIEWS_DEFAULT_COUNT}, max: {config.REVIEWS_MAX_COUNT})",
+                        "default": config.REVIEWS_DEFAULT_COUNT,
+                        "minimum": 1,
+                        "maximum": config.REVIEWS_MAX_COUNT,
+                    },
+                    "backend": {
+                        "type": "string",
+                        "enum": ["auto", "http", "browser"],
+                        "description": "Where reviews come from: 'http' reads the reviews JSON endpoint by content ID, 'browser' scrolls the reviews page in Chrome, 'auto' tries HTTP first and falls back to Chrome (default: auto)",
+                        "default": "auto",
+                    },
+                    "since": {
+                        "type": ["string", "integer"],
+                        "description": "Only return reviews newer than this cursor: a review ID, a date (YYYY-MM-DD) or the cursor of the previous harvest",
+                    },
+                    "stream": {
+                        "type": "boolean",
+                        "description": "Send reviews as progress notifications while they are harvested; needs a progressToken in the request (default: true)",
+                        "default": True,
+                    },
+                },
+            },
+        ),
+        types.Tool(
+            name="get_product_bundle",
+            description="Get product details, gallery images and customer reviews in one product page visit",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    **_product_target_properties("get everything about"),
+                    "sections": {
+                        "type": "array",
+                        "items": {"type": "string", "enum": list(BUNDLE_SECTIONS)},
+                        "description": "Sections to include; unused extractors are skipped (default: all)",
+                        "default": list(BUNDLE_SECTIONS),
+                    },
+                },
+            },
+        ),
+        types.Tool(
+            name="get_product_details_batch",
+            description="Get detailed information about several products in parallel; results are returned in input order with per-item errors and timing",
+            inputSchema=_batch_input_schema("get details"),
+        ),
+        types.Tool(
+            name="get_product_reviews_batch",
+            description="Extract customer reviews for several products in parallel; results are returned in input order with per-item errors and timing",
+            inputSchema=_batch_input_schema("get reviews"),
+        ),
+        types.Tool(
+            name="get_cache_stats",
+            description="Report hit/miss counters and sizes of the tool result cache and the image store, and selector hit rates",
+            inputSchema={"type": "object", "properties": {}},
+        ),
+        types.Tool(
+            name="get_server_metrics",
+            description="Report tool call counts, latency histograms per tool and per phase (browser launch, navigation, scrolling, extraction, ...), failures per phase and the most recent call traces",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "format": {
                         "type": "string",
-                        "description": "The product name to search for and get reviews",
-                    }
+                        "enum": ["json", "prometheus"],
+                        "description": "Response format: 'json' or the Prometheus text exposition format (default: json)",
+                        "default": "json",
+                    },
                 },
-                "required": ["product_name"],
             },
         ),
     ]
 
+    for tool in tools:
+        # Every scraping tool can answer as JSON or in the printed text layout
+        if tool.name in RENDERERS:
+            tool.inputSchema["properties"]["format"] = {
+                "type": "string",
+                "enum": ["json", "text"],
+                "description": "Response format: 'json' returns structured records, 'text' the human-readable layout (default: json)",
+                "default": "json",
+            }
 
-@server.call_tool()
-async def handle_call_tool(
-    name: str, arguments: dict[str, Any] | None
-) -> list[types.TextContent]:
+        # Every cached tool accepts a flag that forces a fresh scrape
+        if result_cache.is_cached_tool(tool.name):
+            tool.inputSchema["properties"]["no_cache"] = {
+                "type": "boolean",
+                "description": "Skip the result cache and scrape fresh data (the fresh result is still stored)",
+                "default": False,
+            }
+
+    return tools
+
+
+def _product_target(
+    arguments: dict[str, Any],
+) -> tuple[str | None, str | None, str | None]:
+    """Return (product_name, product_url, content_id) from the tool arguments"""
+    product_name = arguments.get("product_name")
+    product_url = arguments.get("product_url")
+    content_id = arguments.get("content_id")
+    if not (product_name or product_url or content_id):
+        raise ValueError(
+            "Missing required argument: one of product_name, product_url or content_id"
+        )
+    if content_id is not None and not str(content_id).strip().isdigit():
+        raise ValueError("content_id must be numeric")
+    if product_url:
+        product_url = check_product_url(product_url)
+    return product_name, product_url, content_id
+
+
+def _dispatch_tool(name: str, arguments: dict[str, Any], on_batch: Any = None) -> Any:
     """
-    Handle tool calls from the client.
+    Validate the arguments, run the requested tool and return its record.
+    Runs on a worker thread; `on_batch` streams search results and reviews
+    as they load.
     """
-    if not arguments:
-        raise ValueError("Missing arguments")
+    if name == "search_trendyol":
+        query = arguments.get("query")
+        if not query:
+            raise ValueError("Missing required argument: query")
 
-    try:
-        # Capture the output by redirecting stdout
-        import io
-        import contextlib
+        target_count = arguments.get("target_count", 100)
+        max_scroll_attempts = arguments.get("max_scroll_attempts", 15)
 
-        # Create a string buffer to capture output
-        captured_output = io.StringIO()
+        pagination = arguments.get("pagination", "scroll")
+        if pagination not in ("scroll", "pages"):
+            raise ValueError("pagination must be 'scroll' or 'pages'")
 
-        # Redirect stdout to capture the function's print statements
-        with contextlib.redirect_stdout(captured_output):
-            if name == "search_trendyol":
-                query = arguments.get("query")
-                if not query:
-                    raise ValueError("Missing required argument: query")
+        backend = arguments.get("backend", config.SEARCH_BACKEND)
+        if backend not in ("auto", "http", "browser"):
+            raise ValueError("backend must be 'auto', 'http' or 'browser'")
 
-                target_count = arguments.get("target_count", 100)
-                max_scroll_attempts = arguments.get("max_scroll_attempts", 15)
+        # Validate arguments; only page-based searches go past 100 products
+        max_count = 100
+        if pagination == "pages" or backend == "http":
+            max_count = config.SEARCH_MAX_RESULTS
+        if target_count < 1 or target_count > max_count:
+            raise ValueError(f"target_count must be between 1 and {max_count}")
 
-                # Validate arguments
-                if target_count < 1 or target_count > 100:
-                    raise ValueError("target_count must be between 1 and 100")
+        if max_scroll_attempts < 1 or max_scroll_attempts > 30:
+            raise ValueError("max_scroll_attempts must be between 1 and 30")
 
-                if max_scroll_attempts < 1 or max_scroll_attempts > 30:
-                    raise ValueError("max_scroll_attempts must be between 1 and 30")
+        extraction = arguments.get("extraction", "js")
+        if extraction not in ("js", "element"):
+            raise ValueError("extraction must be 'js' or 'element'")
 
-                # Call the search function
-                search_trendyol(query, target_count, max_scroll_attempts)
+        # Call the search function
+        from search_trendyol import search_trendyol
 
-            elif name == "get_product_details":
-                product_name = arguments.get("product_name")
-                if not product_name:
-                    raise ValueError("Missing required argument: product_name")
+        return search_trendyol(
+            query,
+            target_count,
+            max_scroll_attempts,
+            extraction,
+            backend,
+            on_batch,
+            pagination,
+        )
 
-                # Call the product details function
-                get_product_details(product_name)
+    elif name == "get_product_details":
+        # Call the product details function
+        from get_product_details import get_product_details
 
-            elif name == "get_product_image":
-                product_name = arguments.get("product_name")
-                if not product_name:
-                    raise ValueError("Missing required argument: product_name")
+        return get_product_details(*_product_target(arguments))
 
-                # Call the product image function
-                get_product_image(product_name)
+    elif name == "get_product_image":
+        max_images = arguments.get("max_images", config.IMAGE_MAX_COUNT)
+        if max_images < 0 or max_images > 20:
+            raise ValueError("max_images must be between 0 and 20")
 
-            elif name == "get_product_reviews":
-                product_name = arguments.get("product_name")
-                if not product_name:
-                    raise ValueError("Missing required argument: product_name")
+        max_size = arguments.get("max_size", config.IMAGE_MAX_SIZE)
+        if max_size < 16 or max_size > 2048:
+            raise ValueError("max_size must be between 16 and 2048")
 
-                # Call the product reviews function
-                get_product_reviews(product_name)
+        # Call the product image function
+        from get_product_image import get_product_image
 
-            else:
-                raise ValueError(f"Unknown tool: {name}")
+        return get_product_image(
+            *_product_target(arguments), max_images=max_images, max_size=max_size
+        )
 
-        # Get the captured output
-        captured_results = captured_output.getvalue()
+    elif name == "get_product_reviews":
+        max_reviews = arguments.get("max_reviews", config.REVIEWS_DEFAULT_COUNT)
+        if max_reviews < 1 or max_reviews > config.REVIEWS_MAX_COUNT:
+            raise ValueError(
+                f"max_reviews must be between 1 and {config.REVIEWS_MAX_COUNT}"
+            )
 
-        return [
-            types.TextContent(
-                type="text",
-                text=f"Trendyol {name} Results:\n\n{captured_results}",
+        since = arguments.get("since")
+        parse_since(since)
+
+        backend = arguments.get("backend", config.REVIEWS_BACKEND)
+        if backend not in ("auto", "http", "browser"):
+            raise ValueError("backend must be 'auto', 'http' or 'browser'")
+
+        # Call the product reviews function
+        from get_product_reviews import get_product_reviews
+
+        return get_product_reviews(
+            *_product_target(arguments),
+            max_reviews=max_reviews,
+            since=since,
+            on_reviews=on_batch,
+            backend=backend,
+        )
+
+    elif name == "get_product_bundle":
+        sections = arguments.get("sections") or list(BUNDLE_SECTIONS)
+        unknown = [section for section in sections if section not in BUNDLE_SECTIONS]
+        if unknown:
+            raise ValueError(f"Unknown sections: {', '.join(unknown)}")
+
+        # Call the product bundle function
+        from get_product_bundle import get_product_bundle
+
+        return get_product_bundle(*_product_target(arguments), sections=sections)
+
+    elif name in ("get_product_details_batch", "get_product_reviews_batch"):
+        product_names = arguments.get("product_names")
+        if not product_names or not all(
+            isinstance(product_name, str) and product_name.strip()
+            for product_name in product_names
+        ):
+            raise ValueError("product_names must be a non-empty list of names")
+        if len(product_names) > config.BATCH_MAX_ITEMS:
+            raise ValueError(
+                f"product_names accepts at most {config.BATCH_MAX_ITEMS} items"
             )
-        ]
+
+        parallelism = arguments.get("parallelism")
+        if parallelism is not None and parallelism < 1:
+            raise ValueError("parallelism must be at least 1")
+
+        # Call the batch function
+        if name == "get_product_details_batch":
+            from get_product_details import get_product_details_batch
+
+            return get_product_details_batch(product_names, parallelism)
+
+        from get_product_reviews import get_product_reviews_batch
+
+        return get_product_reviews_batch(product_names, parallelism)
+
+    else:
+        raise ValueError(f"Unknown tool: {name}")
+
+
+@server.call_tool()
+async def handle_call_tool(
+    name: str, arguments: dict[str, Any] | None
+) -> list[types.TextContent | types.ImageContent]:
+    """
+    Handle tool calls from the client.
+    """
+    if name == "get_cache_stats":
+        # The stores query SQLite under their locks, keep that off the loop
+        stats = await asyncio.to_thread(_cache_stats)
+        return [types.TextContent(type="text", text=json.dumps(stats, indent=2))]
+
+    if name == "get_server_metrics":
+        metrics_format = (arguments or {}).get("format", "json")
+        if metrics_format == "prometheus":
+            text = get_metrics().render_prometheus()
+        elif metrics_format == "json":
+            snapshot = get_metrics().snapshot()
+            snapshot["driver_pool"] = _driver_pool_stats()
+            snapshot["tool_runner"] = tool_runner.stats()
+            snapshot["chromedriver"] = _chromedriver_info()
+            text = json.dumps(snapshot, indent=2)
+        else:
+            raise ValueError("format must be 'json' or 'prometheus'")
+        return [types.TextContent(type="text", text=text)]
+
+    if not arguments:
+        raise ValueError("Missing arguments")
+
+    try:
+        with trace(name) as current:
+            output_format = arguments.get("format", "json")
+            if output_format not in ("json", "text"):
+                raise ValueError("format must be 'json' or 'text'")
+
+            response = None
+            if arguments.get("no_cache"):
+                result_cache.record_bypass()
+            else:
+                # The disk tier may open, purge and query SQLite; off the loop
+                with span("cache_lookup"):
+                    response = await asyncio.to_thread(
+                        result_cache.get, name, arguments
+                    )
+
+            if response is not None:
+                current.outcome = "cached"
+            else:
+                # Run the blocking scraper on a worker thread so the event
+                # loop stays responsive; the trace follows it there
+                record = await tool_runner.run(
+                    _dispatch_tool, name, arguments, _progress_streamer(name, arguments)
+                )
+
+                if record is None:
+                    current.outcome = "not_found"
+                    return [
+                        types.TextContent(
+                            type="text",
+                            text=f"Trendyol {name}: product not found",
+                        )
+                    ]
+
+                with span("serialize"):
+                    response = _serialize_record(name, record, output_format)
+
+                # An empty result usually means the scrape failed quietly
+                if _is_empty_record(record):
+                    current.outcome = "empty"
+                else:
+                    await asyncio.to_thread(result_cache.set, name, arguments, response)
+
+            return _response_contents(response)
 
     except Exception as e:
         error_message = f"Error executing {name}: {str(e)}"
@@ -183,8 +542,167 @@ async def handle_call_tool(
         ]
 
 
+def _progress_streamer(name: str, arguments: dict[str, Any]) -> Any:
+    """
+    Return a callback that sends each batch of search products or reviews to
+    the client as a progress notification, or None when the client did not
+    ask for progress. Called on the event loop; the callback runs on a worker
+    thread.
+    """
+    if name not in STREAMED_TOOLS or not arguments.get("stream", True):
+        return None
+    key, count_argument, default_count = STREAMED_TOOLS[name]
+
+    ctx = server.request_context
+    token = ctx.meta.progressToken if ctx.meta else None
+    if token is None:
+        return None
+
+    loop = asyncio.get_running_loop()
+    total = arguments.get(count_argument, default_count)
+    sent = 0
+
+    def send_batch(records):
+        nonlocal sent
+        message = json.dumps(
+            {"offset": sent, key: to_dict(records)},
+            ensure_ascii=False,
+            separators=(",", ":"),
+        )
+        sent += len(records)
+        future = asyncio.run_coroutine_threadsafe(
+            ctx.session.send_progress_notification(
+                token,
+                progress=sent,
+                total=total,
+                message=message,
+                related_request_id=str(ctx.request_id),
+            ),
+            loop,
+        )
+        try:
+            future.result(timeout=5)
+        except Exception as e:
+            # A slow or gone client must not break the tool itself
+            pass
+
+    return send_batch
+
+
+def _serialize_record(name: str, record: Any, output_format: str) -> Any:
+    """
+    Serialize a tool record as compact JSON or with the tool's text renderer.
+    Records carrying image thumbnails serialize to {"text", "images"} so the
+    thumbnails can be sent as image content instead of inline base64.
+    """
+    data = to_dict(record)
+    images = []
+    if isinstance(record, ProductImages):
+        images = [
+            {"data": thumbnail["data"], "mimeType": thumbnail["mime_type"]}
+            for thumbnail in data.pop("thumbnails")
+        ]
+
+    if output_format == "text":
+        text = f"Trendyol {name} Results:\n\n{_renderer(name)(record)}"
+    else:
+        text = json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+
+    if images:
+        return {"text": text, "images": images}
+    return text
+
+
+def _response_contents(
+    response: Any,
+) -> list[types.TextContent | types.ImageContent]:
+    """Turn a serialized (possibly cached) response into MCP content"""
+    if isinstance(response, str):
+        return [types.TextContent(type="text", text=response)]
+    return [types.TextContent(type="text", text=response["text"])] + [
+        types.ImageContent(type="image", data=image["data"], mimeType=image["mimeType"])
+        for image in response["images"]
+    ]
+
+
+def _is_empty_record(record: Any) -> bool:
+    if record is None:
+        return True
+    if isinstance(record, SearchResult):
+        return not record.products
+    if isinstance(record, ProductDetails):
+        # e.g. a bot challenge served in place of the product page
+        return not (
+            record.title
+            or record.brand
+            or record.price
+            or record.description
+            or record.features
+            or record.attributes
+        )
+    if isinstance(record, ProductImages):
+        return not record.images
+    if isinstance(record, ProductReviews):
+        return not record.found or not record.reviews
+    if isinstance(record, ProductBundle):
+        sections = [getattr(record, section) for section in BUNDLE_SECTIONS]
+        return all(_is_empty_record(section) for section in sections)
+    if isinstance(record, list):
+        return all(_is_empty_record(item) for item in record)
+    if isinstance(record, BatchItem):
+        return record.error is not None or _is_empty_record(record.result)
+    return False
+
+
+def _cache_stats() -> dict[str, Any]:
+    from image_store import get_image_store
+    from selector_registry import get_selector_registry
+
+    return {
+        **result_cache.stats(),
+        "image_store": get_image_store().stats(),
+        "selectors": get_selector_registry().stats(),
+        "product_urls": _product_url_cache_stats(),
+    }
+
+
+def _product_url_cache_stats() -> dict[str, int] | None:
+    # product_resolver imports Selenium; before a product tool ran it is empty
+    product_resolver = sys.modules.get("product_resolver")
+    return product_resolver.product_url_cache_stats() if product_resolver else None
+
+
+def _chromedriver_info() -> dict[str, Any] | None:
+    from chromedriver_cache import chromedriver_info
+
+    return chromedriver_info()
+
+
+def _driver_pool_stats() -> dict[str, int] | None:
+    # Importing driver_pool loads Selenium, so only ask a pool that exists
+    driver_pool = sys.modules.get("driver_pool")
+    return driver_pool.driver_pool_stats() if driver_pool else None
+
+
+def _prepare_browsers():
+    # Resolve chromedriver once per start, then optionally launch the pool;
+    # Selenium is imported here, off the startup path
+    try:
+        from chromedriver_cache import resolve_chromedriver
+        from driver_pool import get_driver_pool
+
+        resolve_chromedriver()
+        if config.DRIVER_WARM_ON_START:
+            get_driver_pool().warm_up()
+    except Exception as e:
+        print(f"Browser preparation failed: {e}", file=sys.stderr)
+
+
 async def main():
     """Main entry point for the server."""
+    # Prepare the browsers in the background so the first call is warm
+    threading.Thread(target=_prepare_browsers, daemon=True).start()
+
     # Run the server using stdin/stdout streams
     async with mcp.server.stdio.stdio_server() as (read_stream, write_stream):
         await server.run(